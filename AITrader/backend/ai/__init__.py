@@ -3,8 +3,28 @@
 __init__.py
 -----------
 Initializes the AI module, exposing core learning and synthesis agents.
+Submodules are imported on first attribute access, so importing one agent (or the strategy
+registry) does not pull in the LLM and scraping dependencies of the others.
 """
 
-from .reinforcement_agent import ReinforcementTradingAgent
-from .strategy_synthesizer import StrategySynthesizer
-from .self_explorer import SelfExplorer
+import importlib
+
+_LAZY_EXPORTS = {
+    "ReinforcementTradingAgent": ".reinforcement_agent",
+    "BatchTradingEnv": ".trading_env",
+    "ParallelTrainer": ".trading_env",
+    "train_parallel": ".trading_env",
+    "SelfExplorer": ".self_explorer",
+    "auto_generate_strategies": ".strategy_synthesizer",
+    "synthesize_strategy_from_text": ".strategy_synthesizer",
+    "get_backend": ".llm_backends",
+    "ResponseCache": ".llm_backends",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,458 @@
+"""
+insight_index.py
+----------------
+On-disk BM25 search over trading insights with MinHash near-duplicate detection.
+Documents and per-term posting lists (packed int32 arrays) are stored in SQLite and loaded into memory.
+Queries walk each term's postings in impact order and stop as soon as no unseen document can enter the
+top k, so common terms cost about as much as rare ones. Documents can be added and removed incrementally.
+MinHash signatures with LSH banding find near-duplicates, so the same idea scraped from several sources
+is indexed (and synthesized) once.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+import numpy as np
+
+log = logging.getLogger("InsightIndex")
+
+INSIGHT_INDEX_PATH = os.getenv("INSIGHT_INDEX_PATH", "cache/insights.db")
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split())
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 3
+EXHAUSTIVE_POSTINGS = 16384   # queries touching fewer postings are scored exhaustively
+
+_rng = np.random.default_rng(0x5EED)
+_PERM_A = _rng.integers(1, 2 ** 32, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2 ** 32, NUM_PERM, dtype=np.uint64)
+_BAND_SALT = _rng.integers(0, 2 ** 63, BANDS, dtype=np.uint64)
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS insights (
+        id INTEGER PRIMARY KEY,
+        text TEXT NOT NULL,
+        source TEXT,
+        added REAL,
+        length INTEGER NOT NULL,
+        minhash BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS postings (
+        term TEXT PRIMARY KEY,
+        ids BLOB NOT NULL,
+        tfs BLOB NOT NULL
+    ) WITHOUT ROWID;
+'''
+
+
+def tokenize(text: str) -> list:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def minhash(text: str) -> np.ndarray:
+    """
+    MinHash signature (NUM_PERM uint32 values) of the word 3-gram shingles of a text.
+    Equal positions between two signatures estimate their Jaccard similarity.
+    """
+    words = tokenize(text)
+    shingles = {" ".join(words[i:i + SHINGLE]) for i in range(max(len(words) - SHINGLE + 1, 1))}
+    x = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # Multiply-shift hashing: x < 2^32 and a < 2^32, so a*x + b cannot overflow uint64
+    hashed = (np.outer(x, _PERM_A) + _PERM_B) >> np.uint64(32)
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """
+    LSH band keys (FNV-1a over each band's rows, salted per band) of (n, NUM_PERM) signatures.
+
+    :return: (n, BANDS) uint64
+    """
+    rows = signatures.astype(np.uint64).reshape(len(signatures), BANDS, ROWS)
+    key = np.broadcast_to(np.uint64(0xcbf29ce484222325) ^ _BAND_SALT, (len(signatures), BANDS)).copy()
+    with np.errstate(over="ignore"):
+        for r in range(ROWS):
+            key = (key ^ rows[:, :, r]) * np.uint64(0x100000001b3)
+    return key
+
+
+class _SortedTail:
+    """
+    Sorted (key, id) arrays plus a dict of recent inserts, merged into the arrays once it grows.
+    """
+
+    def __init__(self, key_dtype):
+        self.keys = np.empty(0, dtype=key_dtype)
+        self.ids = np.empty(0, dtype=np.int32)
+        self.recent = {}
+        self.pending = 0
+
+    def extend(self, keys: list, doc_id: int):
+        for key in keys:
+            self.recent.setdefault(key, []).append(doc_id)
+        self.pending += len(keys)
+        if self.pending > max(4096, len(self.keys) // 8):
+            self.merge()
+
+    def merge(self):
+        if not self.recent:
+            return
+        keys = np.concatenate([self.keys, np.fromiter((k for k, ids in self.recent.items() for _ in ids),
+                                                      dtype=self.keys.dtype, count=self.pending)])
+        ids = np.concatenate([self.ids, np.fromiter((i for ids in self.recent.values() for i in ids),
+                                                    dtype=np.int32, count=self.pending)])
+        order = np.argsort(keys, kind="stable")
+        self.keys, self.ids = keys[order], ids[order]
+        self.recent, self.pending = {}, 0
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        lo = np.searchsorted(self.keys, keys, side="left")
+        hi = np.searchsorted(self.keys, keys, side="right")
+        found = [self.ids[a:b] for a, b in zip(lo, hi) if b > a]
+        found += [np.array(self.recent[k], dtype=np.int32) for k in keys.tolist() if k in self.recent]
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int32)
+
+
+class _Postings:
+    """
+    Posting list of one term, in ascending doc id order (new documents always get larger ids, so
+    appends keep it sorted). An impact order (by BM25 term weight) is built lazily for pruning.
+    """
+
+    __slots__ = ("ids", "tfs", "new_ids", "new_tfs", "order", "weights", "avgdl")
+
+    def __init__(self, ids=None, tfs=None):
+        self.ids = np.empty(0, dtype=np.int32) if ids is None else ids
+        self.tfs = np.empty(0, dtype=np.int32) if tfs is None else tfs
+        self.new_ids = []
+        self.new_tfs = []
+        self.order = None
+
+    def merge(self):
+        if self.new_ids:
+            self.ids = np.concatenate([self.ids, np.array(self.new_ids, dtype=np.int32)])
+            self.tfs = np.concatenate([self.tfs, np.array(self.new_tfs, dtype=np.int32)])
+            self.new_ids, self.new_tfs = [], []
+            self.order = None
+
+    def arrays(self) -> tuple:
+        self.merge()
+        return self.ids, self.tfs
+
+    def remove(self, doc_id: int):
+        ids, tfs = self.arrays()
+        keep = ids != doc_id
+        self.ids, self.tfs = ids[keep], tfs[keep]
+        self.order = None
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self.new_ids)
+
+
+class InsightIndex:
+    """
+    BM25-ranked inverted index of insight texts, persisted in SQLite.
+    """
+
+    def __init__(self, path: str = INSIGHT_INDEX_PATH, k1: float = 1.2, b: float = 0.75):
+        """
+        :param path: SQLite file (":memory:" for a throwaway index)
+        :param k1: BM25 term-frequency saturation
+        :param b: BM25 length normalization
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+        self._texts = {}                       # id -> text
+        self._lengths = np.zeros(1024, dtype=np.float64)
+        self._signatures = np.zeros((1024, NUM_PERM), dtype=np.uint32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._postings = {}
+        self._bands = _SortedTail(np.uint64)
+        self._total_length = 0.0
+        self._next_id = 0
+        self._added = {}                       # unsaved id -> (source, added)
+        self._removed = set()                  # unsaved removals
+        self._dirty_terms = set()
+        self._load()
+
+    # ------------------------------------------------------------------ persistence
+
+    def _load(self):
+        rows = self.conn.execute("SELECT id, length, minhash FROM insights ORDER BY id").fetchall()
+        if rows:
+            ids = np.array([r[0] for r in rows], dtype=np.int32)
+            self._grow(int(ids[-1]) + 1)
+            self._lengths[ids] = [r[1] for r in rows]
+            self._signatures[ids] = np.frombuffer(b"".join(r[2] for r in rows), dtype=np.uint32).reshape(-1, NUM_PERM)
+            self._alive[ids] = True
+            self._total_length = float(self._lengths.sum())
+            self._next_id = int(ids[-1]) + 1
+            self._bands.keys = band_keys(self._signatures[ids]).ravel()
+            self._bands.ids = np.repeat(ids, BANDS)
+            order = np.argsort(self._bands.keys, kind="stable")
+            self._bands.keys, self._bands.ids = self._bands.keys[order], self._bands.ids[order]
+            self._texts = dict(self.conn.execute("SELECT id, text FROM insights"))
+        for term, ids, tfs in self.conn.execute("SELECT term, ids, tfs FROM postings"):
+            self._postings[term] = _Postings(np.frombuffer(ids, dtype=np.int32).copy(),
+                                             np.frombuffer(tfs, dtype=np.int32).copy())
+        if rows:
+            log.info(f"[InsightIndex] 📚 Loaded {len(rows)} insights, {len(self._postings)} terms")
+
+    def save(self):
+        """Writes added/removed documents and changed posting lists in one transaction."""
+        with self._lock:
+            if not (self._added or self._removed or self._dirty_terms):
+                return
+            with self.conn:
+                self.conn.executemany("DELETE FROM insights WHERE id = ?", [(i,) for i in self._removed])
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO insights (id, text, source, added, length, minhash) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(i, self._texts[i], source, added, int(self._lengths[i]), self._signatures[i].tobytes())
+                     for i, (source, added) in self._added.items()])
+                upserts, deletes = [], []
+                for term in self._dirty_terms:
+                    postings = self._postings.get(term)
+                    if postings is None or not len(postings):
+                        deletes.append((term,))
+                        self._postings.pop(term, None)
+                    else:
+                        ids, tfs = postings.arrays()
+                        upserts.append((term, ids.tobytes(), tfs.tobytes()))
+                self.conn.executemany("DELETE FROM postings WHERE term = ?", deletes)
+                self.conn.executemany("INSERT OR REPLACE INTO postings (term, ids, tfs) VALUES (?, ?, ?)", upserts)
+            self._added.clear()
+            self._removed.clear()
+            self._dirty_terms.clear()
+
+    def close(self):
+        self.save()
+        self.conn.close()
+
+    # ------------------------------------------------------------------ updates
+
+    def _grow(self, size: int):
+        if size <= len(self._lengths):
+            return
+        capacity = max(size, 2 * len(self._lengths))
+        for name in ("_lengths", "_signatures", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, text: str, source: str = None, dedup_threshold: float = None) -> int:
+        """
+        Adds an insight.
+
+        :param text: Insight text
+        :param source: Optional origin (URL, feed name)
+        :param dedup_threshold: If set, skip the text when an indexed insight has at least this
+                                estimated Jaccard similarity (e.g. 0.8)
+        :return: New document id, or None if it was a near-duplicate
+        """
+        signature = minhash(text)
+        keys = band_keys(signature[None, :])[0]
+        with self._lock:
+            if dedup_threshold is not None and self._near(signature, keys, dedup_threshold):
+                return None
+            doc_id = self._next_id
+            self._next_id += 1
+            self._grow(doc_id + 1)
+            tokens = tokenize(text)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for term, tf in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                postings.new_ids.append(doc_id)
+                postings.new_tfs.append(tf)
+            self._dirty_terms.update(counts)
+            self._texts[doc_id] = text
+            self._lengths[doc_id] = len(tokens)
+            self._signatures[doc_id] = signature
+            self._bands.extend(keys.tolist(), doc_id)
+            self._alive[doc_id] = True
+            self._total_length += len(tokens)
+            self._added[doc_id] = (source, time.time())
+            return doc_id
+
+    def add_many(self, texts: list, source: str = None, dedup_threshold: float = None) -> list:
+        """Adds several insights and saves; returns their ids (None for skipped near-duplicates)."""
+        ids = [self.add(text, source, dedup_threshold) for text in texts]
+        self.save()
+        return ids
+
+    def remove(self, doc_id: int):
+        """Removes an insight from the index."""
+        with self._lock:
+            text = self._texts.pop(doc_id, None)
+            if text is None:
+                return
+            terms = set(tokenize(text))
+            for term in terms:
+                self._postings[term].remove(doc_id)
+            self._dirty_terms.update(terms)
+            self._total_length -= self._lengths[doc_id]
+            self._lengths[doc_id] = 0
+            self._alive[doc_id] = False
+            if self._added.pop(doc_id, None) is None:
+                self._removed.add(doc_id)
+
+    # ------------------------------------------------------------------ queries
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def get(self, doc_id: int) -> str:
+        return self._texts.get(doc_id)
+
+    def ids(self) -> list:
+        return list(self._texts)
+
+    def _weights(self, tfs: np.ndarray, lengths: np.ndarray, avgdl: float) -> np.ndarray:
+        return tfs * (self.k1 + 1) / (tfs + self.k1 * (1 - self.b + self.b * lengths / avgdl))
+
+    def _impact_order(self, postings: _Postings, avgdl: float):
+        """
+        Sorts a term's postings by BM25 term weight. The order is reused until the postings change or
+        the average length drifts by 25%; meanwhile `max(1, avgdl / postings.avgdl)` scales the stored
+        weights into valid upper bounds (a doc's weight grows at most by that ratio).
+        """
+        if len(postings.new_ids) > max(256, len(postings.ids) // 8):
+            postings.merge()
+        if postings.order is None or not 0.8 <= avgdl / postings.avgdl <= 1.25:
+            weights = self._weights(postings.tfs, self._lengths[postings.ids], avgdl)
+            postings.order = np.argsort(-weights, kind="stable")
+            postings.weights = weights[postings.order]
+            postings.avgdl = avgdl
+
+    def search(self, query, k: int = 5) -> list:
+        """
+        Ranks insights by BM25 against keywords.
+
+        :param query: Query string or list of keywords
+        :param k: Number of results
+        :return: [(doc_id, score, text)] best first
+        """
+        tokens = tokenize(" ".join(query) if isinstance(query, (list, tuple)) else query)
+        with self._lock:
+            n = len(self._texts)
+            if not n or not tokens:
+                return []
+            avgdl = self._total_length / n
+            terms = []
+            for term in dict.fromkeys(tokens):
+                postings = self._postings.get(term)
+                if postings is not None and len(postings):
+                    self._impact_order(postings, avgdl)
+                    df = len(postings)
+                    idf = tokens.count(term) * np.log1p((n - df + 0.5) / (df + 0.5))
+                    terms.append((postings, idf, max(1.0, avgdl / postings.avgdl)))
+            if not terms:
+                return []
+
+            if sum(len(p) for p, _, _ in terms) <= EXHAUSTIVE_POSTINGS:
+                ids, scores = self._exhaustive(terms, avgdl, k)
+            else:
+                ids, scores = self._pruned(terms, avgdl, k)
+            top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+            top = top[np.lexsort((ids[top], -scores[top]))]
+            return [(int(ids[i]), float(scores[i]), self._texts[int(ids[i])]) for i in top]
+
+    def _exhaustive(self, terms: list, avgdl: float, k: int) -> tuple:
+        """Scores every posting; per-document sums via one bincount. Returns candidate ids and scores."""
+        ids, weights = [], []
+        for postings, idf, _ in terms:
+            term_ids, tfs = postings.arrays()
+            ids.append(term_ids)
+            weights.append(idf * self._weights(tfs, self._lengths[term_ids], avgdl))
+        ids = np.concatenate(ids)
+        if len(terms) == 1:
+            return ids, weights[0]
+        total = np.bincount(ids, weights=np.concatenate(weights), minlength=self._next_id)
+        # A document occurs at most once per term, so the best k * terms postings hold the k best documents
+        m = min(len(ids), k * len(terms))
+        ids = np.unique(ids[np.argpartition(-total[ids], m - 1)[:m]])
+        return ids, total[ids]
+
+    def _pruned(self, terms: list, avgdl: float, k: int) -> tuple:
+        """
+        Reads impact-ordered postings in growing blocks, scoring each newly seen document exactly,
+        until the k-th best score reaches the bound on any unseen document. Short posting lists and
+        unmerged postings are read completely in the first block, so only common terms are pruned.
+        """
+        short = EXHAUSTIVE_POSTINGS // 8
+        seen = np.zeros(self._next_id, dtype=bool)
+        best_ids = np.empty(0, dtype=np.int32)
+        best_scores = np.empty(0)
+        new = [np.array(p.new_ids, dtype=np.int32) for p, _, _ in terms if p.new_ids]
+        start, depth = 0, 4 * k
+        while True:
+            new += [p.ids[p.order[start:depth if len(p.weights) > short else None]] for p, _, _ in terms
+                    if start == 0 or len(p.weights) > short]
+            new = np.concatenate(new)
+            new = np.unique(new[~seen[new]])
+            seen[new] = True
+            best_ids = np.concatenate([best_ids, new])
+            best_scores = np.concatenate([best_scores, self._score(new, terms, avgdl)])
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_ids, best_scores = best_ids[keep], best_scores[keep]
+            bound = sum(idf * drift * p.weights[depth] for p, idf, drift in terms if short < len(p.weights) > depth)
+            if all(len(p.weights) <= max(depth, short) for p, _, _ in terms) or (len(best_scores) == k and best_scores.min() >= bound):
+                return best_ids, best_scores
+            start, depth, new = depth, depth * 4, []
+
+    def _score(self, candidates: np.ndarray, terms: list, avgdl: float) -> np.ndarray:
+        """Exact BM25 scores of candidate documents (term frequencies via binary search)."""
+        scores = np.zeros(len(candidates))
+        lengths = self._lengths[candidates]
+        for postings, idf, _ in terms:
+            for ids, tfs in ((postings.ids, postings.tfs), (postings.new_ids, postings.new_tfs)):
+                if not len(ids):
+                    continue
+                ids = np.asarray(ids, dtype=np.int32)
+                pos = np.minimum(np.searchsorted(ids, candidates), len(ids) - 1)
+                hit = ids[pos] == candidates
+                if hit.any():
+                    tf = np.where(hit, np.asarray(tfs)[pos], 0)
+                    scores += idf * self._weights(tf, lengths, avgdl)
+        return scores
+
+    def _near(self, signature: np.ndarray, keys: np.ndarray, threshold: float) -> list:
+        candidates = self._bands.lookup(keys)
+        candidates = candidates[self._alive[candidates]]
+        if not len(candidates):
+            return []
+        similarity = (self._signatures[candidates] == signature).mean(axis=1)
+        keep = similarity >= threshold
+        return [(int(i), float(s)) for i, s in zip(candidates[keep], similarity[keep])]
+
+    def near_duplicates(self, text: str, threshold: float = 0.8) -> list:
+        """
+        Indexed insights whose estimated Jaccard similarity (word 3-gram shingles) reaches `threshold`.
+        Candidates come from LSH buckets (16 bands of 4 rows), so only colliding documents are compared.
+
+        :return: [(doc_id, similarity)] most similar first
+        """
+        signature = minhash(text)
+        with self._lock:
+            return sorted(self._near(signature, band_keys(signature[None, :])[0], threshold), key=lambda x: -x[1])
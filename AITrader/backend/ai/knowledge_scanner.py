@@ -2,24 +2,259 @@
 knowledge_scanner.py
 ---------------------
 Scans the internet for trading-related content and extracts strategy ideas.
+Articles are fetched concurrently over a pooled HTTP session. Each response is streamed through a
+paragraph parser that stops once enough text has been read. Extracted summaries are cached on disk
+with their ETag/Last-Modified validators: fresh entries are served without a request, stale ones are
+revalidated with conditional requests, and entries past the TTL are evicted.
 """
 
-import requests
+import codecs
+import json
 import logging
-from bs4 import BeautifulSoup
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+import requests
+from requests.adapters import HTTPAdapter
 from backend.core import CONFIG
 
 log = logging.getLogger("Scanner")
 
-CRYPTO_PANIC_URL = f"https://cryptopanic.com/api/v1/posts/?auth_token={CONFIG['CRYPTOPANIC_API_KEY']}&currencies=BTC,ETH&filter=rising"
+CRYPTO_PANIC_URL = "https://cryptopanic.com/api/v1/posts/?auth_token={token}&currencies=BTC,ETH&filter=rising"
+ARTICLE_CACHE_FILE = os.getenv("ARTICLE_CACHE_FILE", "cache/article_summaries.json")
+SCANNER_WORKERS = int(os.getenv("SCANNER_WORKERS", 8))
+SCANNER_FRESH_SECONDS = int(os.getenv("SCANNER_FRESH_SECONDS", 3600))
+SCANNER_CACHE_TTL = int(os.getenv("SCANNER_CACHE_TTL", 7 * 24 * 3600))
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (AI Trading Bot)'  # Anti-bot bypass
 }
 
+
+class ParagraphExtractor(HTMLParser):
+    """
+    Incremental <p> text extractor; `done` is set once `max_paragraphs` paragraphs were read.
+    """
+
+    SKIP = {"script", "style", "noscript"}
+
+    def __init__(self, max_paragraphs: int = 5):
+        super().__init__(convert_charrefs=True)
+        self.max_paragraphs = max_paragraphs
+        self.paragraphs = []
+        self._current = None
+        self._skip = 0
+
+    @property
+    def done(self) -> bool:
+        return len(self.paragraphs) >= self.max_paragraphs
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag == "p":
+            self._close_paragraph()
+            self._current = []
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(self._skip - 1, 0)
+        elif tag == "p":
+            self._close_paragraph()
+
+    def handle_data(self, data):
+        if self._current is not None and not self._skip and not self.done:
+            self._current.append(data)
+
+    def _close_paragraph(self):
+        if self._current is not None and not self.done:
+            self.paragraphs.append("".join(self._current))
+        self._current = None
+
+    def close(self):
+        super().close()
+        self._close_paragraph()
+
+    def text(self) -> str:
+        return " ".join(self.paragraphs)
+
+
+class SummaryCache:
+    """
+    Disk cache of article summaries with their HTTP validators, evicted after `ttl` seconds.
+    """
+
+    def __init__(self, path: str = ARTICLE_CACHE_FILE, ttl: float = SCANNER_CACHE_TTL):
+        """
+        :param path: JSON file (None keeps the cache in memory only)
+        :param ttl: Seconds after the last successful fetch/revalidation before an entry is evicted
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning(f"[Scanner] ⚠ Ignoring unreadable article cache {path}: {e}")
+        self.evict()
+
+    def get(self, url: str) -> dict:
+        with self._lock:
+            entry = self._entries.get(url)
+            return dict(entry) if entry else None
+
+    def put(self, url: str, summary: str, etag: str = None, last_modified: str = None):
+        with self._lock:
+            self._entries[url] = {"summary": summary, "etag": etag, "last_modified": last_modified,
+                                  "checked": time.time()}
+
+    def touch(self, url: str):
+        with self._lock:
+            if url in self._entries:
+                self._entries[url]["checked"] = time.time()
+
+    def evict(self) -> int:
+        """Drops entries older than the TTL; returns how many were removed."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [url for url, entry in self._entries.items() if entry["checked"] < cutoff]
+            for url in expired:
+                del self._entries[url]
+        return len(expired)
+
+    def save(self):
+        if not self.path:
+            return
+        self.evict()
+        with self._lock:
+            data = json.dumps(self._entries)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning(f"[Scanner] ⚠ Could not write article cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ArticleFetcher:
+    """
+    Concurrent article summarizer over a pooled requests session.
+    """
+
+    def __init__(self, cache: SummaryCache = None, workers: int = SCANNER_WORKERS,
+                 fresh_seconds: float = SCANNER_FRESH_SECONDS, max_paragraphs: int = 5,
+                 max_chars: int = 1000, timeout: float = 10):
+        """
+        :param cache: Summary cache (defaults to the on-disk ARTICLE_CACHE_FILE)
+        :param workers: Concurrent fetches (and pooled connections per host)
+        :param fresh_seconds: Age below which a cached summary is used without revalidation
+        :param max_paragraphs: Paragraphs read before the download is abandoned
+        :param max_chars: Summary length
+        """
+        self.cache = cache if cache is not None else SummaryCache()
+        self.workers = workers
+        self.fresh_seconds = fresh_seconds
+        self.max_paragraphs = max_paragraphs
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self.metrics = {"requests": 0, "fresh_hits": 0, "not_modified": 0, "bytes_read": 0, "errors": 0}
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.metrics[key] += n
+
+    def summarize(self, url: str) -> str:
+        """
+        Returns the first paragraphs of an article, from the cache when it is fresh or unchanged.
+
+        :param url: Article URL
+        :return: Summary text ("" on failure)
+        """
+        entry = self.cache.get(url)
+        if entry and time.time() - entry["checked"] < self.fresh_seconds:
+            self._count("fresh_hits")
+            return entry["summary"]
+
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            self._count("requests")
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304:
+                    if not entry:
+                        # No validators were sent, so there is nothing to reuse and nothing to cache
+                        raise requests.HTTPError(f"304 Not Modified without a cached summary for {url}",
+                                                 response=response)
+                    self._count("not_modified")
+                    self.cache.touch(url)
+                    return entry["summary"]
+                response.raise_for_status()
+                summary = self._extract(response)
+            self.cache.put(url, summary, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return summary
+        except Exception as e:
+            self._count("errors")
+            log.error(f"[Scanner] ❌ Could not summarize article: {e}")
+            return entry["summary"] if entry else ""
+
+    def _extract(self, response) -> str:
+        parser = ParagraphExtractor(self.max_paragraphs)
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        for chunk in response.iter_content(chunk_size=8192):
+            self._count("bytes_read", len(chunk))
+            parser.feed(decoder.decode(chunk))
+            if parser.done:
+                break
+        else:
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+        return parser.text().strip()[:self.max_chars]
+
+    def summarize_many(self, urls: list) -> list:
+        """Summarizes URLs concurrently; results are in input order. The cache is saved afterwards."""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Scanner") as pool:
+            summaries = list(pool.map(self.summarize, urls))
+        self.cache.save()
+        return summaries
+
+    def close(self):
+        self.session.close()
+
+
+_FETCHER = None
+
+
+def get_fetcher() -> ArticleFetcher:
+    """Process-wide fetcher, so the connection pool and cache survive between scans."""
+    global _FETCHER
+    if _FETCHER is None:
+        _FETCHER = ArticleFetcher()
+    return _FETCHER
+
+
 def fetch_trading_articles(limit=5):
     try:
-        response = requests.get(CRYPTO_PANIC_URL, headers=HEADERS, timeout=10)
+        url = CRYPTO_PANIC_URL.format(token=CONFIG.get("CRYPTOPANIC_API_KEY") or "")
+        response = get_fetcher().session.get(url, timeout=10)
         data = response.json()
         articles = data.get("results", [])[:limit]
         return [article['title'] + " — " + article['url'] for article in articles]
@@ -27,19 +262,15 @@ def fetch_trading_articles(limit=5):
         log.error(f"[Scanner] ❌ Failed to fetch articles: {e}")
         return []
 
+
 def summarize_article(url: str) -> str:
-    try:
-        html = requests.get(url, headers=HEADERS, timeout=10).text
-        soup = BeautifulSoup(html, "html.parser")
-        paragraphs = soup.find_all("p")
-        text = " ".join(p.get_text() for p in paragraphs[:5])
-        return text.strip()[:1000]
-    except Exception as e:
-        log.error(f"[Scanner] ❌ Could not summarize article: {e}")
-        return ""
+    fetcher = get_fetcher()
+    summary = fetcher.summarize(url)
+    fetcher.cache.save()
+    return summary
+
 
 def scan_for_strategy_ideas():
     log.info("[Scanner] 🌐 Searching for trading wisdom...")
     articles = fetch_trading_articles()
-    summaries = [summarize_article(url.split(" — ")[-1]) for url in articles]
-    return summaries
+    return get_fetcher().summarize_many([article.split(" — ")[-1] for article in articles])
@@ -0,0 +1,183 @@
+"""
+llm_backends.py
+---------------
+Pluggable LLM backends for strategy synthesis and a persistent response cache.
+`OpenAIBackend` talks to the OpenAI API (the `openai` package is imported only when it is used);
+`LocalStubBackend` is a deterministic offline backend for tests and benchmarks.
+Responses are cached on disk keyed by (prompt hash, model), so identical ideas are paid for once.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from backend.core import CONFIG
+
+log = logging.getLogger("LLM")
+
+LLM_CACHE_FILE = os.getenv("LLM_CACHE_FILE", "cache/llm_responses.json")
+
+
+def prompt_hash(system: str, prompt: str) -> str:
+    return hashlib.sha256(f"{system}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMBackend(ABC):
+    """
+    Abstract chat-completion backend.
+    """
+
+    model: str = "unknown"
+
+    @abstractmethod
+    async def complete(self, system: str, prompt: str) -> str:
+        """
+        Generates a completion.
+
+        :param system: System prompt
+        :param prompt: User prompt
+        :return: Completion text
+        """
+        pass
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    OpenAI chat completions. Supports both the 1.x client and the legacy 0.x module API.
+    """
+
+    def __init__(self, model: str = None, api_key: str = None):
+        import openai
+
+        self.model = model or CONFIG.get("LLM_MODEL") or "gpt-4"
+        api_key = api_key or CONFIG.get("OPENAI_API_KEY") or ""
+        if hasattr(openai, "AsyncOpenAI"):
+            self._client = openai.AsyncOpenAI(api_key=api_key)
+        else:
+            openai.api_key = api_key
+            self._client = None
+        self._openai = openai
+
+    async def complete(self, system: str, prompt: str) -> str:
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
+        if self._client is not None:
+            response = await self._client.chat.completions.create(model=self.model, messages=messages)
+        else:
+            response = await self._openai.ChatCompletion.acreate(model=self.model, messages=messages)
+        return response.choices[0].message.content.strip()
+
+
+class LocalStubBackend(LLMBackend):
+    """
+    Deterministic offline backend: derives an SMA-crossover strategy from the prompt hash.
+    The same prompt always yields the same code; `latency` simulates a remote call.
+    """
+
+    def __init__(self, latency: float = 0.0, model: str = "local-stub"):
+        self.latency = latency
+        self.model = model
+        self.calls = 0
+
+    async def complete(self, system: str, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = int(prompt_hash(system, prompt)[:8], 16)
+        short = 5 + digest % 20
+        long = short + 10 + (digest >> 8) % 40
+        return (
+            f"def stub_strategy(df):\n"
+            f"    \"\"\"SMA {short}/{long} crossover derived from: {prompt[:60]!r}\"\"\"\n"
+            f"    df = df.copy()\n"
+            f"    short = df['close'].rolling({short}, min_periods=1).mean()\n"
+            f"    long = df['close'].rolling({long}, min_periods=1).mean()\n"
+            f"    df['signal'] = None\n"
+            f"    df.loc[short > long, 'signal'] = 'buy'\n"
+            f"    df.loc[short < long, 'signal'] = 'sell'\n"
+            f"    return df\n"
+        )
+
+
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "local": LocalStubBackend,
+}
+
+
+def get_backend(name: str = None, **kwargs) -> LLMBackend:
+    """
+    Instantiates a backend by name (defaults to CONFIG['LLM_BACKEND']).
+
+    :param name: 'openai' or 'local'
+    :return: LLMBackend
+    """
+    name = name or CONFIG.get("LLM_BACKEND") or "openai"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name}")
+    return BACKENDS[name](**kwargs)
+
+
+class ResponseCache:
+    """
+    Persistent LLM response cache keyed by (prompt hash, model), stored as JSON.
+    `put` only updates memory; callers `save` once per batch of responses.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_FILE):
+        """
+        :param path: JSON file (None keeps the cache in memory only)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning(f"[LLM] ⚠ Ignoring unreadable response cache {path}: {e}")
+
+    @staticmethod
+    def key(system: str, prompt: str, model: str) -> str:
+        return f"{prompt_hash(system, prompt)}|{model}"
+
+    def get(self, system: str, prompt: str, model: str) -> str:
+        with self._lock:
+            entry = self._entries.get(self.key(system, prompt, model))
+        return entry["response"] if entry else None
+
+    def put(self, system: str, prompt: str, model: str, response: str):
+        with self._lock:
+            self._entries[self.key(system, prompt, model)] = {"prompt": prompt, "response": response,
+                                                              "created": time.time()}
+            self._dirty = True
+
+    def entries(self, model: str = None) -> list:
+        """Cached (prompt, response) pairs, optionally for one model, oldest first."""
+        with self._lock:
+            items = [(k, v) for k, v in self._entries.items() if model is None or k.endswith(f"|{model}")]
+        return [(v["prompt"], v["response"]) for _, v in sorted(items, key=lambda kv: kv[1]["created"])]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self):
+        """Writes the cache to disk if responses were added since the last save."""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            data = json.dumps(self._entries)
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning(f"[LLM] ⚠ Could not write response cache: {e}")
@@ -0,0 +1,191 @@
+"""
+model_store.py
+--------------
+Versioned binary model files for learned agents.
+
+Layout: magic (8 bytes), format version and header length (little-endian uint32 each), a JSON
+header (kind, metadata, array table, checksum), then every array's raw bytes aligned to 64 bytes.
+Loads parse only the header and map the arrays read-only with np.memmap, so a warm start costs
+one small read regardless of model size. Saves go to a temporary file in the same directory and
+are moved into place with os.replace, so readers never see a partial model.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import time
+from dataclasses import dataclass, field
+import numpy as np
+from backend.data.ohlcv_store import to_epoch_ms
+
+log = logging.getLogger("ModelStore")
+
+MAGIC = b"AITRMDL\x00"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGN = 64
+
+
+class ModelFormatError(ValueError):
+    """The file is not a model file, has an unsupported version, is truncated or corrupt, or failed its checksum."""
+
+
+@dataclass
+class SavedModel:
+    kind: str
+    arrays: dict                          # name -> array (read-only memmap when loaded with mmap=True)
+    meta: dict = field(default_factory=dict)
+    version: int = FORMAT_VERSION
+    created: int = 0                      # epoch ms
+    checksum: str = ""
+
+
+def _align(n: int) -> int:
+    return -(-n // _ALIGN) * _ALIGN
+
+
+def _digest(arrays: dict) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for name in sorted(arrays):
+        h.update(name.encode())
+        h.update(np.ascontiguousarray(arrays[name]).data)
+    return h.hexdigest()
+
+
+def _atomic_write(path: str, write):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def save_model(path: str, kind: str, arrays: dict, meta: dict = None) -> str:
+    """
+    Atomically writes arrays plus JSON-serializable metadata.
+
+    :param kind: Model type tag checked on load (e.g. 'q_agent')
+    :return: path
+    """
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    table, offset = {}, 0
+    for name, a in arrays.items():
+        table[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset = _align(offset + a.nbytes)
+    header = {"kind": kind, "created": int(time.time() * 1000), "meta": meta or {},
+              "arrays": table, "checksum": _digest(arrays)}
+    raw = json.dumps(header).encode()
+    # The data section starts aligned, so array offsets are relative to it
+    data_start = _align(_PREAMBLE.size + len(raw))
+    raw = raw.ljust(data_start - _PREAMBLE.size)
+
+    def write(f):
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(raw)))
+        f.write(raw)
+        for name, a in arrays.items():
+            f.seek(data_start + table[name]["offset"])
+            f.write(a.data)
+
+    _atomic_write(path, write)
+    return path
+
+
+def load_model(path: str, kind: str = None, mmap: bool = True, verify: bool = True) -> SavedModel:
+    """
+    Reads a model file.
+
+    :param kind: Expected model type (None accepts any)
+    :param mmap: Map arrays read-only instead of reading them into memory
+    :param verify: Check the array checksum (reads every array once)
+    :raises FileNotFoundError: If there is no model at path
+    :raises ModelFormatError: On a bad magic, an unsupported version, an unreadable header, a truncated
+                              file, a kind mismatch or a checksum mismatch
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ModelFormatError(f"{path}: truncated model file")
+        magic, version, header_len = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ModelFormatError(f"{path}: not a model file")
+        if version > FORMAT_VERSION:
+            raise ModelFormatError(f"{path}: format version {version} is newer than supported ({FORMAT_VERSION})")
+        size = os.fstat(f.fileno()).st_size
+        data_start = _PREAMBLE.size + header_len
+        if data_start > size:
+            raise ModelFormatError(f"{path}: truncated model file")
+        try:
+            header = json.loads(f.read(header_len))
+            specs = [(name, np.dtype(spec["dtype"]), tuple(int(d) for d in spec["shape"]), int(spec["offset"]))
+                     for name, spec in header["arrays"].items()]
+            missing = {"kind", "meta", "created", "checksum"} - header.keys()
+            if missing:
+                raise KeyError(f"missing fields {sorted(missing)}")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ModelFormatError(f"{path}: unreadable header: {e}") from e
+
+        arrays = {}
+        for name, dtype, shape, offset in specs:
+            count = int(np.prod(shape))
+            start = data_start + offset
+            if offset < 0 or min(shape, default=0) < 0 or start + count * dtype.itemsize > size:
+                raise ModelFormatError(f"{path}: truncated or corrupt model file (array {name!r} lies outside the file)")
+            if mmap and count:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=start, shape=shape)
+            else:
+                f.seek(start)
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+
+    if kind is not None and header["kind"] != kind:
+        raise ModelFormatError(f"{path}: expected a {kind} model, found {header['kind']}")
+    if verify and _digest(arrays) != header["checksum"]:
+        raise ModelFormatError(f"{path}: checksum mismatch")
+    return SavedModel(header["kind"], arrays, header["meta"], version, header["created"], header["checksum"])
+
+
+def write_json(path: str, payload: dict) -> str:
+    """Atomically writes a small JSON document (e.g. the selected strategy)."""
+    _atomic_write(path, lambda f: f.write(json.dumps(payload, indent=2, default=str).encode()))
+    return path
+
+
+def read_json(path: str) -> dict:
+    """Reads a JSON document written by write_json; None if it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        if os.path.exists(path):
+            log.warning(f"[ModelStore] ⚠ Ignoring unreadable {path}: {e}")
+        return None
+
+
+def data_range(df) -> dict:
+    """Training data range of an OHLCV DataFrame: bars, plus first/last epoch-ms when it has timestamps."""
+    info = {"bars": len(df)}
+    if len(df) and 'timestamp' in df:
+        stamps = to_epoch_ms(df['timestamp'])
+        info.update(start=int(stamps.min()), end=int(stamps.max()))
+    return info
+
+
+def merge_ranges(a: dict, b: dict) -> dict:
+    """Range covering two training runs (bars add up)."""
+    if not a:
+        return b
+    merged = {"bars": a["bars"] + b["bars"]}
+    for key, pick in (("start", min), ("end", max)):
+        values = [r[key] for r in (a, b) if key in r]
+        if values:
+            merged[key] = pick(values)
+    return merged
@@ -3,10 +3,23 @@
 reinforcement_agent.py
 ----------------------
 Defines a simplified reinforcement learning (RL) agent that learns to trade based on market state-reward feedback.
+States are encoded for the whole series up front as small integers and the Q-table is a dense
+(state, action) array, so the training loop touches neither pandas nor per-state dicts.
+Agents are saved to and warm-started from model files (see model_store.py).
 """
 
 import numpy as np
 import pandas as pd
+from backend.ai.model_store import ModelFormatError, data_range, load_model, merge_ranges, save_model
+
+# Index of a state is 2 * (close > open) + (volume > 0); labels keep the original string keys
+STATE_LABELS = ["0-0", "0-1", "1-0", "1-1"]
+
+
+def encode_states(open_: np.ndarray, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """Integer state of every bar (see STATE_LABELS)."""
+    return ((np.asarray(close) > np.asarray(open_)).astype(np.int8) << 1) | (np.asarray(volume) > 0)
+
 
 class ReinforcementTradingAgent:
     """
@@ -15,48 +28,124 @@ class ReinforcementTradingAgent:
     """
 
     def __init__(self, actions=None, alpha=0.1, gamma=0.9, epsilon=0.2):
-        self.actions = actions or ['BUY', 'SELL', 'HOLD']
+        self.actions = list(actions or ['BUY', 'SELL', 'HOLD'])
         self.alpha = alpha    # learning rate
         self.gamma = gamma    # discount factor
         self.epsilon = epsilon  # exploration rate
-        self.q_table = {}     # state -> action -> value
+        self.q = np.zeros((len(STATE_LABELS), len(self.actions)))  # state x action -> value
+        self._visited = []    # state indices in order of first visit
+        self.data_range = None  # bars (and timestamps) the agent was trained on
+        # Greedy choice in a state that was never visited
+        self._default = self.actions.index('HOLD') if 'HOLD' in self.actions else len(self.actions) - 1
+
+    @property
+    def q_table(self) -> dict:
+        """Visited states as state -> action -> value (a copy built from the dense table)."""
+        return {STATE_LABELS[s]: dict(zip(self.actions, self.q[s].tolist())) for s in self._visited}
+
+    @q_table.setter
+    def q_table(self, table: dict):
+        self.q[:] = 0.0
+        self._visited = []
+        for key, values in table.items():
+            state = STATE_LABELS.index(key)
+            self._visited.append(state)
+            for action, value in values.items():
+                self.q[state, self.actions.index(action)] = value
 
     def _get_state_key(self, row: pd.Series) -> str:
         """Extracts a simple state representation from row."""
         return f"{int(row['close'] > row['open'])}-{int(row['volume'] > 0)}"
 
-    def _choose_action(self, state_key: str) -> str:
+    def _choose(self, state: int) -> int:
         if np.random.rand() < self.epsilon:
-            return np.random.choice(self.actions)
-        q_values = self.q_table.get(state_key, {})
-        return max(q_values, key=q_values.get, default='HOLD')
+            # Same draw as np.random.choice(self.actions)
+            return np.random.randint(len(self.actions))
+        if state not in self._visited:
+            return self._default
+        return int(np.argmax(self.q[state]))
+
+    def _choose_action(self, state_key: str) -> str:
+        return self.actions[self._choose(STATE_LABELS.index(state_key))]
 
     def train(self, df: pd.DataFrame):
         """
         Trains the agent on historical market data.
+        Consumes the global NumPy RNG exactly like the row-by-row version, so a fixed seed gives the
+        same actions and Q-values.
+
+        :return: DataFrame with the 'action' taken and 'reward' earned at each bar (index of df)
         """
-        df = df.copy()
-        df['action'] = 'HOLD'
-        df['reward'] = 0
+        n = len(df)
+        taken = np.full(n, self._default, dtype=np.int16)
+        rewards = np.zeros(n)
+        if n > 1:
+            close = df['close'].to_numpy(dtype=float)
+            states = encode_states(df['open'].to_numpy(dtype=float), close,
+                                   df['volume'].to_numpy(dtype=float)).tolist()
+            moves = (close[1:] - close[:-1]).tolist()
+            self._learn(states, moves, taken)
+            buy = self.actions.index('BUY') if 'BUY' in self.actions else -1
+            # BUY earns the move, every other action earns its negative
+            rewards[1:] = np.where(taken[1:] == buy, close[1:] - close[:-1], close[:-1] - close[1:])
+            self.data_range = merge_ranges(self.data_range, data_range(df))
+
+        labels = np.array(self.actions, dtype=object)
+        return pd.DataFrame({'action': labels[taken], 'reward': rewards}, index=df.index)
 
-        for i in range(1, len(df)):
-            prev_row, row = df.iloc[i - 1], df.iloc[i]
-            state_key = self._get_state_key(prev_row)
-            next_state_key = self._get_state_key(row)
-            action = self._choose_action(state_key)
+    def _learn(self, states: list, moves: list, taken: np.ndarray):
+        """Q-learning pass over precomputed states; writes the chosen action indices into `taken`."""
+        alpha, gamma, epsilon = self.alpha, self.gamma, self.epsilon
+        rand, randint = np.random.rand, np.random.randint
+        n_actions, default = len(self.actions), self._default
+        buy = self.actions.index('BUY') if 'BUY' in self.actions else -1
+        q = self.q.tolist()
+        visited = [False] * len(STATE_LABELS)
+        for state in self._visited:
+            visited[state] = True
+        order = list(self._visited)
 
-            reward = row['close'] - prev_row['close'] if action == 'BUY' else prev_row['close'] - row['close']
+        for i in range(1, len(states)):
+            state, next_state = states[i - 1], states[i]
+            if rand() < epsilon:
+                action = randint(n_actions)
+            elif visited[state]:
+                row = q[state]
+                action = row.index(max(row))
+            else:
+                action = default
+            taken[i] = action
+            reward = moves[i - 1] if action == buy else -moves[i - 1]
 
-            df.at[i, 'action'] = action
-            df.at[i, 'reward'] = reward
+            if not visited[state]:
+                visited[state] = True
+                order.append(state)
+            next_max_q = max(q[next_state]) if visited[next_state] else 0.0
+            row = q[state]
+            row[action] = row[action] + alpha * (reward + gamma * next_max_q - row[action])
 
-            # Q-learning update
-            if state_key not in self.q_table:
-                self.q_table[state_key] = {a: 0.0 for a in self.actions}
+        self.q[:] = q
+        self._visited = order
 
-            next_max_q = max(self.q_table.get(next_state_key, {}).values(), default=0.0)
-            old_q = self.q_table[state_key][action]
-            new_q = old_q + self.alpha * (reward + self.gamma * next_max_q - old_q)
-            self.q_table[state_key][action] = new_q
+    def save(self, path: str) -> str:
+        """Atomically writes the Q-table and hyperparameters to a model file."""
+        meta = {"actions": self.actions, "alpha": self.alpha, "gamma": self.gamma, "epsilon": self.epsilon,
+                "states": STATE_LABELS, "data_range": self.data_range}
+        return save_model(path, "q_agent", {"q": self.q, "visited": np.array(self._visited, dtype=np.int8)}, meta)
 
-        return df[['action', 'reward']]
+    @classmethod
+    def load(cls, path: str, verify: bool = True) -> "ReinforcementTradingAgent":
+        """
+        Warm-starts an agent from a model file written by save().
+
+        :raises ModelFormatError: If the file is not a compatible agent model
+        """
+        model = load_model(path, "q_agent", verify=verify)
+        meta = model.meta
+        if meta["states"] != STATE_LABELS:
+            raise ModelFormatError(f"{path}: state encoding {meta['states']} differs from {STATE_LABELS}")
+        agent = cls(meta["actions"], meta["alpha"], meta["gamma"], meta["epsilon"])
+        agent.q[:] = model.arrays["q"]
+        agent._visited = model.arrays["visited"].tolist()
+        agent.data_range = meta["data_range"]
+        return agent
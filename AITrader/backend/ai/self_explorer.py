@@ -3,14 +3,20 @@
 self_explorer.py
 ----------------
 Autonomous agent that scans external data sources (news, forums, code, etc.) to discover new trading ideas.
+Insights are kept in a persistent BM25 index (see insight_index.py), so searches rank by keyword
+relevance and near-duplicate insights are stored once.
 """
 
 import random
+from backend.ai.insight_index import InsightIndex, INSIGHT_INDEX_PATH
+
+DEDUP_THRESHOLD = 0.8
+
 
 class SelfExplorer:
     """
     Exploration agent that emulates an LLM-based agent crawling the web for trading alpha.
-    This mock version produces synthetic insights to seed the strategy engine.
+    The index is seeded with a small knowledge pool and grows with scraped summaries.
     """
 
     KNOWLEDGE_POOL = [
@@ -21,12 +27,40 @@ class SelfExplorer:
         "Support resistance flips are strong confirmation signals."
     ]
 
-    def search_insights(self, keywords=None) -> str:
+    def __init__(self, index: InsightIndex = None, index_path: str = INSIGHT_INDEX_PATH):
+        """
+        :param index: Insight index (defaults to the on-disk index at index_path)
+        """
+        self.index = index if index is not None else InsightIndex(index_path)
+        if not len(self.index):
+            self.index.add_many(self.KNOWLEDGE_POOL)
+
+    def add_insights(self, texts: list, source: str = None) -> list:
         """
-        Returns a random insight from a simulated knowledge base.
-        :param keywords: Optional search filter (not used in mock)
+        Indexes new insights, skipping near-duplicates of indexed ones.
+
+        :return: The texts that were new
+        """
+        ids = self.index.add_many([t for t in texts if t], source, dedup_threshold=DEDUP_THRESHOLD)
+        return [t for t, doc_id in zip([t for t in texts if t], ids) if doc_id is not None]
+
+    def new_insights(self, texts: list) -> list:
+        """Texts that are not near-duplicates of indexed insights, without indexing them."""
+        return [t for t in texts if t and not self.index.near_duplicates(t, DEDUP_THRESHOLD)]
+
+    def search_insights(self, keywords=None, k: int = 1):
+        """
+        Returns the most relevant insight for the keywords (BM25), or a random indexed insight
+        when no keywords are given or nothing matches.
+
+        :param keywords: Query string or list of keywords
+        :param k: Number of insights; k > 1 returns a list
         """
-        return random.choice(self.KNOWLEDGE_POOL)
+        results = [text for _, _, text in self.index.search(keywords, k)] if keywords else []
+        if not results:
+            ids = self.index.ids()
+            results = [self.index.get(i) for i in random.sample(ids, min(k, len(ids)))]
+        return results[0] if k == 1 else results
 
     def synthesize_prompt(self, insight: str) -> str:
         """
@@ -0,0 +1,237 @@
+"""
+strategy_dedup.py
+-----------------
+Collapses equivalent generated strategies before they are registered.
+Structural equivalence: the AST is canonicalized (docstrings and comments dropped, bound identifiers
+renamed in order of appearance, comparisons oriented one way, commutative operands sorted) and hashed.
+Behavioral equivalence: the strategy runs in the sandbox on a small fixed probe dataset and its
+signal vector is hashed, which also catches rewrites that the canonical form cannot see. Signals
+that barely fire or never change on the probe say nothing about the strategy, so they are not
+compared (only the structural fingerprint is recorded).
+"""
+
+import ast
+import copy
+import hashlib
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger("StrategyDedup")
+
+PROBE_BARS = 256
+# Non-hold probe bars a signal needs before it is compared behaviorally
+PROBE_MIN_SIGNALS = 8
+
+_SWAPPED = {ast.Gt: ast.Lt, ast.GtE: ast.LtE}
+_COMMUTATIVE = (ast.Mult, ast.BitAnd, ast.BitOr, ast.BitXor)
+
+
+def _preorder(node: ast.AST):
+    yield node
+    for child in ast.iter_child_nodes(node):
+        yield from _preorder(child)
+
+
+def _bound_names(tree: ast.AST) -> list:
+    """Identifiers the code binds itself, in order of first appearance."""
+    names = {}
+    for node in _preorder(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.setdefault(node.name, None)
+        elif isinstance(node, ast.arg):
+            names.setdefault(node.arg, None)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.setdefault(node.id, None)
+        elif isinstance(node, ast.alias):
+            names.setdefault(node.asname or node.name.split(".")[0], None)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.setdefault(node.name, None)
+    return list(names)
+
+
+class _Canonicalizer(ast.NodeTransformer):
+    def __init__(self, mapping: dict):
+        self.mapping = mapping
+
+    def _strip_docstring(self, node):
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            node.body = body[1:] or [ast.Pass()]
+        return node
+
+    def visit_Module(self, node):
+        return self._strip_docstring(self.generic_visit(node))
+
+    def visit_FunctionDef(self, node):
+        node = self._strip_docstring(self.generic_visit(node))
+        node.name = self.mapping.get(node.name, node.name)
+        node.returns = None
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        node = self._strip_docstring(self.generic_visit(node))
+        node.name = self.mapping.get(node.name, node.name)
+        return node
+
+    def visit_arg(self, node):
+        node.arg = self.mapping.get(node.arg, node.arg)
+        node.annotation = None
+        return node
+
+    def visit_Name(self, node):
+        node.id = self.mapping.get(node.id, node.id)
+        return node
+
+    def visit_alias(self, node):
+        bound = node.asname or node.name.split(".")[0]
+        node.asname = self.mapping.get(bound, bound)
+        return node
+
+    def visit_ExceptHandler(self, node):
+        node = self.generic_visit(node)
+        if node.name:
+            node.name = self.mapping.get(node.name, node.name)
+        return node
+
+    def visit_Compare(self, node):
+        node = self.generic_visit(node)
+        # a > b  ->  b < a
+        if len(node.ops) == 1 and type(node.ops[0]) in _SWAPPED:
+            node.left, node.comparators = node.comparators[0], [node.left]
+            node.ops = [_SWAPPED[type(node.ops[0])]()]
+        return node
+
+    def visit_BinOp(self, node):
+        node = self.generic_visit(node)
+        numeric = any(isinstance(side, ast.Constant) and isinstance(side.value, (int, float))
+                      and not isinstance(side.value, bool) for side in (node.left, node.right))
+        # Mult/&/|/^ commute for numbers and boolean masks; Add only when it is provably numeric
+        if isinstance(node.op, _COMMUTATIVE) or (isinstance(node.op, ast.Add) and numeric):
+            left, right = sorted((node.left, node.right), key=ast.dump)
+            node.left, node.right = left, right
+        return node
+
+
+def canonicalize(code: str) -> str:
+    """
+    Canonical form of strategy source; equal for code that differs only in identifier names,
+    comments, docstrings, annotations, comparison direction or the order of commutative operands.
+
+    :raises SyntaxError: If the code does not parse
+    """
+    tree = ast.parse(code)
+    mapping = {name: f"_v{i}" for i, name in enumerate(_bound_names(tree))}
+    tree = _Canonicalizer(mapping).visit(copy.deepcopy(tree))
+    return ast.dump(ast.fix_missing_locations(tree), annotate_fields=False)
+
+
+def structural_fingerprint(code: str) -> str:
+    return hashlib.sha256(canonicalize(code).encode()).hexdigest()
+
+
+def probe_candles(bars: int = PROBE_BARS) -> pd.DataFrame:
+    """
+    Fixed OHLCV probe series: trend up, crash, range and recovery with noise, so typical signals fire.
+    """
+    rng = np.random.default_rng(20240601)
+    phase = np.linspace(0, 1, bars)
+    drift = np.select([phase < 0.3, phase < 0.45, phase < 0.75], [0.004, -0.012, 0.0], 0.006)
+    log_close = np.cumsum(drift + 0.01 * np.sin(phase * 40) + rng.normal(0, 0.008, bars))
+    close = 100 * np.exp(log_close)
+    spread = np.abs(rng.normal(0, 0.004, bars)) * close
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(1_700_000_000_000 + np.arange(bars) * 3_600_000, unit='ms'),
+        'open': np.r_[close[0], close[:-1]],
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.lognormal(3, 0.5, bars),
+    })
+
+
+class StrategyDeduplicator:
+    """
+    Tracks the structural and behavioral fingerprints of registered generated strategies.
+    """
+
+    def __init__(self, behavioral: bool = True, sandbox=None):
+        """
+        :param behavioral: Also compare signals on the probe dataset (runs the code in the sandbox)
+        :param sandbox: SandboxPool for probe runs (defaults to the process-wide pool)
+        """
+        self.behavioral = behavioral
+        self.sandbox = sandbox
+        self._lock = threading.Lock()
+        self._structural = {}     # structural fingerprint -> name
+        self._behavior = {}       # signal hash on the probe data -> name
+        self._probe = None
+        self.duplicates = {}      # skipped name -> name it duplicates
+
+    def behavior_fingerprint(self, code: str, name: str = None) -> str:
+        """
+        Hash of the strategy's signal vector on the probe dataset.
+
+        :return: Hex digest, or None if the signal is constant or has fewer than PROBE_MIN_SIGNALS
+                 non-hold bars (too uninformative to compare)
+        :raises StrategyExecutionError/StrategyQuarantined: If the code fails in the sandbox
+        """
+        from backend.strategies.sandbox import get_sandbox
+
+        if self._probe is None:
+            self._probe = probe_candles()
+        signal = (self.sandbox or get_sandbox()).run(code, self._probe, name)
+        if np.count_nonzero(signal) < PROBE_MIN_SIGNALS or (signal == signal[0]).all():
+            return None
+        return hashlib.sha256(signal.tobytes()).hexdigest()
+
+    def check(self, name: str, code: str) -> str:
+        """
+        Records a strategy unless it duplicates a recorded one.
+
+        :return: Name of the equivalent recorded strategy, or None if `name` is new (and now recorded)
+        """
+        structural = structural_fingerprint(code)
+        with self._lock:
+            existing = self._structural.get(structural)
+        if existing == name:
+            return None
+        if existing is not None:
+            return self._duplicate(name, existing, "structure")
+
+        behavior = self.behavior_fingerprint(code, name) if self.behavioral else None
+        with self._lock:
+            existing = self._behavior.get(behavior) if behavior is not None else None
+            if existing is not None and existing != name:
+                self._structural.setdefault(structural, existing)
+            else:
+                self._structural[structural] = name
+                if behavior is not None:
+                    self._behavior[behavior] = name
+                return None
+        return self._duplicate(name, existing, "probe signals")
+
+    def _duplicate(self, name: str, existing: str, reason: str) -> str:
+        with self._lock:
+            self.duplicates[name] = existing
+        log.info(f"[StrategyDedup] ♻ {name} duplicates {existing} ({reason})")
+        return existing
+
+    def forget(self, name: str):
+        """Drops a strategy's fingerprints and duplicate records (called when it is unregistered)."""
+        with self._lock:
+            for table in (self._structural, self._behavior, self.duplicates):
+                for key in [k for k, v in table.items() if v == name]:
+                    del table[key]
+            self.duplicates.pop(name, None)
+
+    def __len__(self) -> int:
+        return len(set(self._structural.values()))
+
+
+# Process-wide deduplicator used by the synthesizer
+DEDUPLICATOR = StrategyDeduplicator()
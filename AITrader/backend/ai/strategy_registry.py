@@ -2,23 +2,23 @@
 strategy_registry.py
 --------------------
 Registers and manages dynamically generated trading strategies (LLM-based).
+Delegates to the unified registry in backend.strategies.registry, so generated and built-in
+strategies share one namespace.
 """
 
-from backend.strategies.classic import sma_crossover
-from backend.strategies.ai_generated import ai_rsi_boost
+from backend.strategies.registry import REGISTRY, get_strategy, list_strategies
 
-STRATEGY_REGISTRY = {
-    "sma_crossover": sma_crossover,
-    "ai_rsi_boost": ai_rsi_boost
-}
+STRATEGY_REGISTRY = REGISTRY
 
-def register_strategy(name: str, func) -> None:
-    """Registers a new strategy by name."""
-    STRATEGY_REGISTRY[name] = func
 
-def get_strategy(name: str):
-    """Returns the strategy function for a given name."""
-    return STRATEGY_REGISTRY.get(name)
+def register_strategy(name: str, func=None, code: str = None, **metadata) -> None:
+    """
+    Registers a generated strategy by name.
 
-def list_strategies():
-    return list(STRATEGY_REGISTRY.keys())
+    :param func: Loaded strategy function
+    :param code: Generated source, compiled on first use instead
+    """
+    if code is not None:
+        REGISTRY.register(name, code=code, source="generated", **metadata)
+    else:
+        REGISTRY.register(name, func, source="generated", **metadata)
@@ -2,46 +2,187 @@
 strategy_synthesizer.py
 ------------------------
 Generates strategy code from ideas using LLM and registers it live.
+Ideas are synthesized concurrently (bounded by LLM_CONCURRENCY) through a pluggable backend, and
+responses are cached on disk, so on startup previously generated strategies are registered at once
+while new ideas are fetched and synthesized in the background. Strategies equivalent to an already
+registered one (same canonical AST or same signals on the probe data) are not registered.
 """
 
-import openai
+import ast
+import asyncio
+import atexit
 import logging
+import os
+import threading
+from backend.ai.llm_backends import LLMBackend, ResponseCache, get_backend, prompt_hash
+from backend.ai.strategy_dedup import DEDUPLICATOR, StrategyDeduplicator
 from backend.ai.strategy_registry import register_strategy
-from backend.core import CONFIG
-from backend.ai.knowledge_scanner import scan_for_strategy_ideas
 
 log = logging.getLogger("Synthesizer")
 
-openai.api_key = CONFIG.get("OPENAI_API_KEY", "")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 4))
 
 SYSTEM_PROMPT = """
 You are a quantitative trading assistant. Based on the given insight, generate a simple Python trading strategy function that takes a pandas DataFrame with OHLCV data and returns the same DataFrame with a new 'signal' column containing 'buy', 'sell', or None.
 """
 
-def synthesize_strategy_from_text(text: str) -> str:
+_CACHE = None
+_EXPLORER = None
+_EXPLORER_LOCK = threading.Lock()
+
+
+def _default_cache() -> ResponseCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = ResponseCache()
+    return _CACHE
+
+
+def _default_explorer():
+    """Process-wide SelfExplorer, so refreshes share one open insight index."""
+    global _EXPLORER
+    with _EXPLORER_LOCK:
+        if _EXPLORER is None:
+            from backend.ai.self_explorer import SelfExplorer
+            _EXPLORER = SelfExplorer()
+            atexit.register(_EXPLORER.index.close)
+        return _EXPLORER
+
+
+def strategy_name(idea: str) -> str:
+    """Stable registry name of the strategy synthesized from an idea."""
+    return f"llm_auto_{prompt_hash(SYSTEM_PROMPT, idea)[:8]}"
+
+
+async def synthesize_async(text: str, backend: LLMBackend, cache: ResponseCache = None,
+                           semaphore: asyncio.Semaphore = None) -> str:
+    """
+    Synthesizes strategy code for one idea, answering from the cache when possible.
+
+    :return: Generated code, or "" if the backend failed (failures are not cached)
+    """
+    cache = cache if cache is not None else _default_cache()
+    cached = cache.get(SYSTEM_PROMPT, text, backend.model)
+    if cached is not None:
+        return cached
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": text}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        if semaphore is None:
+            code = await backend.complete(SYSTEM_PROMPT, text)
+        else:
+            async with semaphore:
+                code = await backend.complete(SYSTEM_PROMPT, text)
     except Exception as e:
         log.error(f"[Synthesizer] ❌ LLM failed: {e}")
         return ""
+    cache.put(SYSTEM_PROMPT, text, backend.model, code)
+    return code
+
+
+async def synthesize_many(ideas: list, backend: LLMBackend = None, cache: ResponseCache = None,
+                          concurrency: int = LLM_CONCURRENCY) -> list:
+    """
+    Synthesizes code for many ideas with at most `concurrency` backend calls in flight.
+    New responses are written to the cache file once, after the batch.
+
+    :return: Generated code per idea, in input order
+    """
+    backend = backend or get_backend()
+    cache = cache if cache is not None else _default_cache()
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        return await asyncio.gather(*(synthesize_async(idea, backend, cache, semaphore) for idea in ideas))
+    finally:
+        await asyncio.to_thread(cache.save)
+
+
+def synthesize_strategy_from_text(text: str, backend: LLMBackend = None, cache: ResponseCache = None) -> str:
+    """Blocking single-idea synthesis (see synthesize_async)."""
+    return asyncio.run(synthesize_many([text], backend, cache))[0]
 
-def auto_generate_strategies():
-    ideas = scan_for_strategy_ideas()
-    for idx, idea in enumerate(ideas):
-        code = synthesize_strategy_from_text(idea)
-        name = f"llm_auto_{idx}"
+
+def _register(idea: str, code: str, dedup: StrategyDeduplicator = None) -> str:
+    name = strategy_name(idea)
+    try:
+        # Syntax-checked and deduplicated here; the registry compiles it on first use and runs it sandboxed
+        ast.parse(code)
+        if (dedup if dedup is not None else DEDUPLICATOR).check(name, code) is not None:
+            return None
+        register_strategy(name, code=code, author="LLM", description=idea[:200])
+        return name
+    except Exception as e:
+        log.warning(f"[Synthesizer] ⚠ Could not load strategy {name}: {e}")
+        return None
+
+
+def register_cached_strategies(cache: ResponseCache = None, model: str = None,
+                               dedup: StrategyDeduplicator = None) -> list:
+    """
+    Registers every cached strategy without calling the LLM.
+
+    :param model: Only register responses of this model
+    :return: Registered names
+    """
+    cache = cache if cache is not None else _default_cache()
+    names = [name for idea, code in cache.entries(model) if code and (name := _register(idea, code, dedup))]
+    if names:
+        log.info(f"[Synthesizer] 📦 Registered {len(names)} cached strategies")
+    return names
+
+
+def refresh_strategies(ideas: list = None, backend: LLMBackend = None, cache: ResponseCache = None,
+                       concurrency: int = LLM_CONCURRENCY, dedup: StrategyDeduplicator = None,
+                       explorer=None) -> list:
+    """
+    Scans for new ideas (unless given), synthesizes them concurrently and registers the results.
+    Scanned ideas are indexed only once their strategy is registered or collapsed into an equivalent
+    one, so failed ones are retried on the next scan.
+
+    :param explorer: SelfExplorer whose insight index filters scanned ideas (defaults to the process-wide one)
+    :return: Registered names
+    """
+    scanned = ideas is None
+    if scanned:
+        from backend.ai.knowledge_scanner import scan_for_strategy_ideas
+        explorer = explorer or _default_explorer()
+        # Only insights that are not near-duplicates of indexed ones reach the LLM
+        ideas = explorer.new_insights(scan_for_strategy_ideas())
+    ideas = [idea for idea in ideas if idea]
+    dedup = dedup if dedup is not None else DEDUPLICATOR
+    codes = asyncio.run(synthesize_many(ideas, backend, cache, concurrency))
+    registered = [(idea, name) for idea, code in zip(ideas, codes) if code and (name := _register(idea, code, dedup))]
+    if scanned:
+        # Duplicates are settled too: synthesizing them again would only collapse them again
+        settled = [idea for idea, _ in registered] + [idea for idea in ideas if strategy_name(idea) in dedup.duplicates]
+        if settled:
+            explorer.add_insights(settled, source="scanner")
+    for _, name in registered:
+        log.info(f"[Synthesizer] ✅ Strategy registered: {name}")
+    return [name for _, name in registered]
+
+
+def auto_generate_strategies(ideas: list = None, backend: LLMBackend = None, cache: ResponseCache = None,
+                             background: bool = False, concurrency: int = LLM_CONCURRENCY,
+                             dedup: StrategyDeduplicator = None):
+    """
+    Registers cached strategies immediately, then synthesizes new ideas.
+
+    :param ideas: Ideas to synthesize (default: scan_for_strategy_ideas())
+    :param background: Run the refresh in a daemon thread instead of blocking
+    :param dedup: Deduplicator (defaults to the process-wide DEDUPLICATOR)
+    :return: The refresh thread if background, otherwise the names registered by the refresh
+    """
+    backend = backend or get_backend()
+    cache = cache if cache is not None else _default_cache()
+    register_cached_strategies(cache, backend.model, dedup)
+    if not background:
+        return refresh_strategies(ideas, backend, cache, concurrency, dedup)
+
+    def refresh():
         try:
-            local_scope = {}
-            exec(code, {}, local_scope)
-            strategy_fn = next(v for v in local_scope.values() if callable(v))
-            register_strategy(name, strategy_fn)
-            log.info(f"[Synthesizer] ✅ Strategy registered: {name}")
+            refresh_strategies(ideas, backend, cache, concurrency, dedup)
         except Exception as e:
-            log.warning(f"[Synthesizer] ⚠ Could not load strategy {name}: {e}")
+            log.error(f"[Synthesizer] ❌ Background refresh failed: {e}")
+
+    thread = threading.Thread(target=refresh, name="StrategyRefresh", daemon=True)
+    thread.start()
+    return thread
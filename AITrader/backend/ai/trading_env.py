@@ -0,0 +1,323 @@
+"""
+trading_env.py
+--------------
+Batched trading environment and parallel multi-episode Q-learning.
+BatchTradingEnv steps N independent episodes (different symbols and start offsets) at once as
+array operations over precomputed per-bar market states. ParallelTrainer shards episode batches
+across worker processes, each running from the current Q-table, and merges the returned tables
+by visit-weighted averaging after every round. Long runs can checkpoint the merged table to a
+model file (see model_store.py) and resume from it.
+
+Position model: BUY goes long, SELL goes short, HOLD keeps the position. The reward of a step is
+position * next-bar return minus `fee` per unit of position change.
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+import numpy as np
+import pandas as pd
+from backend.ai.model_store import ModelFormatError, data_range, load_model, save_model
+
+log = logging.getLogger("TradingEnv")
+
+RL_WORKERS = int(os.getenv("RL_WORKERS", os.cpu_count() or 1))
+
+ACTIONS = ['BUY', 'SELL', 'HOLD']
+BUY, SELL, HOLD = range(3)
+
+
+@dataclass(frozen=True)
+class StateFeatures:
+    """
+    Discretized state: return bin x volume z-score bin (x position when `position` is set).
+    Bins are given by their inner edges, so k edges make k + 1 bins.
+    """
+    return_lookback: int = 1
+    return_edges: tuple = (-0.002, 0.0, 0.002)
+    volume_window: int = 20
+    volume_edges: tuple = (-1.0, 1.0)
+    position: bool = True
+
+    @property
+    def n_market_states(self) -> int:
+        return (len(self.return_edges) + 1) * (len(self.volume_edges) + 1)
+
+    @property
+    def n_states(self) -> int:
+        return self.n_market_states * (3 if self.position else 1)
+
+    @property
+    def warmup(self) -> int:
+        """Bars before the first state with complete features."""
+        return max(self.return_lookback, self.volume_window - 1)
+
+    def market_states(self, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """Market state (without position) of every bar as int32."""
+        close = np.asarray(close, dtype=np.float64)
+        k = self.return_lookback
+        ret = np.zeros(len(close))
+        ret[k:] = close[k:] / close[:-k] - 1
+        rolling = pd.Series(volume, dtype=np.float64).rolling(self.volume_window, min_periods=2)
+        z = ((volume - rolling.mean()) / rolling.std()).to_numpy()
+        z = np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
+        rbin = np.digitize(ret, self.return_edges)
+        vbin = np.digitize(z, self.volume_edges)
+        return (rbin * (len(self.volume_edges) + 1) + vbin).astype(np.int32)
+
+    def state(self, market: np.ndarray, position: np.ndarray) -> np.ndarray:
+        return market * 3 + (position + 1) if self.position else market
+
+
+class BatchTradingEnv:
+    """
+    N parallel episodes of `episode_length` steps over one or more price series.
+    All series are concatenated into flat arrays, so an episode is just a moving flat index.
+    """
+
+    def __init__(self, series, n_envs: int = 64, episode_length: int = 256,
+                 features: StateFeatures = None, fee: float = 0.0005):
+        """
+        :param series: Symbol -> DataFrame with 'close' and 'volume' columns (or a list of DataFrames)
+        :param n_envs: Episodes stepped together
+        :param episode_length: Steps per episode
+        :param features: State discretization (default StateFeatures())
+        :param fee: Cost per unit of position change, as a fraction of price
+        """
+        frames = series if isinstance(series, dict) else dict(enumerate(series))
+        self.features = features or StateFeatures()
+        self.symbols = list(frames)
+        self.data_ranges = {str(symbol): data_range(df) for symbol, df in frames.items()}
+        self.n_envs = n_envs
+        self.episode_length = episode_length
+        self.fee = fee
+
+        warmup = self.features.warmup
+        markets, moves, starts, counts = [], [], [], []
+        offset = 0
+        for df in frames.values():
+            close = df['close'].to_numpy(dtype=np.float64)
+            markets.append(self.features.market_states(close, df['volume'].to_numpy(dtype=np.float64)))
+            move = np.zeros(len(close))
+            move[:-1] = close[1:] / close[:-1] - 1
+            moves.append(move)
+            # Episodes start after the warmup and need a next bar for their last reward
+            first, last = offset + warmup, offset + len(close) - episode_length - 1
+            starts.append(first)
+            counts.append(max(0, last - first + 1))
+            offset += len(close)
+        if not sum(counts):
+            raise ValueError(f"No series is long enough for episodes of {episode_length} steps")
+
+        self.market = np.concatenate(markets)
+        self.move = np.concatenate(moves)
+        self._first = np.array(starts)
+        self._counts = np.array(counts)
+        self._weights = self._counts / self._counts.sum()
+        self.symbol_index = np.zeros(n_envs, dtype=np.int64)
+        self.cursor = np.zeros(n_envs, dtype=np.int64)
+        self.position = np.zeros(n_envs, dtype=np.int64)
+        self.t = 0
+
+    @property
+    def n_states(self) -> int:
+        return self.features.n_states
+
+    def reset(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Starts N new episodes on random symbols (weighted by usable length) and random offsets.
+
+        :return: Initial states, shape (n_envs,)
+        """
+        self.symbol_index = rng.choice(len(self.symbols), size=self.n_envs, p=self._weights)
+        self.cursor = self._first[self.symbol_index] + rng.integers(0, self._counts[self.symbol_index])
+        self.position = np.zeros(self.n_envs, dtype=np.int64)
+        self.t = 0
+        return self.features.state(self.market[self.cursor], self.position)
+
+    def step(self, actions: np.ndarray):
+        """
+        Applies one action per episode.
+
+        :return: (next_states, rewards, done) with done True once the episodes are complete
+        """
+        position = np.where(actions == BUY, 1, np.where(actions == SELL, -1, self.position))
+        rewards = position * self.move[self.cursor] - self.fee * np.abs(position - self.position)
+        self.position = position
+        self.cursor += 1
+        self.t += 1
+        return self.features.state(self.market[self.cursor], position), rewards, self.t >= self.episode_length
+
+
+def run_episodes(env: BatchTradingEnv, q: np.ndarray, batches: int, rng: np.random.Generator,
+                 alpha: float = 0.1, gamma: float = 0.9, epsilon: float = 0.2):
+    """
+    Epsilon-greedy Q-learning over `batches` x n_envs episodes. Updates of one step are applied
+    together: each visited (state, action) moves by alpha times its mean TD error in that step.
+
+    :return: (q, visits, total_reward) with q updated in place and visits counted per (state, action)
+    """
+    n_actions = q.shape[1]
+    visits = np.zeros(q.size, dtype=np.int64)
+    total_reward = 0.0
+    flat_q = q.reshape(-1)
+    for _ in range(batches):
+        states, done = env.reset(rng), False
+        while not done:
+            explore = rng.random(env.n_envs) < epsilon
+            actions = np.where(explore, rng.integers(0, n_actions, env.n_envs), q[states].argmax(axis=1))
+            next_states, rewards, done = env.step(actions)
+            # Episodes are truncated rather than terminated, so the last step still bootstraps
+            td = rewards + gamma * q[next_states].max(axis=1) - q[states, actions]
+            cell = states * n_actions + actions
+            count = np.bincount(cell, minlength=q.size)
+            hit = count > 0
+            flat_q[hit] += alpha * np.bincount(cell, weights=td, minlength=q.size)[hit] / count[hit]
+            visits += count
+            total_reward += rewards.sum()
+            states = next_states
+    return q, visits.reshape(q.shape), total_reward
+
+
+@dataclass
+class TrainingResult:
+    q: np.ndarray                 # (n_states, n_actions) merged Q-table
+    visits: np.ndarray            # (n_states, n_actions) total updates
+    steps: int                    # environment steps (episodes x steps per episode)
+    seconds: float
+    mean_reward: list = field(default_factory=list)   # per round, per episode step
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.steps / self.seconds if self.seconds else float('inf')
+
+    def greedy_actions(self, states: np.ndarray) -> list:
+        return [ACTIONS[a] for a in self.q[states].argmax(axis=1)]
+
+
+_WORKER_ENV = None
+
+
+def _init_worker(env: BatchTradingEnv):
+    global _WORKER_ENV
+    _WORKER_ENV = env
+
+
+def _worker_round(q: np.ndarray, batches: int, seed: tuple, alpha: float, gamma: float, epsilon: float):
+    return run_episodes(_WORKER_ENV, q, batches, np.random.default_rng(seed), alpha, gamma, epsilon)
+
+
+def merge_q_tables(q: np.ndarray, results: list) -> np.ndarray:
+    """Visit-weighted average of the shards' Q-tables; cells no shard visited keep their value."""
+    visits = sum(v for _, v, _ in results)
+    weighted = sum(shard_q * v for shard_q, v, _ in results)
+    return np.where(visits > 0, weighted / np.maximum(visits, 1), q)
+
+
+class ParallelTrainer:
+    """
+    Shards episode batches across worker processes and merges Q-tables after every round.
+    Each worker receives the environment once and runs `sync_every` batches per round.
+    """
+
+    def __init__(self, env: BatchTradingEnv, workers: int = RL_WORKERS, shards: int = None,
+                 alpha: float = 0.1, gamma: float = 0.9, epsilon: float = 0.2):
+        """
+        :param workers: Worker processes (1 runs every shard in-process)
+        :param shards: Independent shards per round (defaults to workers); results depend on shards, not workers
+        """
+        self.env = env
+        self.workers = max(1, workers)
+        self.shards = shards or self.workers
+        self.alpha, self.gamma, self.epsilon = alpha, gamma, epsilon
+
+    def _run_meta(self, sync_every: int, seed: int) -> dict:
+        """Settings a checkpoint must match to be resumed."""
+        env = self.env
+        return {"features": asdict(env.features), "n_envs": env.n_envs, "episode_length": env.episode_length,
+                "fee": env.fee, "shards": self.shards, "sync_every": sync_every, "seed": seed,
+                "alpha": self.alpha, "gamma": self.gamma, "epsilon": self.epsilon, "actions": ACTIONS}
+
+    def save_checkpoint(self, path: str, q: np.ndarray, visits: np.ndarray, rounds_done: int,
+                        sync_every: int, seed: int, mean_reward: list) -> str:
+        meta = {"run": self._run_meta(sync_every, seed), "rounds_done": rounds_done,
+                "mean_reward": mean_reward, "data_range": self.env.data_ranges}
+        return save_model(path, "q_trainer", {"q": q, "visits": visits}, meta)
+
+    def load_checkpoint(self, path: str, sync_every: int, seed: int):
+        """
+        :return: (q, visits, rounds_done, mean_reward), or None if there is no checkpoint at path
+        :raises ModelFormatError: If the checkpoint belongs to a run with different settings
+        """
+        if not os.path.exists(path):
+            return None
+        model = load_model(path, "q_trainer")
+        # JSON turns tuples into lists; compare in the same form
+        expected = json.loads(json.dumps(self._run_meta(sync_every, seed)))
+        if model.meta["run"] != expected:
+            raise ModelFormatError(f"{path}: checkpoint was written by a run with different settings")
+        return (np.array(model.arrays["q"]), np.array(model.arrays["visits"]),
+                model.meta["rounds_done"], list(model.meta["mean_reward"]))
+
+    def train(self, rounds: int = 10, sync_every: int = 4, seed: int = 0, q: np.ndarray = None,
+              checkpoint: str = None, checkpoint_every: int = 1) -> TrainingResult:
+        """
+        :param rounds: Merge rounds
+        :param sync_every: Episode batches each shard runs between merges
+        :param q: Initial Q-table (zeros by default)
+        :param checkpoint: Model file to resume from (when present) and to save to every `checkpoint_every` rounds;
+                           a resumed run ends with the same Q-table as an uninterrupted one
+        :return: TrainingResult (steps and seconds cover the rounds run by this call)
+        """
+        q = np.zeros((self.env.n_states, len(ACTIONS))) if q is None else np.array(q, dtype=np.float64)
+        visits = np.zeros(q.shape, dtype=np.int64)
+        steps_per_round = self.shards * sync_every * self.env.n_envs * self.env.episode_length
+        mean_reward = []
+        first_round = 0
+        restored = self.load_checkpoint(checkpoint, sync_every, seed) if checkpoint else None
+        if restored is not None:
+            q, visits, first_round, mean_reward = restored
+            log.info(f"[TradingEnv] ♻ Resuming from {checkpoint} after {first_round} rounds")
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.env,))
+        t0 = time.perf_counter()
+        try:
+            for r in range(first_round, rounds):
+                seeds = [(seed, r, shard) for shard in range(self.shards)]
+                params = (self.alpha, self.gamma, self.epsilon)
+                if pool is None:
+                    results = [run_episodes(self.env, q.copy(), sync_every, np.random.default_rng(s), *params)
+                               for s in seeds]
+                else:
+                    results = list(pool.map(_worker_round, *zip(*[(q, sync_every, s, *params) for s in seeds])))
+                q = merge_q_tables(q, results)
+                visits += sum(v for _, v, _ in results)
+                mean_reward.append(float(sum(total for _, _, total in results)) / steps_per_round)
+                if checkpoint and ((r + 1) % checkpoint_every == 0 or r + 1 == rounds):
+                    self.save_checkpoint(checkpoint, q, visits, r + 1, sync_every, seed, mean_reward)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        seconds = time.perf_counter() - t0
+
+        result = TrainingResult(q, visits, max(0, rounds - first_round) * steps_per_round, seconds, mean_reward)
+        log.info(f"[TradingEnv] 🧠 {result.steps} env steps in {seconds:.2f}s "
+                 f"({result.steps_per_second:,.0f} steps/s, {self.workers} workers, {self.shards} shards)")
+        return result
+
+
+def train_parallel(series, rounds: int = 10, workers: int = RL_WORKERS, sync_every: int = 4,
+                   n_envs: int = 64, episode_length: int = 256, features: StateFeatures = None,
+                   fee: float = 0.0005, seed: int = 0, **params) -> TrainingResult:
+    """
+    Builds a BatchTradingEnv over the series and trains with a ParallelTrainer.
+
+    :param series: Symbol -> OHLCV DataFrame (or a list of DataFrames)
+    :param params: alpha, gamma, epsilon
+    """
+    env = BatchTradingEnv(series, n_envs, episode_length, features, fee)
+    return ParallelTrainer(env, workers, **params).train(rounds, sync_every, seed)
@@ -35,5 +35,9 @@ CONFIG = {
     "DEFAULT_EXCHANGE": DEFAULT_EXCHANGE,
     "DEFAULT_SYMBOL": os.getenv("DEFAULT_SYMBOL", "BTC/USDT"),
     "DEFAULT_TIMEFRAME": os.getenv("DEFAULT_TIMEFRAME", "1m"),
-    "DEFAULT_STRATEGY": os.getenv("DEFAULT_STRATEGY", "sma_crossover")
+    "DEFAULT_STRATEGY": os.getenv("DEFAULT_STRATEGY", "sma_crossover"),
+    "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
+    "CRYPTOPANIC_API_KEY": os.getenv("CRYPTOPANIC_API_KEY"),
+    "LLM_BACKEND": os.getenv("LLM_BACKEND", "openai"),
+    "LLM_MODEL": os.getenv("LLM_MODEL", "gpt-4")
 }
@@ -11,16 +11,22 @@ import os
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_FILE = os.getenv("LOG_FILE", "cache/trading_bot.log")
 
-os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format='[%(asctime)s] %(levelname)s %(name)s: %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+
+def configure_logging(level: str = LOG_LEVEL, log_file: str = LOG_FILE):
+    """Installs the file and console handlers (no-op if logging is already configured)."""
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    logging.basicConfig(
+        level=level,
+        format='[%(asctime)s] %(levelname)s %(name)s: %(message)s',
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
+
+
+configure_logging()
+
 
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
@@ -5,8 +5,10 @@ orchestrator.py
 The brain of the bot — coordinates data ingestion, strategy evaluation, signal processing, and storage.
 """
 
-from backend.data import MarketDataIngestor, DatabaseClient
+import asyncio
+from backend.data import MarketDataIngestor, WriteBehindWriter
 from backend.services import TradingService, SignalProcessor
+from backend.strategies import get_strategy, run_strategy
 
 class TradingOrchestrator:
     """
@@ -20,31 +22,60 @@ class TradingOrchestrator:
         self.strategy_name = strategy_name
 
         self.ingestor = MarketDataIngestor(exchange, symbol, timeframe)
-        self.database = DatabaseClient()
-        self.trader = TradingService(strategy_name)
+        self.writer = WriteBehindWriter()
+        self.trader = TradingService(exchange)
         self.signal_processor = SignalProcessor()
 
     def run_once(self):
         """
         Executes one full cycle: ingest, evaluate, process, store.
         """
-        # Step 1: Fetch market data
-        df = self.ingestor.fetch_and_store(to_csv=False)
+        # Step 1: Fetch only the candles closed since the last cycle, then read the window from the store
+        self.ingestor.sync()
+        df = self.ingestor.load_latest(limit=500)
+        return self._run_cycle(df)
 
-        # Step 2: Generate signals
-        df = self.trader.evaluate(df)
+    def _run_cycle(self, df):
+        """Evaluates, processes and stores a window of candles."""
+        # Step 2: Generate signals (the strategy module is imported on first use)
+        strategy = get_strategy(self.strategy_name)
+        if strategy is None:
+            raise ValueError(f"Strategy not found: {self.strategy_name}")
+        df = run_strategy(strategy, df)
 
         # Step 3: Process signals into trade actions
         actions = self.signal_processor.process_signals(df)
         df = df.iloc[1:]  # Align with actions (signals are delayed by one step)
         df['action'] = actions
 
-        # Step 4: Store signals and OHLCV
-        self.database.insert_ohlcv(df, symbol=self.symbol, timeframe=self.timeframe)
-        self.database.insert_signals(df, symbol=self.symbol, strategy=self.strategy_name)
+        # Step 4: Queue signals and OHLCV for the write-behind writer (never blocks on a commit)
+        self.writer.submit_ohlcv(df, symbol=self.symbol, timeframe=self.timeframe)
+        self.writer.submit_signals(df, symbol=self.symbol, strategy=self.strategy_name)
 
         return df
 
+    def on_candle(self, event):
+        """
+        Handles a streamed market event. Closed candles are stored and trigger a full cycle;
+        in-progress updates and trades are ignored.
+
+        :param event: MarketEvent from a CandleStream
+        :return: Processed DataFrame, or None if no cycle ran
+        """
+        if event.kind != 'candle' or not event.closed:
+            return None
+        self.ingestor.ingest(event.to_frame())
+        return self._run_cycle(self.ingestor.load_latest(limit=500))
+
+    async def run_stream(self, stream):
+        """
+        Consumes a CandleStream for the configured symbol, resyncing from the last stored candle.
+        Cycles run in a worker thread so the event loop keeps draining the feed.
+        """
+        since = self.ingestor.high_water_mark()
+        async for event in stream.subscribe(self.symbol, self.timeframe, since=since):
+            await asyncio.to_thread(self.on_candle, event)
+
     def shutdown(self):
-        """Closes database connections, cleans up resources."""
-        self.database.close()
+        """Flushes pending writes, closes database connections, cleans up resources."""
+        self.writer.close()
@@ -2,6 +2,7 @@
 scheduler.py
 -------------
 Auto-run strategy orchestrator on a timed interval (e.g., every N minutes).
+Additional maintenance jobs (e.g. database compaction) can run on their own intervals.
 """
 
 import threading
@@ -16,25 +17,57 @@ class StrategyScheduler:
         self.interval = interval_minutes * 60  # in seconds
         self._running = False
         self._thread = None
+        self._wakeup = threading.Event()
+        self._jobs = []
+
+    def add_job(self, func, interval_minutes, name=None):
+        """
+        Registers a periodic job that runs on the scheduler thread.
+
+        :param func: Callable taking no arguments; its return value is logged
+        :param interval_minutes: Minutes between runs (the first run is one interval after start)
+        :param name: Label used in logs
+        """
+        self._jobs.append({
+            "func": func,
+            "interval": interval_minutes * 60,
+            "name": name or getattr(func, "__qualname__", "job"),
+            "next": time.time() + interval_minutes * 60
+        })
 
     def _run_loop(self):
+        next_run = time.time()
         while self._running:
-            try:
-                log.info("[Scheduler] ⏱ Running scheduled strategy...")
-                self.orchestrator.run_once()
-            except Exception as e:
-                log.error(f"[Scheduler] ❌ Error during run: {e}")
-            time.sleep(self.interval)
+            if time.time() >= next_run:
+                try:
+                    log.info("[Scheduler] ⏱ Running scheduled strategy...")
+                    self.orchestrator.run_once()
+                except Exception as e:
+                    log.error(f"[Scheduler] ❌ Error during run: {e}")
+                next_run = time.time() + self.interval
+
+            for job in self._jobs:
+                if self._running and time.time() >= job["next"]:
+                    try:
+                        log.info(f"[Scheduler] 🔧 Running {job['name']}: {job['func']()}")
+                    except Exception as e:
+                        log.error(f"[Scheduler] ❌ Error during {job['name']}: {e}")
+                    job["next"] = time.time() + job["interval"]
+
+            due = min([next_run] + [job["next"] for job in self._jobs])
+            self._wakeup.wait(max(due - time.time(), 0))
 
     def start(self):
         if not self._running:
             log.info("[Scheduler] ✅ Scheduler started")
             self._running = True
+            self._wakeup.clear()
             self._thread = threading.Thread(target=self._run_loop, daemon=True)
             self._thread.start()
 
     def stop(self):
         self._running = False
+        self._wakeup.set()
         if self._thread:
             self._thread.join()
             log.info("[Scheduler] 🛑 Scheduler stopped")
@@ -7,4 +7,9 @@ Initializes the data module and exposes key ingestion and storage components.
 
 from .api_mapper import ExchangeAPIMapper, SUPPORTED_EXCHANGES
 from .ingestor import MarketDataIngestor
+from .async_ingestor import AsyncMarketDataIngestor
 from .database import DatabaseClient
+from .writer import WriteBehindWriter
+from .ohlcv_store import OHLCVStore
+from .resampler import TimeframeResampler, resample_ohlcv
+from .stream import CandleStream, ReplayServer, ReplaySource, MarketEvent
@@ -6,14 +6,26 @@ Supports multiple exchanges using unified format.
 """
 
 import os
+import time
+import logging
 import ccxt
 import pandas as pd
+from backend.data.exchange_pool import get_exchange, load_markets
+
+log = logging.getLogger("APIMapper")
 
 SUPPORTED_EXCHANGES = {
     "HTX": "htx",
     "CoinEx": "coinex"
 }
 
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Converts a ccxt timeframe string (e.g. '1m', '4h') to milliseconds."""
+    return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
 class ExchangeAPIMapper:
     """
     A unified interface to pull OHLCV and ticker data from supported exchanges.
@@ -23,22 +35,64 @@ class ExchangeAPIMapper:
         if exchange_name not in ccxt.exchanges:
             raise ValueError(f"Exchange '{exchange_name}' not supported by ccxt.")
 
-        self.exchange = getattr(ccxt, exchange_name)({
-            'apiKey': os.getenv("API_KEY"),
-            'secret': os.getenv("API_SECRET")
-        })
+        self.exchange = get_exchange(exchange_name, os.getenv("API_KEY"), os.getenv("API_SECRET"))
 
-    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 500) -> pd.DataFrame:
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 500, since: int = None) -> pd.DataFrame:
         """
         Fetches historical OHLCV data.
 
         :param symbol: Market pair (e.g. 'BTC/USDT')
         :param timeframe: OHLCV timeframe (e.g. '1m', '5m', '1h')
         :param limit: Number of candles to fetch
+        :param since: Optional epoch-ms timestamp of the first candle
         :return: DataFrame with standardized OHLCV columns
         """
-        raw = self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-        df = pd.DataFrame(raw, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        raw = self._with_backoff(self.exchange.fetch_ohlcv, symbol, timeframe=timeframe, since=since, limit=limit)
+        return self._to_frame(raw)
+
+    def fetch_ohlcv_since(self, symbol: str, timeframe: str, since: int, until: int = None,
+                          page_limit: int = 1000) -> pd.DataFrame:
+        """
+        Fetches every candle from `since` up to `until` (or now), paging through the exchange limit.
+
+        :param since: Epoch-ms timestamp of the first candle
+        :param until: Optional inclusive epoch-ms timestamp of the last candle
+        :param page_limit: Candles requested per call
+        :return: DataFrame with standardized OHLCV columns
+        """
+        step = timeframe_to_ms(timeframe)
+        stop = until if until is not None else int(time.time() * 1000)
+        pages, cursor = [], since
+        while cursor <= stop:
+            raw = self._with_backoff(self.exchange.fetch_ohlcv, symbol, timeframe=timeframe, since=cursor,
+                                     limit=page_limit)
+            raw = [candle for candle in raw if cursor <= candle[0] <= stop]
+            if not raw:
+                break
+            pages.extend(raw)
+            cursor = raw[-1][0] + step
+        return self._to_frame(pages)
+
+    def _with_backoff(self, call, *args, max_retries: int = 5, **kwargs):
+        """
+        Retries transient network and rate-limit errors with exponential backoff. Markets come from the
+        pool first (memory or its disk cache), so ccxt never has to fetch them itself for the call.
+        """
+        delay = max(getattr(self.exchange, 'rateLimit', 1000), 100) / 1000
+        for attempt in range(max_retries):
+            try:
+                load_markets(self.exchange)
+                return call(*args, **kwargs)
+            except ccxt.NetworkError as e:
+                if attempt == max_retries - 1:
+                    raise
+                log.warning(f"[APIMapper] ⏳ {type(e).__name__}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+
+    @staticmethod
+    def _to_frame(raw: list) -> pd.DataFrame:
+        df = pd.DataFrame(raw, columns=OHLCV_COLUMNS)
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         return df
 
@@ -49,7 +103,7 @@ class ExchangeAPIMapper:
         :param symbol: Market pair
         :return: Ticker dictionary
         """
-        return self.exchange.fetch_ticker(symbol)
+        return self._with_backoff(self.exchange.fetch_ticker, symbol)
 
     def list_markets(self) -> list:
         """
@@ -57,5 +111,5 @@ class ExchangeAPIMapper:
 
         :return: List of market symbols
         """
-        markets = self.exchange.load_markets()
+        markets = load_markets(self.exchange)
         return list(markets.keys())
@@ -0,0 +1,135 @@
+"""
+async_ingestor.py
+-----------------
+Concurrent multi-symbol OHLCV ingestion built on ccxt.async_support.
+One client (and therefore one HTTP session) is shared per exchange, and in-flight
+requests are bounded so the exchange rate limit is respected. Synchronous callers
+go through run(), which keeps its own event loop so the session survives between
+calls; close() ends it.
+"""
+
+import asyncio
+import logging
+import pandas as pd
+import ccxt.async_support as ccxt_async
+from backend.data.api_mapper import OHLCV_COLUMNS
+from backend.data.ohlcv_store import OHLCVStore
+
+log = logging.getLogger("AsyncIngestor")
+
+MAX_CONCURRENCY = 16
+
+
+class AsyncMarketDataIngestor:
+    """
+    Fetches OHLCV for many (symbol, timeframe) pairs concurrently over a pooled session.
+    """
+
+    def __init__(self, exchange: str = 'htx', max_concurrency: int = None, store: OHLCVStore = None, client=None):
+        """
+        :param exchange: ccxt exchange id
+        :param max_concurrency: Upper bound on in-flight requests (derived from the rate limit if None)
+        :param store: Optional columnar store to append fetched candles to
+        :param client: Optional pre-built async exchange client (e.g. a local stub)
+        """
+        if client is None and exchange not in ccxt_async.exchanges:
+            raise ValueError(f"Exchange '{exchange}' not supported by ccxt.")
+        self.exchange_id = exchange
+        self.store = store
+        self._client = client
+        self._owns_client = client is None
+        self._max_concurrency = max_concurrency
+        self._loop = None     # event loop of the blocking run() helper (the client is bound to it)
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = getattr(ccxt_async, self.exchange_id)({'enableRateLimit': True})
+        return self._client
+
+    @property
+    def max_concurrency(self) -> int:
+        """In-flight request bound: one request per rate-limit slot per second, capped at MAX_CONCURRENCY."""
+        if self._max_concurrency:
+            return self._max_concurrency
+        rate_limit_ms = getattr(self.client, 'rateLimit', 100) or 100
+        return max(1, min(MAX_CONCURRENCY, int(1000 / rate_limit_ms)))
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 500, since: int = None) -> pd.DataFrame:
+        """
+        Fetches one series.
+
+        :return: DataFrame with standardized OHLCV columns
+        """
+        raw = await self.client.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+        df = pd.DataFrame(raw, columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    async def fetch_many(self, pairs: list, limit: int = 500, since=None, persist: bool = False) -> dict:
+        """
+        Fetches many series concurrently. Failed pairs are logged and left out of the result.
+
+        :param pairs: List of (symbol, timeframe) tuples
+        :param limit: Candles per series
+        :param since: Optional epoch-ms start, either one value or a dict keyed by (symbol, timeframe)
+        :param persist: Append each series to the store as soon as it arrives
+        :return: Dict of (symbol, timeframe) -> DataFrame
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(pair):
+            symbol, timeframe = pair
+            start = since.get(pair) if isinstance(since, dict) else since
+            async with semaphore:
+                df = await self.fetch_ohlcv(symbol, timeframe, limit=limit, since=start)
+            if persist and self.store is not None:
+                await asyncio.to_thread(self.store.append, df, symbol, timeframe)
+            return df
+
+        results = await asyncio.gather(*(fetch(pair) for pair in pairs), return_exceptions=True)
+
+        frames = {}
+        for pair, result in zip(pairs, results):
+            if isinstance(result, Exception):
+                log.error(f"[AsyncIngestor] ❌ {pair[0]} {pair[1]} failed: {result}")
+            else:
+                frames[pair] = result
+        return frames
+
+    async def aclose(self):
+        """Closes the shared HTTP session if this ingestor created the client."""
+        if self._client is not None and self._owns_client:
+            await self._client.close()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    def run(self, pairs: list, limit: int = 500, since=None, persist: bool = False) -> dict:
+        """
+        Blocking helper for synchronous callers. The session stays open across calls
+        (on a private event loop) until close().
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.fetch_many(pairs, limit=limit, since=since, persist=persist))
+
+    def close(self):
+        """Blocking counterpart of aclose() for run() callers: closes the session and the event loop."""
+        if self._loop is None:
+            return
+        try:
+            self._loop.run_until_complete(self.aclose())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
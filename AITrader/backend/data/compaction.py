@@ -0,0 +1,177 @@
+"""
+compaction.py
+-------------
+Retention and rollup compaction for the market_data SQLite database.
+Raw candles older than the retention window are folded into stored rollups (e.g. 1h/1d),
+old signals are pruned, and freed pages are returned to the OS with incremental vacuum
+so the job never takes a blocking full VACUUM.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+import numpy as np
+from backend.data.api_mapper import timeframe_to_ms
+from backend.data.database import DB_PATH, DatabaseClient
+from backend.data.resampler import resample_arrays
+
+log = logging.getLogger("Compaction")
+
+RAW_RETENTION_DAYS = int(os.getenv("RAW_RETENTION_DAYS", 30))
+SIGNAL_RETENTION_DAYS = int(os.getenv("SIGNAL_RETENTION_DAYS", 90))
+DAY_MS = 86_400_000
+
+
+class DatabaseCompactor:
+    """
+    Incremental compaction job, safe to run periodically from StrategyScheduler.
+    Each day of raw data is rolled up and deleted in its own short transaction.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, raw_timeframe: str = '1m', raw_retention_days: int = RAW_RETENTION_DAYS,
+                 rollup_timeframes: tuple = ('1h', '1d'), signal_retention_days: int = SIGNAL_RETENTION_DAYS,
+                 vacuum_pages: int = 2048):
+        """
+        :param raw_timeframe: Timeframe of the raw series that is rolled up and pruned
+        :param raw_retention_days: Days of raw candles to keep
+        :param rollup_timeframes: Timeframes to materialize before pruning (must divide one day)
+        :param signal_retention_days: Days of signals to keep
+        :param vacuum_pages: Pages released per incremental_vacuum step
+        """
+        for tf in rollup_timeframes:
+            if DAY_MS % timeframe_to_ms(tf):
+                raise ValueError(f"Rollup timeframe {tf} must divide one day")
+        self.db_path = db_path
+        self.raw_timeframe = raw_timeframe
+        self.raw_retention_days = raw_retention_days
+        self.rollup_timeframes = rollup_timeframes
+        self.signal_retention_days = signal_retention_days
+        self.vacuum_pages = vacuum_pages
+
+    def run(self, now_ms: int = None) -> dict:
+        """
+        Runs one compaction pass.
+
+        :param now_ms: Reference time in epoch-ms (defaults to now)
+        :return: Report with rows rolled up/pruned, bytes reclaimed and elapsed seconds
+        """
+        t0 = time.perf_counter()
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        raw_cutoff = (now_ms - self.raw_retention_days * DAY_MS) // DAY_MS * DAY_MS  # whole days only
+        signal_cutoff = now_ms - self.signal_retention_days * DAY_MS
+
+        client = DatabaseClient(self.db_path)
+        conn = client.conn
+        size_before = self._file_size(conn)
+        report = {"raw_rows_pruned": 0, "rollup_rows_written": 0, "signals_pruned": 0}
+        try:
+            symbols = [row[0] for row in conn.execute(
+                "SELECT DISTINCT symbol FROM ohlcv WHERE timeframe = ?", (self.raw_timeframe,))]
+            for symbol in symbols:
+                pruned, written = self._compact_series(client, symbol, raw_cutoff)
+                report["raw_rows_pruned"] += pruned
+                report["rollup_rows_written"] += written
+
+            keys = conn.execute("SELECT DISTINCT symbol, strategy FROM signals").fetchall()
+            for symbol, strategy in keys:
+                with conn:
+                    cur = conn.execute("DELETE FROM signals WHERE symbol = ? AND strategy = ? AND timestamp < ?",
+                                       (symbol, strategy, signal_cutoff))
+                report["signals_pruned"] += cur.rowcount
+            self._incremental_vacuum(conn)
+
+            report["bytes_reclaimed"] = size_before - self._file_size(conn)
+            report["free_pages"] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            client.close()
+
+        report["elapsed_s"] = round(time.perf_counter() - t0, 3)
+        log.info(f"[Compaction] 🧹 {report}")
+        return report
+
+    def _compact_series(self, client: DatabaseClient, symbol: str, cutoff: int) -> tuple:
+        conn = client.conn
+        first = conn.execute("SELECT MIN(timestamp) FROM ohlcv WHERE symbol = ? AND timeframe = ?",
+                             (symbol, self.raw_timeframe)).fetchone()[0]
+        if first is None or first >= cutoff:
+            return 0, 0
+
+        pruned = written = 0
+        for day_start in range(first // DAY_MS * DAY_MS, cutoff, DAY_MS):
+            day_end = day_start + DAY_MS
+            rows = conn.execute('''
+                SELECT timestamp, open, high, low, close, volume FROM ohlcv
+                WHERE symbol = ? AND timeframe = ? AND timestamp >= ? AND timestamp < ?
+                ORDER BY timestamp
+            ''', (symbol, self.raw_timeframe, day_start, day_end)).fetchall()
+            if not rows:
+                continue
+
+            arr = np.array(rows, dtype=np.float64)
+            cols = {'timestamp': arr[:, 0].astype(np.int64), 'open': arr[:, 1], 'high': arr[:, 2],
+                    'low': arr[:, 3], 'close': arr[:, 4], 'volume': arr[:, 5]}
+            with conn:
+                for tf in self.rollup_timeframes:
+                    written += self._upsert_rollups(conn, symbol, tf, cols)
+                cur = conn.execute("DELETE FROM ohlcv WHERE symbol = ? AND timeframe = ? AND timestamp >= ? "
+                                   "AND timestamp < ?", (symbol, self.raw_timeframe, day_start, day_end))
+                pruned += cur.rowcount
+            self._incremental_vacuum(conn)
+        return pruned, written
+
+    def _upsert_rollups(self, conn: sqlite3.Connection, symbol: str, timeframe: str, cols: dict) -> int:
+        """
+        Writes the rollups of one day of raw candles, merging into rollups already stored for the same
+        buckets. Raw rows are deleted once compacted, so a conflicting rollup means a later backfill of
+        bars the stored rollup did not cover: high/low/volume are combined, and the backfill's open/close
+        only replace the stored ones when the backfill holds the bucket's first/last raw bar.
+
+        :param cols: Sorted raw column arrays of one day
+        :return: Number of rollup rows written
+        """
+        tf_ms, raw_ms = timeframe_to_ms(timeframe), timeframe_to_ms(self.raw_timeframe)
+        bars = resample_arrays(cols, tf_ms)
+        ts = cols['timestamp']
+        buckets = ts - ts % tf_ms
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        ends = np.concatenate((starts[1:], [len(ts)])) - 1
+        opens_bucket = ts[starts] == bars['timestamp']
+        closes_bucket = ts[ends] == bars['timestamp'] + tf_ms - raw_ms
+
+        n = len(bars['timestamp'])
+        conn.executemany('''
+            INSERT INTO ohlcv (symbol, timeframe, timestamp, open, high, low, close, volume)
+            VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8)
+            ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE SET
+                open = CASE WHEN ?9 THEN excluded.open ELSE open END,
+                high = MAX(high, excluded.high), low = MIN(low, excluded.low),
+                close = CASE WHEN ?10 THEN excluded.close ELSE close END,
+                volume = volume + excluded.volume
+        ''', zip([symbol] * n, [timeframe] * n,
+                 *(bars[c].tolist() for c in ('timestamp', 'open', 'high', 'low', 'close', 'volume')),
+                 opens_bucket.tolist(), closes_bucket.tolist()))
+        return n
+
+    def _incremental_vacuum(self, conn: sqlite3.Connection):
+        """Releases up to `vacuum_pages` free pages. A no-op unless auto_vacuum is INCREMENTAL."""
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            conn.execute(f"PRAGMA incremental_vacuum({self.vacuum_pages})").fetchall()
+
+    @staticmethod
+    def _file_size(conn: sqlite3.Connection) -> int:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return conn.execute("PRAGMA page_count").fetchone()[0] * page_size
+
+    def enable_incremental_vacuum(self):
+        """
+        One-off conversion of a database created before auto_vacuum=INCREMENTAL was the default.
+        This runs a full VACUUM once; run it during maintenance, not from the scheduler.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+        finally:
+            conn.close()
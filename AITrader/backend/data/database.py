@@ -7,70 +7,158 @@ Handles persistent storage of market data, signals, trades, and metadata using S
 
 import os
 import sqlite3
+from itertools import repeat
+import numpy as np
 import pandas as pd
+from backend.data.ohlcv_store import to_epoch_ms, time_bound_ms
 
 DB_PATH = os.getenv("DB_PATH", "cache/market_data.db")
 
+PRAGMAS = {
+    "auto_vacuum": "INCREMENTAL",  # only takes effect on new databases; lets compaction reclaim space
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,        # 64 MiB page cache
+    "mmap_size": 268435456,      # 256 MiB memory-mapped I/O
+}
+
+OHLCV_TABLE = '''
+    CREATE TABLE IF NOT EXISTS ohlcv (
+        symbol TEXT NOT NULL,
+        timeframe TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        volume REAL,
+        PRIMARY KEY (symbol, timeframe, timestamp)
+    ) WITHOUT ROWID
+'''
+
+SIGNALS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS signals (
+        symbol TEXT NOT NULL,
+        strategy TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        signal INTEGER,
+        PRIMARY KEY (symbol, strategy, timestamp)
+    ) WITHOUT ROWID
+'''
+
+
 class DatabaseClient:
     """
     Basic SQLite client for storing and retrieving market data and signals.
+    Candles are keyed by (symbol, timeframe, timestamp) with integer epoch-ms timestamps,
+    so repeated inserts of the same candles are idempotent upserts.
     """
 
     def __init__(self, db_path: str = DB_PATH):
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.cursor = self.conn.cursor()
+        for name, value in PRAGMAS.items():
+            self.cursor.execute(f"PRAGMA {name}={value}")
         self._initialize_schema()
 
     def _initialize_schema(self):
-        """Creates required tables if they do not exist."""
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS ohlcv (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT,
-                timestamp TEXT,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                volume REAL,
-                timeframe TEXT
-            )
-        ''')
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS signals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT,
-                timestamp TEXT,
-                signal INTEGER,
-                strategy TEXT
-            )
-        ''')
+        """Creates required tables if they do not exist, migrating legacy row tables first."""
+        self.migrate_legacy_schema()
+        self.cursor.execute(OHLCV_TABLE)
+        self.cursor.execute(SIGNALS_TABLE)
         self.conn.commit()
 
-    def insert_ohlcv(self, df: pd.DataFrame, symbol: str, timeframe: str):
-        """Inserts OHLCV records into the database."""
-        records = [
-            (symbol, str(row['timestamp']), row['open'], row['high'], row['low'], row['close'], row['volume'], timeframe)
-            for _, row in df.iterrows()
-        ]
+    def _columns(self, table: str) -> set:
+        return {row[1] for row in self.cursor.execute(f"PRAGMA table_info({table})")}
+
+    def migrate_legacy_schema(self):
+        """
+        One-shot migration from the original autoincrement tables with TEXT timestamps.
+        Rows are deduplicated on the new keys, keeping the most recently inserted copy.
+        """
+        ohlcv_cols = self._columns("ohlcv")
+        signal_cols = self._columns("signals")
+        if "id" not in ohlcv_cols and "id" not in signal_cols:
+            return
+
+        to_ms = "CAST(ROUND((julianday(timestamp) - 2440587.5) * 86400000) AS INTEGER)"
+        with self.conn:
+            if "id" in ohlcv_cols:
+                self.cursor.execute("ALTER TABLE ohlcv RENAME TO ohlcv_legacy")
+                self.cursor.execute(OHLCV_TABLE)
+                self.cursor.execute(f'''
+                    INSERT OR REPLACE INTO ohlcv (symbol, timeframe, timestamp, open, high, low, close, volume)
+                    SELECT symbol, timeframe, {to_ms}, open, high, low, close, volume
+                    FROM ohlcv_legacy WHERE timestamp IS NOT NULL ORDER BY id
+                ''')
+                self.cursor.execute("DROP TABLE ohlcv_legacy")
+            if "id" in signal_cols:
+                self.cursor.execute("ALTER TABLE signals RENAME TO signals_legacy")
+                self.cursor.execute(SIGNALS_TABLE)
+                self.cursor.execute(f'''
+                    INSERT OR REPLACE INTO signals (symbol, strategy, timestamp, signal)
+                    SELECT symbol, strategy, {to_ms}, signal
+                    FROM signals_legacy WHERE timestamp IS NOT NULL ORDER BY id
+                ''')
+                self.cursor.execute("DROP TABLE signals_legacy")
+
+    def insert_ohlcv(self, df: pd.DataFrame, symbol: str, timeframe: str, commit: bool = True):
+        """Upserts OHLCV records into the database. Pass commit=False to batch several writes in one transaction."""
+        if df.empty:
+            return
+        records = zip(
+            repeat(symbol), repeat(timeframe), to_epoch_ms(df['timestamp']).tolist(),
+            *(df[col].to_numpy(dtype=np.float64).tolist() for col in ('open', 'high', 'low', 'close', 'volume'))
+        )
         self.cursor.executemany('''
-            INSERT INTO ohlcv (symbol, timestamp, open, high, low, close, volume, timeframe)
+            INSERT INTO ohlcv (symbol, timeframe, timestamp, open, high, low, close, volume)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE SET
+                open = excluded.open, high = excluded.high, low = excluded.low,
+                close = excluded.close, volume = excluded.volume
         ''', records)
-        self.conn.commit()
+        if commit:
+            self.conn.commit()
 
-    def insert_signals(self, df: pd.DataFrame, symbol: str, strategy: str):
-        """Inserts strategy signals into the database."""
-        records = [
-            (symbol, str(row['timestamp']), row['signal'], strategy)
-            for _, row in df.iterrows()
-            if 'signal' in row and row['signal'] != 0
-        ]
+    def insert_signals(self, df: pd.DataFrame, symbol: str, strategy: str, commit: bool = True):
+        """Upserts non-zero strategy signals into the database. Pass commit=False to batch writes."""
+        if 'signal' not in df.columns or df.empty:
+            return
+        mask = (df['signal'] != 0).to_numpy() & df['signal'].notna().to_numpy()
+        records = zip(
+            repeat(symbol), repeat(strategy),
+            to_epoch_ms(df['timestamp'].to_numpy()[mask]).tolist(),
+            df['signal'].to_numpy()[mask].tolist()
+        )
         self.cursor.executemany('''
-            INSERT INTO signals (symbol, timestamp, signal, strategy)
+            INSERT INTO signals (symbol, strategy, timestamp, signal)
             VALUES (?, ?, ?, ?)
+            ON CONFLICT (symbol, strategy, timestamp) DO UPDATE SET signal = excluded.signal
         ''', records)
-        self.conn.commit()
+        if commit:
+            self.conn.commit()
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Reads candles for one series over an optional time range using the primary key.
+
+        :param start: Inclusive lower bound (epoch-ms, datetime, date or string)
+        :param end: Inclusive upper bound; a plain date includes that whole day
+        :return: OHLCV DataFrame with datetime timestamps
+        """
+        start_ms = time_bound_ms(start)
+        end_ms = time_bound_ms(end, end=True)
+        rows = self.cursor.execute('''
+            SELECT timestamp, open, high, low, close, volume FROM ohlcv
+            WHERE symbol = ? AND timeframe = ? AND timestamp BETWEEN ? AND ?
+            ORDER BY timestamp
+        ''', (symbol, timeframe,
+              start_ms if start_ms is not None else -2 ** 63,
+              end_ms if end_ms is not None else 2 ** 63 - 1)).fetchall()
+        df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+        return df
 
     def close(self):
         self.conn.close()
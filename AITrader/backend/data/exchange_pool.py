@@ -0,0 +1,124 @@
+"""
+exchange_pool.py
+----------------
+Process-wide pool of ccxt exchange clients with a disk-backed market metadata cache.
+Every component asking for the same exchange and credentials shares one client, and
+`load_markets()` is answered from disk while the cached copy is younger than the TTL.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import ccxt
+
+log = logging.getLogger("ExchangePool")
+
+MARKETS_CACHE_PATH = os.getenv("MARKETS_CACHE_PATH", "cache/markets")
+MARKETS_CACHE_TTL = int(os.getenv("MARKETS_CACHE_TTL", 6 * 3600))  # seconds
+
+
+class ExchangeClientPool:
+    """
+    Thread-safe registry handing out one ccxt client per (exchange, credential set, options).
+    """
+
+    def __init__(self, cache_dir: str = MARKETS_CACHE_PATH, ttl: int = MARKETS_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._clients = {}
+        self._market_locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(exchange_id: str, api_key: str, secret: str, options: dict) -> tuple:
+        credentials = hashlib.sha256(f"{api_key}:{secret}".encode()).hexdigest()
+        return exchange_id, credentials, json.dumps(options or {}, sort_keys=True)
+
+    def get(self, exchange_id: str, api_key: str = None, secret: str = None, options: dict = None):
+        """
+        Returns the shared client for an exchange and credential set, creating it on first use.
+
+        :param exchange_id: ccxt exchange id (e.g. 'htx')
+        :param api_key: API key, or None for public endpoints
+        :param secret: API secret
+        :param options: ccxt options such as {"defaultType": "future"}
+        :return: ccxt exchange instance
+        """
+        if exchange_id not in ccxt.exchanges:
+            raise ValueError(f"Exchange '{exchange_id}' not supported by ccxt.")
+
+        key = self._key(exchange_id, api_key, secret, options)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                config = {'apiKey': api_key, 'secret': secret, 'enableRateLimit': True}
+                if options:
+                    config['options'] = dict(options)
+                client = getattr(ccxt, exchange_id)(config)
+                self._clients[key] = client
+                self._market_locks[id(client)] = threading.Lock()
+            return client
+
+    def _cache_path(self, client) -> str:
+        market_type = (getattr(client, 'options', None) or {}).get('defaultType', 'default')
+        return os.path.join(self.cache_dir, f"{client.id}_{market_type}.json")
+
+    def load_markets(self, client, reload: bool = False) -> dict:
+        """
+        Ensures a client has its markets loaded, preferring memory, then a fresh disk cache,
+        and only then the exchange.
+
+        :param client: Client obtained from this pool
+        :param reload: Force a network refresh
+        :return: Markets dict keyed by symbol
+        """
+        with self._lock:
+            lock = self._market_locks.setdefault(id(client), threading.Lock())
+
+        with lock:
+            if client.markets and not reload:
+                return client.markets
+
+            path = self._cache_path(client)
+            if not reload and os.path.exists(path) and time.time() - os.path.getmtime(path) < self.ttl:
+                try:
+                    with open(path) as f:
+                        cached = json.load(f)
+                    client.set_markets(cached['markets'], cached.get('currencies'))
+                    return client.markets
+                except (OSError, ValueError, KeyError) as e:
+                    log.warning(f"[ExchangePool] ⚠ Ignoring unreadable markets cache {path}: {e}")
+
+            markets = client.load_markets(reload=reload)
+            self._write_cache(path, {'markets': markets, 'currencies': client.currencies})
+            return markets
+
+    @staticmethod
+    def _write_cache(path: str, payload: dict):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f, default=str)
+        os.replace(tmp, path)
+
+    def clear(self):
+        """Drops all pooled clients (cached market files are kept)."""
+        with self._lock:
+            self._clients.clear()
+            self._market_locks.clear()
+
+
+EXCHANGE_POOL = ExchangeClientPool()
+
+
+def get_exchange(exchange_id: str, api_key: str = None, secret: str = None, options: dict = None):
+    """Shortcut for EXCHANGE_POOL.get()."""
+    return EXCHANGE_POOL.get(exchange_id, api_key, secret, options)
+
+
+def load_markets(client, reload: bool = False) -> dict:
+    """Shortcut for EXCHANGE_POOL.load_markets()."""
+    return EXCHANGE_POOL.load_markets(client, reload)
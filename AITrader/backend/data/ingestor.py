@@ -6,12 +6,12 @@ Fetches, processes, and stores historical or live market data from supported exc
 Can be scheduled or triggered manually.
 """
 
-import os
+import logging
 import pandas as pd
-from backend.data.api_mapper import ExchangeAPIMapper
+from backend.data.api_mapper import ExchangeAPIMapper, timeframe_to_ms
+from backend.data.ohlcv_store import OHLCVStore, to_epoch_ms, time_bound_ms
 
-DATA_PATH = os.getenv("DATA_PATH", "cache/market_data")
-os.makedirs(DATA_PATH, exist_ok=True)
+log = logging.getLogger("Ingestor")
 
 class MarketDataIngestor:
     """
@@ -19,27 +19,130 @@ class MarketDataIngestor:
     """
 
     def __init__(self, exchange: str = 'htx', symbol: str = 'BTC/USDT', timeframe: str = '1m'):
+        self.exchange = exchange
         self.mapper = ExchangeAPIMapper(exchange)
+        self.store = OHLCVStore(exchange=exchange)
         self.symbol = symbol
         self.timeframe = timeframe
+        self._high_water = {}  # (exchange, symbol, timeframe) -> newest stored candle (epoch-ms)
 
-    def fetch_and_store(self, limit: int = 500, to_csv: bool = True) -> pd.DataFrame:
+    def fetch_and_store(self, limit: int = 500, persist: bool = True) -> pd.DataFrame:
         """
         Downloads and optionally saves OHLCV data.
 
         :param limit: Number of candles to fetch
-        :param to_csv: Whether to store as CSV
+        :param persist: Whether to append the candles to the columnar store
         :return: Fetched DataFrame
         """
         df = self.mapper.fetch_ohlcv(symbol=self.symbol, timeframe=self.timeframe, limit=limit)
 
-        if to_csv:
-            filename = f"{self.symbol.replace('/', '_')}_{self.timeframe}.csv"
-            path = os.path.join(DATA_PATH, filename)
-            df.to_csv(path, index=False)
+        if persist:
+            self.store.append(df, symbol=self.symbol, timeframe=self.timeframe)
 
         return df
 
+    def high_water_mark(self, symbol: str = None, timeframe: str = None):
+        """
+        Returns the newest stored candle timestamp (epoch-ms) for a series, or None if nothing is stored.
+        """
+        key = (self.exchange, symbol or self.symbol, timeframe or self.timeframe)
+        if key not in self._high_water:
+            self._high_water[key] = self.store.last_timestamp(key[1], key[2])
+        return self._high_water[key]
+
+    def sync(self, symbol: str = None, timeframe: str = None, initial_limit: int = 500) -> pd.DataFrame:
+        """
+        Fetches only candles at or after the high-water mark and appends them to the store.
+        The last stored candle is re-fetched because it may still have been open.
+
+        :param initial_limit: Candles to fetch when nothing is stored yet
+        :return: DataFrame of the fetched candles
+        """
+        symbol, timeframe = symbol or self.symbol, timeframe or self.timeframe
+        since = self.high_water_mark(symbol, timeframe)
+        if since is None:
+            df = self.mapper.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=initial_limit)
+        else:
+            df = self.mapper.fetch_ohlcv_since(symbol, timeframe, since=since)
+
+        self.ingest(df, symbol, timeframe)
+        return df
+
+    def ingest(self, df: pd.DataFrame, symbol: str = None, timeframe: str = None) -> int:
+        """
+        Appends externally obtained candles (e.g. from a stream) and advances the high-water mark.
+
+        :return: Number of candles written
+        """
+        if df.empty:
+            return 0
+        symbol, timeframe = symbol or self.symbol, timeframe or self.timeframe
+        written = self.store.append(df, symbol=symbol, timeframe=timeframe)
+        newest = int(to_epoch_ms(df['timestamp']).max())
+        hwm = self.high_water_mark(symbol, timeframe)
+        self._high_water[(self.exchange, symbol, timeframe)] = newest if hwm is None else max(newest, hwm)
+        return written
+
+    def find_gaps(self, start=None, end=None, symbol: str = None, timeframe: str = None) -> list:
+        """
+        Lists missing candle ranges in the stored series.
+
+        :return: List of inclusive (first_missing_ms, last_missing_ms) tuples
+        """
+        symbol, timeframe = symbol or self.symbol, timeframe or self.timeframe
+        return self.store.find_gaps(symbol, timeframe, timeframe_to_ms(timeframe), start, end)
+
+    def backfill(self, start, end=None, symbol: str = None, timeframe: str = None) -> int:
+        """
+        Fills every hole between `start` and `end` (default: the high-water mark) with paginated,
+        rate-limited requests. On a cold start this downloads the full history from `start`.
+
+        :param start: First candle wanted (epoch-ms, datetime, date or string)
+        :param end: Last candle wanted
+        :return: Number of candles written
+        """
+        symbol, timeframe = symbol or self.symbol, timeframe or self.timeframe
+        start_ms = time_bound_ms(start)
+        end_ms = time_bound_ms(end, end=True)
+        if end_ms is None:
+            end_ms = self.high_water_mark(symbol, timeframe)
+        if end_ms is None:
+            self.sync(symbol, timeframe)
+            end_ms = self.high_water_mark(symbol, timeframe)
+            if end_ms is None:
+                return 0
+
+        written = 0
+        for gap_start, gap_end in self.find_gaps(start_ms, end_ms, symbol, timeframe):
+            log.info(f"[Ingestor] ⛏ Backfilling {symbol} {timeframe} from {gap_start} to {gap_end}")
+            df = self.mapper.fetch_ohlcv_since(symbol, timeframe, since=gap_start, until=gap_end)
+            written += self.store.append(df, symbol=symbol, timeframe=timeframe)
+
+        hwm = self.store.last_timestamp(symbol, timeframe)
+        self._high_water[(self.exchange, symbol, timeframe)] = hwm
+        return written
+
+    def load_latest(self, limit: int = 500, symbol: str = None, timeframe: str = None) -> pd.DataFrame:
+        """
+        Reads the most recent `limit` stored candles of a series.
+        """
+        symbol, timeframe = symbol or self.symbol, timeframe or self.timeframe
+        hwm = self.high_water_mark(symbol, timeframe)
+        if hwm is None:
+            return self.store.fetch_ohlcv_range(symbol, timeframe)
+        start = hwm - (limit - 1) * timeframe_to_ms(timeframe)
+        return self.store.fetch_ohlcv_range(symbol, timeframe, start, hwm).tail(limit).reset_index(drop=True)
+
+    def load_range(self, start=None, end=None) -> pd.DataFrame:
+        """
+        Reads stored candles for the configured symbol and timeframe.
+
+        :param start: Inclusive lower bound
+        :param end: Inclusive upper bound
+        :return: OHLCV DataFrame backed by memory-mapped columns
+        """
+        return self.store.fetch_ohlcv_range(self.symbol, self.timeframe, start, end)
+
     def get_markets(self) -> list:
         """
         Lists all tradable symbols on the configured exchange.
@@ -0,0 +1,303 @@
+"""
+ohlcv_store.py
+--------------
+Columnar, memory-mapped OHLCV storage.
+
+Candles are partitioned as ``{root}/{exchange}/{symbol}/{timeframe}/{YYYY-MM-DD}/``
+with one raw binary file per column (int64 epoch-ms timestamps, float prices/volume).
+Partitions are appended to in place, and range reads come back as memory-mapped
+NumPy views instead of being parsed from CSV or SQLite rows.
+"""
+
+import datetime
+import json
+import os
+import numpy as np
+import pandas as pd
+
+DATA_PATH = os.getenv("DATA_PATH", "cache/market_data")
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+DAY_MS = 86_400_000
+SCHEMA_FILE = "_schema.json"
+
+
+def to_epoch_ms(values) -> np.ndarray:
+    """
+    Converts timestamps (datetime64, pandas Timestamps, strings or integers) to int64 epoch milliseconds.
+
+    :param values: Array-like of timestamps
+    :return: int64 NumPy array
+    """
+    arr = np.asarray(values)
+    if np.issubdtype(arr.dtype, np.integer):
+        return arr.astype(np.int64, copy=False)
+    if np.issubdtype(arr.dtype, np.floating):
+        return arr.astype(np.int64)
+    if not np.issubdtype(arr.dtype, np.datetime64):
+        arr = pd.to_datetime(pd.Series(values), utc=True).dt.tz_localize(None).to_numpy()
+    return arr.astype('datetime64[ms]').astype(np.int64)
+
+
+def time_bound_ms(value, end: bool = False):
+    """Normalizes a range bound to epoch-ms. Plain dates used as end bounds cover the whole day."""
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if end and isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return int(to_epoch_ms([value + datetime.timedelta(days=1)])[0]) - 1
+    return int(to_epoch_ms([value])[0])
+
+
+class OHLCVStore:
+    """
+    Append-only columnar candle store backed by memory-mapped files.
+    """
+
+    def __init__(self, root: str = DATA_PATH, exchange: str = 'htx', float_dtype=np.float64):
+        """
+        :param root: Base directory for the store
+        :param exchange: Exchange namespace for all series in this store
+        :param float_dtype: dtype for price/volume columns of newly created series (float64 or float32)
+        """
+        self.root = os.path.join(root, exchange)
+        self.exchange = exchange
+        self.float_dtype = np.dtype(float_dtype)
+
+    # ------------------------------------------------------------------ layout
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol.replace('/', '_').replace(':', '_'), timeframe)
+
+    @staticmethod
+    def _day_name(day: int) -> str:
+        return (datetime.date(1970, 1, 1) + datetime.timedelta(days=int(day))).isoformat()
+
+    @staticmethod
+    def _day_from_name(name: str) -> int:
+        return (datetime.date.fromisoformat(name) - datetime.date(1970, 1, 1)).days
+
+    def _schema(self, symbol: str, timeframe: str, create: bool = False) -> dict:
+        series_dir = self._series_dir(symbol, timeframe)
+        path = os.path.join(series_dir, SCHEMA_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                return {col: np.dtype(dt) for col, dt in json.load(f).items()}
+
+        schema = {col: np.dtype(np.int64) if col == 'timestamp' else self.float_dtype for col in OHLCV_COLUMNS}
+        if create:
+            os.makedirs(series_dir, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump({col: dt.str for col, dt in schema.items()}, f)
+        return schema
+
+    def partitions(self, symbol: str, timeframe: str) -> list:
+        """
+        Lists the stored day partitions of a series.
+
+        :return: Sorted list of days since the epoch
+        """
+        series_dir = self._series_dir(symbol, timeframe)
+        if not os.path.isdir(series_dir):
+            return []
+        return sorted(self._day_from_name(name) for name in os.listdir(series_dir) if name != SCHEMA_FILE)
+
+    # ------------------------------------------------------------------ reads
+
+    def _open_partition(self, path: str, schema: dict) -> dict:
+        """Memory-maps every column of a partition. Columns are truncated to a common length."""
+        sizes = {col: os.path.getsize(os.path.join(path, f"{col}.bin")) // schema[col].itemsize
+                 if os.path.exists(os.path.join(path, f"{col}.bin")) else 0
+                 for col in OHLCV_COLUMNS}
+        rows = min(sizes.values())
+        if rows == 0:
+            return {col: np.empty(0, dtype=schema[col]) for col in OHLCV_COLUMNS}
+        return {
+            col: np.memmap(os.path.join(path, f"{col}.bin"), dtype=schema[col], mode='r', shape=(rows,))
+            for col in OHLCV_COLUMNS
+        }
+
+    def read_range(self, symbol: str, timeframe: str, start=None, end=None) -> dict:
+        """
+        Reads a time range as a dict of column arrays.
+        Reads inside a single day partition are zero-copy memory-mapped views.
+
+        :param start: Inclusive lower bound (epoch-ms, datetime, date or string)
+        :param end: Inclusive upper bound; a plain date includes that whole day
+        :return: Dict of column name -> NumPy array
+        """
+        schema = self._schema(symbol, timeframe)
+        start_ms, end_ms = time_bound_ms(start), time_bound_ms(end, end=True)
+        days = self.partitions(symbol, timeframe)
+        if start_ms is not None:
+            days = [d for d in days if d >= start_ms // DAY_MS]
+        if end_ms is not None:
+            days = [d for d in days if d <= end_ms // DAY_MS]
+
+        chunks = []
+        for day in days:
+            cols = self._open_partition(os.path.join(self._series_dir(symbol, timeframe), self._day_name(day)), schema)
+            ts = cols['timestamp']
+            lo = 0 if start_ms is None else int(np.searchsorted(ts, start_ms, side='left'))
+            hi = len(ts) if end_ms is None else int(np.searchsorted(ts, end_ms, side='right'))
+            if hi > lo:
+                chunks.append({col: arr[lo:hi] for col, arr in cols.items()})
+
+        if not chunks:
+            return {col: np.empty(0, dtype=schema[col]) for col in OHLCV_COLUMNS}
+        if len(chunks) == 1:
+            return chunks[0]
+        return {col: np.concatenate([c[col] for c in chunks]) for col in OHLCV_COLUMNS}
+
+    def fetch_ohlcv_range(self, symbol: str, timeframe: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Reads a time range as a standard OHLCV DataFrame.
+
+        :param symbol: Market pair (e.g. 'BTC/USDT')
+        :param timeframe: OHLCV timeframe (e.g. '1m')
+        :param start: Inclusive lower bound
+        :param end: Inclusive upper bound
+        :return: DataFrame with 'timestamp' as datetime64[ms]
+        """
+        cols = self.read_range(symbol, timeframe, start, end)
+        data = {col: np.asarray(arr) for col, arr in cols.items()}
+        data['timestamp'] = data['timestamp'].view('datetime64[ms]')
+        return pd.DataFrame(data, columns=OHLCV_COLUMNS, copy=False)
+
+    def last_timestamp(self, symbol: str, timeframe: str):
+        """
+        Returns the newest stored candle timestamp in epoch-ms, or None if the series is empty.
+        """
+        schema = self._schema(symbol, timeframe)
+        for day in reversed(self.partitions(symbol, timeframe)):
+            ts = self._open_partition(os.path.join(self._series_dir(symbol, timeframe), self._day_name(day)),
+                                      schema)['timestamp']
+            if len(ts):
+                return int(ts[-1])
+        return None
+
+    def first_timestamp(self, symbol: str, timeframe: str):
+        """
+        Returns the oldest stored candle timestamp in epoch-ms, or None if the series is empty.
+        """
+        schema = self._schema(symbol, timeframe)
+        for day in self.partitions(symbol, timeframe):
+            ts = self._open_partition(os.path.join(self._series_dir(symbol, timeframe), self._day_name(day)),
+                                      schema)['timestamp']
+            if len(ts):
+                return int(ts[0])
+        return None
+
+    def _partition_state(self, symbol: str, timeframe: str) -> dict:
+        """
+        Snapshot of a series' partition files, used to detect writes from any store instance or process.
+
+        :return: Dict of day -> (size, mtime_ns) of the partition's last-written column file
+        """
+        series_dir = self._series_dir(symbol, timeframe)
+        state = {}
+        for day in self.partitions(symbol, timeframe):
+            try:
+                st = os.stat(os.path.join(series_dir, self._day_name(day), f"{OHLCV_COLUMNS[-1]}.bin"))
+                state[day] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                state[day] = None
+        return state
+
+    def changes_since(self, symbol: str, timeframe: str, state: dict = None):
+        """
+        Reports which part of a series changed on disk since an earlier snapshot, so caches built
+        on it know what is stale (including backfills behind the newest candle).
+
+        :param state: State returned by an earlier call (None: just read the current one)
+        :return: (current state, start of the oldest changed day partition in epoch-ms, or None if
+                 nothing changed)
+        """
+        current = self._partition_state(symbol, timeframe)
+        if state is None:
+            return current, None
+        changed = [day for day in current.keys() | state.keys() if current.get(day) != state.get(day)]
+        return current, min(changed) * DAY_MS if changed else None
+
+    def find_gaps(self, symbol: str, timeframe: str, step_ms: int, start=None, end=None) -> list:
+        """
+        Finds missing candle ranges in a series.
+
+        :param step_ms: Candle duration in milliseconds
+        :param start: Optional expected first candle; a missing head is reported as a gap
+        :param end: Optional expected last candle; a missing tail is reported as a gap
+        :return: List of inclusive (first_missing_ms, last_missing_ms) tuples
+        """
+        start_ms, end_ms = time_bound_ms(start), time_bound_ms(end, end=True)
+        ts = self.read_range(symbol, timeframe, start_ms, end_ms)['timestamp']
+        if len(ts) == 0:
+            return [(start_ms, end_ms)] if start_ms is not None and end_ms is not None else []
+
+        gaps = []
+        if start_ms is not None and ts[0] - step_ms >= start_ms:
+            gaps.append((start_ms, int(ts[0]) - step_ms))
+        holes = np.flatnonzero(np.diff(ts) > step_ms)
+        gaps.extend((int(ts[i]) + step_ms, int(ts[i + 1]) - step_ms) for i in holes)
+        if end_ms is not None and ts[-1] + step_ms <= end_ms:
+            gaps.append((int(ts[-1]) + step_ms, end_ms))
+        return gaps
+
+    # ------------------------------------------------------------------ writes
+
+    def append(self, df: pd.DataFrame, symbol: str, timeframe: str) -> int:
+        """
+        Appends candles to the store. Rows overlapping stored timestamps replace them,
+        so re-appending the still-open last candle is safe.
+
+        :param df: DataFrame with OHLCV columns
+        :return: Number of rows written
+        """
+        if df is None or len(df) == 0:
+            return 0
+
+        schema = self._schema(symbol, timeframe, create=True)
+        ts = to_epoch_ms(df['timestamp'])
+        order = np.argsort(ts, kind='stable')
+        ts = ts[order]
+        keep = np.append(ts[1:] != ts[:-1], True)  # last occurrence wins
+        cols = {'timestamp': ts[keep]}
+        for col in OHLCV_COLUMNS[1:]:
+            cols[col] = np.asarray(df[col], dtype=schema[col])[order][keep]
+
+        ts = cols['timestamp']
+        days = ts // DAY_MS
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(ts)]))
+
+        series_dir = self._series_dir(symbol, timeframe)
+        for lo, hi in zip(starts, ends):
+            path = os.path.join(series_dir, self._day_name(days[lo]))
+            self._write_partition(path, {col: arr[lo:hi] for col, arr in cols.items()}, schema)
+        return len(ts)
+
+    def _write_partition(self, path: str, new: dict, schema: dict):
+        """Appends sorted, unique rows to a partition, merging only the overlapping tail."""
+        os.makedirs(path, exist_ok=True)
+        existing = self._open_partition(path, schema)
+        stored_ts = existing['timestamp']
+        idx = int(np.searchsorted(stored_ts, new['timestamp'][0], side='left'))
+
+        if idx < len(stored_ts):
+            merged = {col: np.concatenate((np.array(existing[col][idx:]), new[col])) for col in OHLCV_COLUMNS}
+            order = np.argsort(merged['timestamp'], kind='stable')
+            ts = merged['timestamp'][order]
+            keep = np.append(ts[1:] != ts[:-1], True)
+            new = {col: arr[order][keep] for col, arr in merged.items()}
+        del existing, stored_ts
+
+        # Overwrite from the merge point instead of truncating first: the merged tail is never
+        # shorter than the stored one, so views handed out by read_range stay backed by the file.
+        for col in OHLCV_COLUMNS:
+            file_path = os.path.join(path, f"{col}.bin")
+            with open(file_path, "r+b" if os.path.exists(file_path) else "wb") as f:
+                f.seek(idx * schema[col].itemsize)
+                f.write(np.ascontiguousarray(new[col], dtype=schema[col]).tobytes())
+                if f.tell() < os.fstat(f.fileno()).st_size:
+                    f.truncate()  # drop rows left behind by an interrupted write
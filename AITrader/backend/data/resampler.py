@@ -0,0 +1,154 @@
+"""
+resampler.py
+------------
+Derives higher timeframes (5m, 15m, 1h, 4h, 1d, ...) from stored base candles.
+Aggregation is vectorized (first/max/min/last/sum via ufunc.reduceat), and materialized
+rollups are cached and extended incrementally as new base candles arrive. A rollup is
+rebuilt from the oldest base candle that changed, so backfills behind the newest candle
+(or before the first one) are picked up too.
+"""
+
+from collections import OrderedDict
+import threading
+import numpy as np
+import pandas as pd
+from backend.data.api_mapper import timeframe_to_ms
+from backend.data.ohlcv_store import OHLCVStore, OHLCV_COLUMNS, time_bound_ms
+
+
+def resample_arrays(cols: dict, target_ms: int) -> dict:
+    """
+    Aggregates sorted OHLCV column arrays into bars of `target_ms`, aligned to the epoch (UTC).
+
+    :param cols: Dict of column arrays with int64 epoch-ms 'timestamp'
+    :param target_ms: Target bar duration in milliseconds
+    :return: Dict of aggregated column arrays
+    """
+    ts = np.asarray(cols['timestamp'])
+    if len(ts) == 0:
+        return {col: np.asarray(cols[col])[:0] for col in OHLCV_COLUMNS}
+
+    buckets = ts - ts % target_ms
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(ts)])) - 1
+    return {
+        'timestamp': buckets[starts],
+        'open': np.asarray(cols['open'])[starts],
+        'high': np.maximum.reduceat(np.asarray(cols['high']), starts),
+        'low': np.minimum.reduceat(np.asarray(cols['low']), starts),
+        'close': np.asarray(cols['close'])[ends],
+        'volume': np.add.reduceat(np.asarray(cols['volume']), starts),
+    }
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """
+    Resamples an OHLCV DataFrame to a coarser timeframe.
+
+    :param df: DataFrame with OHLCV columns sorted by timestamp
+    :param timeframe: Target timeframe (e.g. '15m', '1h')
+    :return: Resampled DataFrame
+    """
+    cols = {col: df[col].to_numpy() for col in OHLCV_COLUMNS[1:]}
+    cols['timestamp'] = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+    return _to_frame(resample_arrays(cols, timeframe_to_ms(timeframe)))
+
+
+def _to_frame(cols: dict) -> pd.DataFrame:
+    data = dict(cols)
+    data['timestamp'] = np.asarray(cols['timestamp']).view('datetime64[ms]')
+    return pd.DataFrame(data, columns=OHLCV_COLUMNS)
+
+
+class TimeframeResampler:
+    """
+    Serves any timeframe from a single canonical base series in an OHLCVStore.
+    The most recently used rollups are kept in memory and extended incrementally.
+    The last bar of a rollup may be partial while its bucket is still filling.
+    """
+
+    def __init__(self, store: OHLCVStore, base_timeframe: str = '1m', max_cached: int = 32):
+        self.store = store
+        self.base_timeframe = base_timeframe
+        self.base_ms = timeframe_to_ms(base_timeframe)
+        self.max_cached = max_cached
+        self._cache = OrderedDict()   # (symbol, timeframe) -> {'cols', 'from', 'first', 'base_hwm', 'state'}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str, timeframe: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Returns bars for a timeframe, resampled from the base series.
+
+        :param start: Inclusive lower bound (epoch-ms, datetime, date or string)
+        :param end: Inclusive upper bound; a plain date includes that whole day
+        :return: OHLCV DataFrame
+        """
+        if timeframe == self.base_timeframe:
+            return self.store.fetch_ohlcv_range(symbol, timeframe, start, end)
+        target_ms = timeframe_to_ms(timeframe)
+        if target_ms % self.base_ms:
+            raise ValueError(f"{timeframe} is not a multiple of the base timeframe {self.base_timeframe}")
+        if not self.store.partitions(symbol, self.base_timeframe):
+            # No canonical series yet: serve whatever was stored at this timeframe directly
+            return self.store.fetch_ohlcv_range(symbol, timeframe, start, end)
+
+        start_ms, end_ms = time_bound_ms(start), time_bound_ms(end, end=True)
+        with self._lock:
+            entry = self._materialize(symbol, timeframe, target_ms, start_ms)
+            cols = entry['cols']
+
+        ts = cols['timestamp']
+        lo = 0 if start_ms is None else int(np.searchsorted(ts, start_ms - start_ms % target_ms, side='left'))
+        hi = len(ts) if end_ms is None else int(np.searchsorted(ts, end_ms, side='right'))
+        return _to_frame({col: arr[lo:hi] for col, arr in cols.items()})
+
+    def refresh(self, symbol: str):
+        """Extends every cached rollup of a symbol with base candles that arrived since it was built."""
+        with self._lock:
+            for (cached_symbol, timeframe) in list(self._cache):
+                if cached_symbol == symbol:
+                    self._materialize(symbol, timeframe, timeframe_to_ms(timeframe), None)
+
+    def _materialize(self, symbol: str, timeframe: str, target_ms: int, start_ms) -> dict:
+        key = (symbol, timeframe)
+        entry = self._cache.get(key)
+        base_tf = self.base_timeframe
+        # Disk state first: a write landing while the base is read shows up as a change next time
+        state, written = self.store.changes_since(symbol, base_tf, None if entry is None else entry['state'])
+        base_first = self.store.first_timestamp(symbol, base_tf)
+        base_hwm = self.store.last_timestamp(symbol, base_tf)
+        wanted = None if start_ms is None else start_ms - start_ms % target_ms
+
+        rebuild, rebuild_from = entry is None, wanted
+        if entry is not None:
+            # A rollup built from a start bound does not cover an earlier (or unbounded) request
+            if entry['from'] is not None and (wanted is None or wanted < entry['from']):
+                rebuild, rebuild_from = True, wanted
+            # Base candles older than the rollup's first bar were backfilled
+            elif base_first is not None and max(base_first - base_first % target_ms, entry['from'] or 0) < entry['first']:
+                rebuild, rebuild_from = True, entry['from']
+
+        if rebuild:
+            base = self.store.read_range(symbol, base_tf, rebuild_from)
+            cols = resample_arrays(base, target_ms)
+            entry = {'cols': cols, 'from': rebuild_from,
+                     'first': int(cols['timestamp'][0]) if len(cols['timestamp']) else rebuild_from or 0,
+                     'base_hwm': base_hwm, 'state': state}
+        elif written is not None or (base_hwm is not None and (entry['base_hwm'] is None or base_hwm > entry['base_hwm'])):
+            # Rebuild only from the last (possibly partial) bucket, or the oldest rewritten one, onward
+            cols = entry['cols']
+            tail_start = int(cols['timestamp'][-1]) if len(cols['timestamp']) else entry['first']
+            if written is not None:
+                tail_start = max(min(tail_start, written - written % target_ms), entry['from'] or 0)
+            tail = resample_arrays(self.store.read_range(symbol, base_tf, tail_start), target_ms)
+            keep = int(np.searchsorted(cols['timestamp'], tail_start, side='left'))
+            entry['cols'] = {col: np.concatenate((cols[col][:keep], tail[col])) for col in OHLCV_COLUMNS}
+            entry['first'] = int(entry['cols']['timestamp'][0]) if keep == 0 and len(tail['timestamp']) else entry['first']
+            entry['base_hwm'] = base_hwm
+            entry['state'] = state
+
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return entry
@@ -0,0 +1,318 @@
+"""
+stream.py
+---------
+Streaming market data: pushes updating/closed candles and trades to subscribers as events.
+
+`CandleStream` wraps a source (a live ccxt.pro websocket or the local `ReplayServer`) with
+automatic reconnect, resync from the last closed candle, and a bounded event queue.
+`ReplayServer` streams stored OHLCV over newline-delimited JSON at a configurable speed,
+for offline testing and deterministic load tests.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+import pandas as pd
+from backend.data.api_mapper import timeframe_to_ms
+from backend.data.ohlcv_store import OHLCVStore
+
+log = logging.getLogger("Stream")
+
+OVERFLOW_POLICIES = ("block", "drop_oldest")
+_EOS = object()
+
+
+@dataclass
+class MarketEvent:
+    """A candle update, a closed candle or a trade."""
+    kind: str               # 'candle' or 'trade'
+    symbol: str
+    timestamp: int          # epoch-ms (candle open time or trade time)
+    timeframe: str = None
+    open: float = None
+    high: float = None
+    low: float = None
+    close: float = None
+    volume: float = None
+    closed: bool = False
+    price: float = None
+    amount: float = None
+    side: str = None
+
+    @classmethod
+    def from_message(cls, msg: dict) -> "MarketEvent":
+        fields = {k: v for k, v in msg.items() if k in cls.__dataclass_fields__}
+        return cls(kind=msg['type'], **fields)
+
+    def to_frame(self) -> pd.DataFrame:
+        """One-row OHLCV DataFrame for a candle event."""
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime([self.timestamp], unit='ms'),
+            'open': [self.open], 'high': [self.high], 'low': [self.low],
+            'close': [self.close], 'volume': [self.volume],
+        })
+
+
+def candle_message(symbol: str, timeframe: str, candle, closed: bool) -> dict:
+    ts, o, h, l, c, v = candle
+    return {"type": "candle", "symbol": symbol, "timeframe": timeframe, "timestamp": int(ts),
+            "open": float(o), "high": float(h), "low": float(l), "close": float(c), "volume": float(v),
+            "closed": closed}
+
+
+class ReplaySource:
+    """
+    Client for `ReplayServer`. Yields raw messages for one subscription.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765):
+        self.host = host
+        self.port = port
+
+    async def stream(self, symbol: str, timeframe: str, since: int = None):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            request = {"symbol": symbol, "timeframe": timeframe, "since": since}
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("replay server closed the connection")
+                yield json.loads(line)
+        finally:
+            writer.close()
+
+
+class CcxtProSource:
+    """
+    Live websocket source built on ccxt.pro. Missed candles are fetched over REST on (re)connect.
+    Candles and (optionally) trades are watched by two tasks feeding one queue, so neither feed
+    waits for the other.
+    """
+
+    QUEUE_SIZE = 1024
+
+    def __init__(self, exchange_id: str = 'htx', mapper=None, trades: bool = False, client=None):
+        """
+        :param mapper: ExchangeAPIMapper used for the REST resync
+        :param trades: Also stream trades
+        :param client: Optional pre-built ccxt.pro client (e.g. a local stub)
+        """
+        if client is None:
+            import ccxt.pro as ccxtpro
+
+            client = getattr(ccxtpro, exchange_id)({'enableRateLimit': True})
+        self.client = client
+        self.mapper = mapper
+        self.trades = trades
+
+    async def stream(self, symbol: str, timeframe: str, since: int = None):
+        if since is not None and self.mapper is not None:
+            # The candle at `since` is fetched again: it may have been stored while still open.
+            # Only candles whose period has ended are closed; the newest one is usually still forming.
+            missed = await asyncio.to_thread(self.mapper.fetch_ohlcv_since, symbol, timeframe, since)
+            step, now = timeframe_to_ms(timeframe), time.time() * 1000
+            for row in missed.itertuples(index=False):
+                ts = int(row.timestamp.value // 1_000_000)
+                yield candle_message(symbol, timeframe, (ts, row.open, row.high, row.low, row.close, row.volume),
+                                     ts + step <= now)
+
+        queue = asyncio.Queue(self.QUEUE_SIZE)
+        feeds = [asyncio.create_task(self._feed(queue, self._candles(symbol, timeframe)))]
+        if self.trades:
+            feeds.append(asyncio.create_task(self._feed(queue, self._trades(symbol))))
+        try:
+            while True:
+                msg = await queue.get()
+                if isinstance(msg, Exception):
+                    raise msg
+                yield msg
+        finally:
+            for feed in feeds:
+                feed.cancel()
+
+    @staticmethod
+    async def _feed(queue: asyncio.Queue, messages):
+        try:
+            async for msg in messages:
+                await queue.put(msg)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)  # re-raised by stream() so CandleStream reconnects
+
+    async def _candles(self, symbol: str, timeframe: str):
+        current = None
+        while True:
+            for candle in await self.client.watch_ohlcv(symbol, timeframe):
+                if current is not None and candle[0] > current[0]:
+                    yield candle_message(symbol, timeframe, current, True)
+                if current is None or candle[0] >= current[0]:
+                    current = candle
+                    yield candle_message(symbol, timeframe, candle, False)
+
+    async def _trades(self, symbol: str):
+        while True:
+            for trade in await self.client.watch_trades(symbol):
+                yield {"type": "trade", "symbol": symbol, "timestamp": trade['timestamp'],
+                       "price": trade['price'], "amount": trade['amount'], "side": trade.get('side')}
+
+    async def close(self):
+        await self.client.close()
+
+
+class CandleStream:
+    """
+    Async subscriber API over a streaming source with reconnect, resync and backpressure.
+    """
+
+    def __init__(self, source, store: OHLCVStore = None, maxsize: int = 1024, overflow: str = "block",
+                 reconnect_delay: float = 0.5, max_reconnect_delay: float = 30.0):
+        """
+        :param source: Object with an async `stream(symbol, timeframe, since)` generator of messages
+        :param store: Optional store that closed candles are appended to and resynced from
+        :param maxsize: Bound of the per-subscription event queue
+        :param overflow: 'block' slows the source down; 'drop_oldest' discards stale events
+        :param reconnect_delay: Initial reconnect backoff in seconds (doubles up to max_reconnect_delay)
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.source = source
+        self.store = store
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.stats = {"received": 0, "dropped": 0, "reconnects": 0}
+
+    async def subscribe(self, symbol: str, timeframe: str, since: int = None):
+        """
+        Yields `MarketEvent`s for one series until the source signals end of stream.
+
+        :param since: Last closed candle already held by the caller (defaults to the store's newest candle)
+        """
+        if since is None and self.store is not None:
+            since = await asyncio.to_thread(self.store.last_timestamp, symbol, timeframe)
+
+        queue = asyncio.Queue(self.maxsize)
+        pump = asyncio.create_task(self._pump(queue, symbol, timeframe, since))
+        try:
+            while True:
+                event = await queue.get()
+                if event is _EOS:
+                    break
+                yield event
+        finally:
+            pump.cancel()
+            try:
+                await pump
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _pump(self, queue: asyncio.Queue, symbol: str, timeframe: str, last_closed: int):
+        delay = self.reconnect_delay
+        # The caller's newest candle may have been stored while still open, so a source that
+        # re-sends it gets it through, updates included, until it arrives closed
+        reopened = last_closed
+        while True:
+            try:
+                async for msg in self.source.stream(symbol, timeframe, last_closed):
+                    delay = self.reconnect_delay
+                    if msg.get("type") == "eos":
+                        await queue.put(_EOS)
+                        return
+                    event = MarketEvent.from_message(msg)
+                    if event.kind == "candle":
+                        if last_closed is not None and event.timestamp <= last_closed and event.timestamp != reopened:
+                            continue  # already delivered before a reconnect
+                        if event.closed:
+                            reopened = None
+                            last_closed = event.timestamp
+                            if self.store is not None:
+                                await asyncio.to_thread(self.store.append, event.to_frame(), symbol, timeframe)
+                    self.stats["received"] += 1
+                    await self._offer(queue, event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"[Stream] ⚠ {symbol} {timeframe} feed lost ({e}), reconnecting in {delay:.1f}s")
+            self.stats["reconnects"] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _offer(self, queue: asyncio.Queue, event: MarketEvent):
+        if self.overflow == "drop_oldest" and queue.full():
+            queue.get_nowait()
+            self.stats["dropped"] += 1
+        await queue.put(event)
+
+
+class ReplayServer:
+    """
+    Local TCP server that streams stored OHLCV as newline-delimited JSON.
+    Clients send one JSON request line: {"symbol", "timeframe", "since"}.
+    """
+
+    def __init__(self, store: OHLCVStore, speed: float = 0.0, host: str = '127.0.0.1', port: int = 0,
+                 updates_per_bar: int = 0):
+        """
+        :param store: Store to replay from
+        :param speed: Replay speed as a multiple of real time (0 streams as fast as the client reads)
+        :param port: TCP port (0 picks a free one; see `self.port` after start)
+        :param updates_per_bar: Number of in-progress updates emitted before each closed candle
+        """
+        self.store = store
+        self.speed = speed
+        self.host = host
+        self.port = port
+        self.updates_per_bar = updates_per_bar
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info(f"[Replay] ▶ Serving {self.store.root} on {self.host}:{self.port}")
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = json.loads(await reader.readline())
+            symbol, timeframe, since = request["symbol"], request["timeframe"], request.get("since")
+            cols = await asyncio.to_thread(self.store.read_range, symbol, timeframe,
+                                           None if since is None else since + 1)
+            rows = zip(*(cols[c].tolist() for c in ('timestamp', 'open', 'high', 'low', 'close', 'volume')))
+
+            prev_ts = None
+            for candle in rows:
+                if self.speed > 0 and prev_ts is not None:
+                    await asyncio.sleep((candle[0] - prev_ts) / 1000 / self.speed)
+                prev_ts = candle[0]
+                for step in range(1, self.updates_per_bar + 1):
+                    ts, o, h, l, c, v = candle
+                    partial = o + (c - o) * step / (self.updates_per_bar + 1)
+                    update = (ts, o, max(o, partial), min(o, partial), partial, v * step / (self.updates_per_bar + 1))
+                    writer.write(json.dumps(candle_message(symbol, timeframe, update, False)).encode() + b"\n")
+                writer.write(json.dumps(candle_message(symbol, timeframe, candle, True)).encode() + b"\n")
+                await writer.drain()  # backpressure: wait for slow clients
+
+            writer.write(b'{"type": "eos"}\n')
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,184 @@
+"""
+writer.py
+---------
+Write-behind persistence for the trading loop.
+A dedicated thread owns the SQLite connection and drains a bounded queue of batches,
+grouping several batches into one transaction, so callers never wait on a commit.
+If a grouped transaction fails, its batches are retried one per transaction so only the
+bad ones are dropped.
+"""
+
+import logging
+import queue
+import threading
+import time
+import pandas as pd
+from backend.data.database import DatabaseClient, DB_PATH
+
+log = logging.getLogger("Writer")
+
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """
+    Asynchronous writer for OHLCV and signal batches.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_queue: int = 256, max_batches_per_txn: int = 64,
+                 put_timeout: float = 0.5):
+        """
+        :param db_path: SQLite database path (opened by the writer thread)
+        :param max_queue: Maximum number of pending batches
+        :param max_batches_per_txn: Maximum batches grouped into one transaction
+        :param put_timeout: Seconds a producer may wait on a full queue before the batch is dropped
+        :raises Exception: Whatever opening the database raised in the writer thread
+        """
+        self.db_path = db_path
+        self.max_batches_per_txn = max_batches_per_txn
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self._stats = {"batches": 0, "transactions": 0, "dropped": 0, "failed": 0,
+                       "last_flush_ms": 0.0, "max_flush_ms": 0.0, "total_flush_ms": 0.0}
+        self._closed = False
+        self._error = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="WriteBehindWriter", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            self._closed = True
+            raise self._error
+
+    # ------------------------------------------------------------------ producer side
+
+    def submit_ohlcv(self, df: pd.DataFrame, symbol: str, timeframe: str) -> bool:
+        """Queues candles for upsert. Returns False if the batch was dropped."""
+        cols = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        return self._submit(("ohlcv", df[cols], symbol, timeframe))
+
+    def submit_signals(self, df: pd.DataFrame, symbol: str, strategy: str) -> bool:
+        """Queues signals for upsert. Returns False if the batch was dropped."""
+        if 'signal' not in df.columns:
+            return True
+        return self._submit(("signals", df[['timestamp', 'signal']], symbol, strategy))
+
+    def _submit(self, item) -> bool:
+        if self._closed:
+            log.warning(f"[Writer] ⚠ Writer is closed, dropped {item[0]} batch for {item[2]}")
+            return False
+        try:
+            self._queue.put(item, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["dropped"] += 1
+            log.warning(f"[Writer] ⚠ Queue full, dropped {item[0]} batch for {item[2]}")
+            return False
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Blocks until everything queued before this call is committed.
+
+        :return: True if the flush completed within the timeout
+        """
+        if not self._thread.is_alive():
+            return True  # closed: everything was flushed on the way out
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = None):
+        """Flushes pending batches, stops the writer thread and closes its connection.
+        Later submits are rejected."""
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def metrics(self) -> dict:
+        """
+        Returns queue depth and flush latency statistics.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        transactions = stats.pop("transactions")
+        total = stats.pop("total_flush_ms")
+        stats["transactions"] = transactions
+        stats["avg_flush_ms"] = total / transactions if transactions else 0.0
+        stats["queue_depth"] = self._queue.qsize()
+        return stats
+
+    # ------------------------------------------------------------------ writer thread
+
+    def _run(self):
+        try:
+            client = DatabaseClient(self.db_path)
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.max_batches_per_txn:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = any(item is _STOP for item in batch)
+                self._write(client, [item for item in batch if isinstance(item, tuple)])
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                if stop:
+                    self._drain_remaining(client)
+                    return
+        finally:
+            client.close()
+
+    def _drain_remaining(self, client: DatabaseClient):
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._write(client, [item for item in leftover if isinstance(item, tuple)])
+        for item in leftover:
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _write(self, client: DatabaseClient, items: list):
+        if not items:
+            return
+        t0 = time.perf_counter()
+        try:
+            with client.conn:
+                for kind, df, symbol, key in items:
+                    if kind == "ohlcv":
+                        client.insert_ohlcv(df, symbol=symbol, timeframe=key, commit=False)
+                    else:
+                        client.insert_signals(df, symbol=symbol, strategy=key, commit=False)
+        except Exception as e:
+            if len(items) > 1:
+                log.warning(f"[Writer] ⚠ Transaction of {len(items)} batches failed ({e}), retrying one by one")
+                for item in items:
+                    self._write(client, [item])
+                return
+            with self._stats_lock:
+                self._stats["failed"] += 1
+            log.error(f"[Writer] ❌ Dropped {items[0][0]} batch for {items[0][2]}: {e}")
+            return
+
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        with self._stats_lock:
+            self._stats["batches"] += len(items)
+            self._stats["transactions"] += 1
+            self._stats["last_flush_ms"] = elapsed_ms
+            self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"], elapsed_ms)
+            self._stats["total_flush_ms"] += elapsed_ms
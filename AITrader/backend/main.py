@@ -10,15 +10,19 @@ import time
 import streamlit.web.bootstrap
 from backend.core.logger import configure_logging
 from backend.core.config import CONFIG
+from backend.ai.model_store import data_range, read_json, write_json
 from backend.ai.strategy_synthesizer import auto_generate_strategies
 from backend.core.orchestrator import TradingOrchestrator
 from backend.core.scheduler import StrategyScheduler
-from backend.performance_metrics import evaluate_strategy
-from backend.ai.strategy_registry import strategy_registry
+from backend.data.compaction import DatabaseCompactor
+from backend.services.performance_metrics import evaluate_strategy
+from backend.strategies import STRATEGY_REGISTRY, run_strategy
+from backend.strategies.indicator_cache import INDICATOR_CACHE
+from backend.strategies.sandbox import sandbox_stats
 
 log = logging.getLogger("Main")
 
-BEST_STRATEGY_FILE = "cache/best_strategy.txt"
+BEST_STRATEGY_FILE = "cache/best_strategy.json"
 
 
 def run_streamlit():
@@ -31,28 +35,52 @@ def run_streamlit():
     )
 
 
+def load_best_strategy() -> str:
+    """Strategy selected by the last evaluation, if it is registered in this process."""
+    selection = read_json(BEST_STRATEGY_FILE)
+    if not selection or selection.get("name") not in STRATEGY_REGISTRY:
+        return None
+    log.info(f"♻ Warm start with {selection['name']} (return={selection['score']}, "
+             f"evaluated {selection['evaluated_at']})")
+    return selection["name"]
+
+
 def evaluate_all_strategies(orchestrator: TradingOrchestrator):
     log.info("🧪 Evaluating all available strategies...")
+    # Fetch once; every strategy runs over the same candles, so shared indicators come from the cache
+    orchestrator.ingestor.sync()
+    candles = orchestrator.ingestor.load_latest(limit=500)
+
     scores = []
-    for name in strategy_registry:
-        orchestrator.strategy_name = name
+    for name in STRATEGY_REGISTRY:
         try:
-            df = orchestrator.run_once()
+            df = run_strategy(STRATEGY_REGISTRY[name], candles)
 
             # Futures-oriented: convert buy/sell → long/short
             if "signal" in df.columns:
                 df["signal"] = df["signal"].map({"buy": "long", "sell": "short"}).fillna(df["signal"])
 
             metrics = evaluate_strategy(df)
-            scores.append((name, metrics.get("total_return", 0)))
-            log.info(f"🔍 {name}: return={metrics.get('total_return')}")
+            scores.append((name, metrics.get("pnl", 0)))
+            log.info(f"🔍 {name}: return={metrics.get('pnl')}")
         except Exception as e:
             log.warning(f"⚠ Failed to evaluate {name}: {e}")
+    log.info(f"📦 Indicator cache: {INDICATOR_CACHE.stats()}")
+    for name, stats in sandbox_stats().items():
+        log.info(f"🧱 Sandbox {name}: {stats['calls']} calls, p95={stats['p95_ms']:.1f}ms, "
+                 f"failures={stats['failures']}{' (quarantined)' if stats['quarantined'] else ''}")
     if scores:
         best = max(scores, key=lambda x: x[1])
         log.info(f"🏆 Best strategy: {best[0]} (return={best[1]})")
-        with open(BEST_STRATEGY_FILE, "w") as f:
-            f.write(best[0])
+        write_json(BEST_STRATEGY_FILE, {
+            "name": best[0],
+            "score": float(best[1]),
+            "scores": {name: float(score) for name, score in scores},
+            "evaluated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "symbol": orchestrator.symbol,
+            "timeframe": orchestrator.timeframe,
+            "data_range": data_range(candles),
+        })
 
 
 def main():
@@ -62,18 +90,23 @@ def main():
     try:
         threading.Thread(target=run_streamlit, daemon=True).start()
 
-        auto_generate_strategies()
+        # Cached strategies are registered now; new ideas are synthesized in the background
+        try:
+            auto_generate_strategies(background=True)
+        except Exception as e:
+            log.warning(f"⚠ Strategy synthesis unavailable: {e}")
 
         orchestrator = TradingOrchestrator(
             exchange=CONFIG["DEFAULT_EXCHANGE"],
             symbol=CONFIG["DEFAULT_SYMBOL"],
             timeframe=CONFIG["DEFAULT_TIMEFRAME"],
-            strategy_name=CONFIG["DEFAULT_STRATEGY"]
+            strategy_name=load_best_strategy() or CONFIG["DEFAULT_STRATEGY"]
         )
 
         evaluate_all_strategies(orchestrator)
 
         scheduler = StrategyScheduler(orchestrator=orchestrator, interval_minutes=60)
+        scheduler.add_job(DatabaseCompactor().run, interval_minutes=24 * 60, name="compaction")
         scheduler.start()
 
         while True:
@@ -0,0 +1,372 @@
+"""
+backtester.py
+-------------
+Vectorized futures backtester: signal array in, equity curve, trade ledger and exposure out.
+
+Positions follow the SignalProcessor state machine (1 goes long, -1 goes short, 0 keeps the position)
+and are sized at entry to `leverage x position_size x equity`, then held without rebalancing. Fills
+happen at the close of the signal bar, so a position is held from there over the following bars.
+Taker or maker fees apply to the notional of every entry and exit, taker fills also pay slippage,
+and open positions pay (or receive) funding at every funding boundary.
+
+Every term of a trade is proportional to the equity at its entry, so a trade multiplies equity by
+a factor computed from arrays alone. The equity curve is then a cumulative product over trades,
+mapped back onto the bars, and the whole series is processed without a Python loop over bars.
+Stop-loss / trailing-stop exits (event-driven mode) need the price path inside each trade, so they
+are found trade by trade and then booked through the same vectorized accounting.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from backend.services.signal_processor import position_changes
+from backend.strategies.array_strategy import to_signal_array
+
+log = logging.getLogger("Backtester")
+
+TAKER_FEE = float(os.getenv("BACKTEST_TAKER_FEE", 0.0005))
+MAKER_FEE = float(os.getenv("BACKTEST_MAKER_FEE", 0.0002))
+SLIPPAGE = float(os.getenv("BACKTEST_SLIPPAGE", 0.0002))
+FUNDING_INTERVAL_MS = 8 * 3_600_000
+YEAR_MS = 365 * 86_400_000
+
+LEDGER_COLUMNS = ['side', 'entry_bar', 'exit_bar', 'entry_time', 'exit_time', 'entry_price', 'exit_price',
+                  'notional', 'quantity', 'fees', 'funding', 'pnl', 'return', 'bars', 'exit_reason']
+
+
+@dataclass
+class BacktestResult:
+    equity: np.ndarray        # (n,) account equity at every bar close
+    position: np.ndarray      # (n,) int8 side held after each bar: 1 long, -1 short, 0 flat
+    ledger: pd.DataFrame      # one row per trade (see LEDGER_COLUMNS); open trades have exit_reason 'open',
+                              # and after a liquidation the ledger ends with the liquidated trade
+    metrics: dict             # computed up to the liquidation bar if the account was liquidated
+    leverage: float = 1.0     # effective leverage (leverage x position_size)
+
+    @property
+    def exposure(self) -> np.ndarray:
+        """(n,) signed notional per unit of equity at entry (leverage x size x side)."""
+        return self.position * self.leverage
+
+    def frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Returns df with equity, position and exposure columns."""
+        return df.assign(equity=self.equity, position=self.position, exposure=self.exposure)
+
+
+def _next_index(mask: np.ndarray) -> np.ndarray:
+    """For every i, the first j >= i with mask[j] (len(mask) if none); has a sentinel entry at len(mask)."""
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    return np.append(np.minimum.accumulate(idx[::-1])[::-1], n)
+
+
+class Backtester:
+    """
+    Runs a signal array against OHLC(V) bars with futures costs.
+    """
+
+    def __init__(self, initial_capital: float = 10_000.0, leverage: float = 1.0, position_size: float = 1.0,
+                 order_type: str = 'taker', taker_fee: float = TAKER_FEE, maker_fee: float = MAKER_FEE,
+                 slippage: float = SLIPPAGE, funding_rate=0.0, funding_interval_ms: int = FUNDING_INTERVAL_MS,
+                 stop_loss: float = None, trailing_stop: float = None, periods_per_year: float = None):
+        """
+        :param leverage: Futures leverage
+        :param position_size: Fraction of equity used as margin per trade (place_futures_order's use_pct / 100)
+        :param order_type: 'taker' (market orders, pay slippage) or 'maker' (limit orders at the close)
+        :param slippage: Adverse price move per taker fill, as a fraction of price
+        :param funding_rate: Funding rate per interval (scalar or per-bar array); longs pay positive rates
+        :param funding_interval_ms: Funding period; boundaries are taken from the bar timestamps
+        :param stop_loss: Stop price (as in place_futures_order's stopPrice); enables event-driven mode. It only
+                          protects trades it is below (longs) or above (shorts) at entry, as a stop order
+                          on the other side would fill at once; those trades run without a fixed stop
+        :param trailing_stop: Trailing stop in percent of the best price since entry; enables event-driven mode
+        :param periods_per_year: Bars per year for the Sharpe ratio (default: inferred from timestamps, else 252)
+        """
+        if order_type not in ('taker', 'maker'):
+            raise ValueError("order_type must be 'taker' or 'maker'")
+        self.initial_capital = initial_capital
+        self.leverage = leverage * position_size
+        self.fee = taker_fee if order_type == 'taker' else maker_fee
+        self.taker_fee = taker_fee
+        self.fill_slippage = slippage if order_type == 'taker' else 0.0
+        self.slippage = slippage
+        self.funding_rate = funding_rate
+        self.funding_interval_ms = funding_interval_ms
+        self.stop_loss = stop_loss
+        self.trailing_stop = trailing_stop
+        self.periods_per_year = periods_per_year
+
+    @property
+    def event_driven(self) -> bool:
+        return bool(self.stop_loss or self.trailing_stop)
+
+    def run(self, df: pd.DataFrame, signal=None) -> BacktestResult:
+        """
+        :param df: Bars with 'close' (and 'open'/'high'/'low' for stops, 'timestamp' for funding and times)
+        :param signal: Signal per bar (default: df['signal']; 'buy'/'long'/'sell'/'short' strings are accepted)
+        """
+        signal = to_signal_array(df['signal'] if signal is None else signal)
+        timestamp = None
+        if 'timestamp' in df:
+            timestamp = df['timestamp'].to_numpy()
+            if np.issubdtype(timestamp.dtype, np.datetime64):
+                timestamp = timestamp.astype('datetime64[ms]').view(np.int64)
+        ohlc = {col: df[col].to_numpy(dtype=np.float64) for col in ('open', 'high', 'low') if col in df}
+        return self.run_arrays(df['close'].to_numpy(dtype=np.float64), signal, timestamp, **ohlc)
+
+    def run_arrays(self, close: np.ndarray, signal: np.ndarray, timestamp: np.ndarray = None,
+                   open: np.ndarray = None, high: np.ndarray = None, low: np.ndarray = None) -> BacktestResult:
+        """
+        Array form of run(); signal is an int8 array (1 buy, -1 sell, 0 none), timestamp int64 epoch-ms.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        signal = np.asarray(signal)
+        n = len(close)
+        if n == 0:
+            raise ValueError("At least one bar is required")
+
+        if self.event_driven:
+            starts, sides, stops = self._stop_path(
+                signal, close, close if open is None else open, close if high is None else high,
+                close if low is None else low)
+        else:
+            starts, sides = position_changes(signal)
+            stops = {}
+        if not len(starts) or starts[0] != 0:
+            # Flat until the first entry
+            starts, sides = np.concatenate(([0], starts)), np.concatenate(([0], sides))
+        return self._account(close, np.asarray(starts, dtype=np.int64), np.asarray(sides, dtype=np.int8),
+                             stops, timestamp)
+
+    # ------------------------------------------------------------------ event-driven stops
+
+    def _first_stop(self, side: int, entry: float, a: int, b: int, open_, high, low):
+        """First bar in [a, b) whose range reaches the stop, with its fill price; None if no stop triggers."""
+        if a >= b:
+            return None
+        # The fixed stop only counts on the losing side of the entry
+        fixed = bool(self.stop_loss) and (self.stop_loss < entry if side == 1 else self.stop_loss > entry)
+        if side == 1:
+            level = np.full(b - a, -np.inf)
+            if fixed:
+                level[:] = self.stop_loss
+            if self.trailing_stop:
+                # The trail follows the best price up to the previous bar (and the entry)
+                peak = np.maximum.accumulate(np.concatenate(([entry], high[a:b - 1])))
+                trail = np.maximum(peak, entry) * (1 - self.trailing_stop / 100)
+                level = np.maximum(level, trail)
+            hit = low[a:b] <= level
+        else:
+            level = np.full(b - a, np.inf)
+            if fixed:
+                level[:] = self.stop_loss
+            if self.trailing_stop:
+                trough = np.minimum.accumulate(np.concatenate(([entry], low[a:b - 1])))
+                trail = np.minimum(trough, entry) * (1 + self.trailing_stop / 100)
+                level = np.minimum(level, trail)
+            hit = high[a:b] >= level
+        if not hit.any():
+            return None
+        first = int(hit.argmax())
+        bar, stop = a + first, level[first]
+        # A gap through the stop fills at the open
+        fill = min(open_[bar], stop) if side == 1 else max(open_[bar], stop)
+        return bar, fill, 'stop_loss' if fixed and stop == self.stop_loss else 'trailing_stop'
+
+    def _stop_path(self, signal, close, open_, high, low):
+        """
+        Walks the trades: each entry runs until its stop triggers or the opposite signal arrives.
+        After a stop the account is flat until the next buy or sell signal (which may be on the stop bar).
+
+        :return: (starts, sides, stops) with the first bar and side of every segment, and
+                 stop bar -> (fill price, reason) for segments ended by a stop
+        """
+        n = len(signal)
+        starts, sides, stops = [], [], {}
+        next_signal = _next_index(signal != 0)
+        next_buy, next_sell = _next_index(signal == 1), _next_index(signal == -1)
+
+        t = next_signal[0]
+        while t < n:
+            side = int(signal[t])
+            reverse = (next_sell if side == 1 else next_buy)[t + 1]
+            starts.append(t)
+            sides.append(side)
+            # A stop is checked on every held bar, including the reversal bar (intrabar, before its close)
+            stop = self._first_stop(side, close[t], t + 1, min(reverse, n - 1) + 1, open_, high, low)
+            if stop is None:
+                t = reverse
+                continue
+            bar, fill, reason = stop
+            stops[bar] = (fill, reason)
+            t = next_signal[bar]
+            if t != bar:
+                starts.append(bar)
+                sides.append(0)
+        return starts, sides, stops
+
+    # ------------------------------------------------------------------ accounting
+
+    def _funding_bars(self, timestamp: np.ndarray) -> np.ndarray:
+        """Bars that cross a funding boundary (the first bar at or after each boundary, except bar 0)."""
+        timestamp = np.asarray(timestamp, dtype=np.int64)
+        interval = self.funding_interval_ms
+        boundaries = np.arange((timestamp[0] // interval + 1) * interval, timestamp[-1] + 1, interval)
+        bars = np.unique(np.searchsorted(timestamp, boundaries))
+        return bars[(bars > 0) & (bars < len(timestamp))]
+
+    def _account(self, close, starts, sides, stops, timestamp) -> BacktestResult:
+        n = len(close)
+        lev = self.leverage
+        k = len(starts)
+        ends = np.append(starts[1:], n - 1)
+        lengths = np.diff(np.append(starts, n))
+        closed = np.arange(k) < k - 1
+        side = sides.astype(np.float64)
+        size = lev * np.abs(side)
+
+        entry = close[starts] * (1 + side * self.fill_slippage)
+        exit_ = np.where(closed, close[ends] * (1 - side * self.fill_slippage), close[-1])
+        fee_out = np.where(closed, self.fee, 0.0)
+        stopped = np.zeros(k, dtype=bool)
+        if stops:
+            stopped = closed & np.isin(ends, list(stops))
+            fills = np.array([stops[bar][0] for bar in ends[stopped]])
+            # Stops are stop-market orders: taker fee and slippage
+            exit_[stopped] = fills * (1 - side[stopped] * self.slippage)
+            fee_out[stopped] = self.taker_fee
+        fee_in = size * self.fee
+        fee_out = size * exit_ / entry * fee_out
+
+        # Funding is paid at sparse boundary bars on the position held over (t-1, t]; paid(x) is the
+        # cumulative funding (per unit of entry equity) of all boundaries up to bar x
+        events = self._funding_bars(timestamp) if np.any(self.funding_rate) and timestamp is not None else []
+        if len(events):
+            rate = np.broadcast_to(np.asarray(self.funding_rate, dtype=np.float64), (n,))[events]
+            held = np.searchsorted(starts, events - 1, side='right') - 1
+            cumulative = np.concatenate(([0.0], np.cumsum(rate * side[held] * lev / entry[held] * close[events])))
+
+            def paid(bars):
+                return cumulative[np.searchsorted(events, bars, side='right')]
+
+            trade_funding = paid(ends) - paid(starts)
+        else:
+            trade_funding = np.zeros(k)
+
+        growth = 1 - fee_in + side * lev * (exit_ / entry - 1) - trade_funding - fee_out
+        start_equity = self.initial_capital * np.concatenate(([1.0], np.cumprod(growth[:-1])))
+
+        # equity[t] = E * (1 - fee_in + side * lev * (close[t] / entry - 1) - funding since entry),
+        # affine in close between trade starts and funding boundaries
+        base = start_equity * (1 - fee_in - side * lev)
+        slope = start_equity * side * lev / entry
+        if len(events):
+            pieces = np.union1d(starts, events)
+            trade = np.searchsorted(starts, pieces, side='right') - 1
+            base = base[trade] - start_equity[trade] * (paid(pieces) - paid(starts)[trade])
+            slope = slope[trade]
+            spans = np.diff(np.append(pieces, n))
+        else:
+            spans = lengths
+        equity = np.repeat(slope, spans)
+        equity *= close
+        equity += np.repeat(base, spans)
+        position = np.repeat(sides, lengths)
+        liquidated = bool(equity.min() <= 0)
+        last = n
+        if liquidated:
+            bar = int((equity <= 0).argmax())
+            log.warning(f"[Backtester] ⚠ Account liquidated at bar {bar}")
+            equity[bar:] = 0.0
+            position[bar:] = 0
+            last = bar + 1
+            # The trade holding the bar loses its margin (or the one that closed on it, when a new
+            # trade starts there from an already wiped-out account); later trades never happen
+            j = int(np.searchsorted(starts, bar, side='right')) - 1
+            if starts[j] == bar and j > 0 and sides[j - 1] != 0:
+                j -= 1
+            starts, ends, closed, stopped, side, entry, exit_, start_equity, size, fee_in, fee_out, \
+                trade_funding, growth = (a[:j + 1].copy() for a in (
+                    starts, ends, closed, stopped, side, entry, exit_, start_equity, size, fee_in, fee_out,
+                    trade_funding, growth))
+            ends[j], closed[j], stopped[j], exit_[j], fee_out[j], growth[j] = bar, True, False, close[bar], 0.0, 0.0
+            if len(events):
+                trade_funding[j] = paid(bar) - paid(starts[j])
+
+        ledger = self._ledger(starts, ends, closed, stopped, side, entry, exit_, start_equity, size,
+                              fee_in + fee_out, trade_funding, growth, stops, timestamp)
+        if liquidated and side[-1] != 0:
+            ledger.iloc[-1, ledger.columns.get_loc('exit_reason')] = 'liquidation'
+        metrics = self._metrics(equity[:last], position[:last], ledger, timestamp, liquidated)
+        return BacktestResult(equity, position, ledger, metrics, lev)
+
+    def _ledger(self, starts, ends, closed, stopped, side, entry, exit_, start_equity, size, fees, funding,
+                growth, stops, timestamp) -> pd.DataFrame:
+        trades = side != 0
+        starts, ends, closed, stopped = starts[trades], ends[trades], closed[trades], stopped[trades]
+        equity, sides = start_equity[trades], side[trades]
+        notional = equity * size[trades]
+        reason = np.where(closed, 'signal', 'open').astype(object)
+        reason[stopped] = [stops[bar][1] for bar in ends[stopped]]
+        times = (lambda bars: pd.to_datetime(timestamp[bars], unit='ms')) if timestamp is not None else \
+            (lambda bars: np.full(len(bars), pd.NaT))
+        return pd.DataFrame({
+            'side': np.where(sides > 0, 'long', 'short'),
+            'entry_bar': starts,
+            'exit_bar': ends,
+            'entry_time': times(starts),
+            'exit_time': times(ends),
+            'entry_price': entry[trades],
+            'exit_price': exit_[trades],
+            'notional': notional,
+            'quantity': notional / entry[trades],
+            'fees': equity * fees[trades],
+            'funding': equity * funding[trades],
+            'pnl': equity * (growth[trades] - 1),
+            'return': growth[trades] - 1,
+            'bars': ends - starts,
+            'exit_reason': reason,
+        }, columns=LEDGER_COLUMNS)
+
+    def _metrics(self, equity, position, ledger, timestamp, liquidated) -> dict:
+        periods = self.periods_per_year
+        if periods is None:
+            # Bar spacing from the start of the series (robust to later gaps)
+            step = np.median(np.diff(timestamp[:10_000])) if timestamp is not None and len(timestamp) > 1 else 0
+            periods = YEAR_MS / step if step > 0 else 252
+        # Metrics stop at the liquidation bar, so every earlier equity value is positive
+        returns = equity[1:] / equity[:-1]
+        returns -= 1
+        sharpe = 0.0
+        if len(returns):
+            mean = returns.mean()
+            std = np.sqrt(max(np.dot(returns, returns) / len(returns) - mean * mean, 0.0))
+            sharpe = mean / std * np.sqrt(periods) if std > 0 else 0.0
+        if liquidated:
+            max_drawdown = -1.0
+        else:
+            max_drawdown = float((equity / np.maximum.accumulate(equity)).min()) - 1
+        total_return = equity[-1] / self.initial_capital - 1
+        closed = ledger[ledger['exit_reason'] != 'open']
+        win_rate = (closed['pnl'] > 0).mean() if len(closed) else 0.0
+        return {
+            # Same keys and units as performance_metrics.evaluate_strategy
+            "pnl": round(float(total_return) * 100, 2),
+            "win_rate": round(float(win_rate) * 100, 2),
+            "sharpe": round(float(sharpe), 2),
+            "trades": len(ledger),
+            "total_return": float(total_return),
+            "final_equity": float(equity[-1]),
+            "max_drawdown": max_drawdown,
+            "exposure": float(np.count_nonzero(position) / len(position)),
+            "fees": float(ledger['fees'].sum()),
+            "funding": float(ledger['funding'].sum()),
+            "liquidated": liquidated,
+        }
+
+
+def backtest(df: pd.DataFrame, signal=None, **params) -> BacktestResult:
+    """Runs a Backtester with the given parameters (see Backtester.__init__) over df."""
+    return Backtester(**params).run(df, signal)
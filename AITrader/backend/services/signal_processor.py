@@ -4,10 +4,132 @@ signal_processor.py
 --------------------
 Processes raw strategy signals and converts them into actionable trading decisions
 based on current position, risk management rules, and market context.
+
+The position state machine: a signal of 1 opens a long unless already long (BUY), -1 opens a short
+unless already short (SELL), anything else keeps the position (HOLD). Whole series are processed
+with NumPy as a forward-filled position plus its changes; live bars go through on_signal, which keeps
+one position per (symbol, strategy) key in a compact PositionTable.
 """
 
+import numpy as np
 import pandas as pd
 
+ACTIONS = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+_ACTION_LABELS = np.array(['SELL', 'HOLD', 'BUY'], dtype=object)   # indexed by action code + 1
+
+
+def transitions(signal, position=0):
+    """
+    Runs the position state machine over a series, or over a (time x series) matrix column by column.
+
+    :param signal: Signals per bar; values equal to 1 / -1 are buy / sell, anything else holds
+    :param position: Position before the first bar (scalar, or one per column)
+    :return: (actions, positions) as int8 arrays shaped like signal; action codes are 1 BUY, -1 SELL, 0 HOLD
+    """
+    signal = np.asarray(signal)
+    target = np.where(signal == 1, 1, np.where(signal == -1, -1, 0)).astype(np.int8)
+    # Forward-fill the last non-zero target; bars before the first one keep the starting position
+    rows = np.arange(len(target)).reshape((-1,) + (1,) * (target.ndim - 1))
+    last = np.maximum.accumulate(np.where(target != 0, rows, -1), axis=0)
+    start = np.broadcast_to(np.asarray(position, dtype=np.int8), target.shape[1:])
+    positions = np.where(last >= 0, np.take_along_axis(target, np.maximum(last, 0), axis=0), start)
+    before = np.concatenate([start[None], positions[:-1]], axis=0) if len(target) else positions
+    actions = np.where(positions != before, positions, 0).astype(np.int8)
+    return actions, positions.astype(np.int8)
+
+
+def position_changes(signal, position=0):
+    """
+    Sparse form of transitions() for one series: only the bars where the position changes.
+
+    :return: (bars, positions) with the bar index of every BUY/SELL and the position it opens
+    """
+    signal = np.asarray(signal)
+    target = (signal == 1).view(np.int8) - (signal == -1).view(np.int8)
+    bars = np.flatnonzero(target)
+    values = target[bars]
+    change = np.empty(len(values), dtype=bool)
+    change[:1] = values[:1] != position
+    np.not_equal(values[1:], values[:-1], out=change[1:])
+    return bars[change], values[change]
+
+
+class PositionTable:
+    """
+    Positions keyed by (symbol, strategy), stored as one int8 array with a key -> slot index.
+    """
+
+    def __init__(self, default: int = 0, capacity: int = 64):
+        """
+        :param default: Position of a key that has not been seen yet
+        """
+        self.default = default
+        self._slots = {}
+        self._positions = np.full(capacity, default, dtype=np.int8)
+
+    def slot(self, key) -> int:
+        """Slot index of a key, allocating one for a new key."""
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._slots)
+            if slot == len(self._positions):
+                self._positions = np.concatenate([self._positions, np.full(slot, self.default, dtype=np.int8)])
+            self._positions[slot] = self.default
+            self._slots[key] = slot
+        return slot
+
+    def step(self, key, sig) -> int:
+        """
+        Applies one signal to one key.
+
+        :return: Action code (1 BUY, -1 SELL, 0 HOLD)
+        """
+        slot = self.slot(key)
+        position = self._positions[slot]
+        if sig == 1 and position <= 0:
+            self._positions[slot] = 1
+            return 1
+        if sig == -1 and position >= 0:
+            self._positions[slot] = -1
+            return -1
+        return 0
+
+    def update(self, slots: np.ndarray, signals: np.ndarray) -> np.ndarray:
+        """
+        Applies one signal to each of many (distinct) slots at once.
+
+        :return: int8 action codes (1 BUY, -1 SELL, 0 HOLD)
+        """
+        slots, signals = np.asarray(slots, dtype=np.intp), np.asarray(signals)
+        position = self._positions[slots]
+        buy = (signals == 1) & (position <= 0)
+        sell = (signals == -1) & (position >= 0)
+        self._positions[slots[buy]] = 1
+        self._positions[slots[sell]] = -1
+        return buy.astype(np.int8) - sell
+
+    def __getitem__(self, key) -> int:
+        slot = self._slots.get(key)
+        return self.default if slot is None else int(self._positions[slot])
+
+    def __setitem__(self, key, position: int):
+        self._positions[self.slot(key)] = position
+
+    def __contains__(self, key) -> bool:
+        return key in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def snapshot(self) -> dict:
+        """Key -> position for every tracked key."""
+        return {key: int(self._positions[slot]) for key, slot in self._slots.items()}
+
+    def clear(self):
+        self._slots.clear()
+        self._positions[:] = self.default
+
+
 class SignalProcessor:
     """
     Processes strategy signals and determines concrete trade actions.
@@ -15,36 +137,61 @@ class SignalProcessor:
 
     def __init__(self, position: int = 0):
         """
-        :param position: Current open position (+1 for long, -1 for short, 0 for flat)
+        :param position: Position (+1 for long, -1 for short, 0 for flat) that series start from and
+                         that new streaming keys start with
         """
-        self.position = position
+        self.initial_position = position
+        self.table = PositionTable(default=position)
+
+    @property
+    def position(self) -> int:
+        """Live position of the default stream (on_signal without symbol/strategy)."""
+        return self.table[None, None]
 
-    def process_signals(self, df: pd.DataFrame) -> list:
+    @position.setter
+    def position(self, value: int):
+        self.table[None, None] = value
+
+    def process_signals(self, df: pd.DataFrame, position: int = None) -> list:
         """
         Analyzes signal transitions and generates trade instructions.
+        Pure: the same candles always give the same actions, and no live position is changed.
 
         :param df: DataFrame with 'signal' column
-        :return: List of trade actions: ['BUY', 'SELL', 'HOLD']
+        :param position: Position before the first candle (defaults to the processor's initial position)
+        :return: List of trade actions: ['BUY', 'SELL', 'HOLD'] for every candle after the first
+        """
+        start = self.initial_position if position is None else position
+        signal = df['signal'].to_numpy()[1:]
+        actions, _ = transitions(signal, start)
+        return _ACTION_LABELS[actions + 1].tolist()
+
+    def on_signal(self, sig, symbol: str = None, strategy: str = None) -> str:
         """
-        actions = []
+        Processes one live signal and updates the position of (symbol, strategy).
 
-        for i in range(1, len(df)):
-            prev_sig = df['signal'].iloc[i - 1]
-            curr_sig = df['signal'].iloc[i]
+        :return: 'BUY', 'SELL' or 'HOLD'
+        """
+        return ACTIONS[self.table.step((symbol, strategy), sig)]
 
-            if curr_sig == 1 and self.position <= 0:
-                actions.append('BUY')
-                self.position = 1
-            elif curr_sig == -1 and self.position >= 0:
-                actions.append('SELL')
-                self.position = -1
-            else:
-                actions.append('HOLD')
+    def on_signals(self, signals: dict) -> dict:
+        """
+        Processes one live signal for many keys at once.
+
+        :param signals: (symbol, strategy) -> signal
+        :return: (symbol, strategy) -> 'BUY', 'SELL' or 'HOLD'
+        """
+        keys = list(signals)
+        slots = [self.table.slot(key) for key in keys]
+        codes = self.table.update(slots, np.array([signals[key] for key in keys], dtype=object))
+        return dict(zip(keys, _ACTION_LABELS[codes + 1].tolist()))
 
-        return actions
+    def positions(self) -> dict:
+        """(symbol, strategy) -> live position."""
+        return self.table.snapshot()
 
     def reset(self):
         """
-        Resets the internal position tracker.
+        Resets the internal position tracker (every key back to the initial position).
         """
-        self.position = 0
+        self.table.clear()
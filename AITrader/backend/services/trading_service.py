@@ -6,9 +6,9 @@ Executes futures trades via HTX and CoinEx APIs.
 """
 
 import pandas as pd
-import ccxt
 import logging
 import os
+from backend.data.exchange_pool import get_exchange, load_markets
 
 log = logging.getLogger("Trader")
 
@@ -29,16 +29,17 @@ class TradingService:
         if self.exchange_id not in EXCHANGE_KEYS:
             raise ValueError(f"Unsupported exchange: {exchange}")
 
-        self.exchange = getattr(ccxt, self.exchange_id)({
-            "apiKey": EXCHANGE_KEYS[self.exchange_id]["apiKey"],
-            "secret": EXCHANGE_KEYS[self.exchange_id]["secret"],
-            "enableRateLimit": True,
-            "options": {"defaultType": "future"}  # Critical for futures
-        })
+        self.exchange = get_exchange(
+            self.exchange_id,
+            EXCHANGE_KEYS[self.exchange_id]["apiKey"],
+            EXCHANGE_KEYS[self.exchange_id]["secret"],
+            options={"defaultType": "future"}  # Critical for futures
+        )
 
     def place_futures_order(self, symbol: str, side: str, amount: float, leverage: int = 1,
                              use_pct: float = None, stop_loss: float = None, trailing_stop: float = None):
         try:
+            load_markets(self.exchange)
             market = self.exchange.market(symbol)
             self.exchange.set_leverage(leverage, symbol)
 
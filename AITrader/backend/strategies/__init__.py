@@ -1,28 +1,36 @@
-# Placeholder for __init__.py
 """
 __init__.py
 -----------
 Initializes the strategies module and provides factory logic to load strategies dynamically.
+Strategy modules are imported lazily: only the registry is loaded up front, and the names below
+are resolved on first attribute access.
 """
 
-from .classic import ClassicStrategies
-from .ai_generated import AILearnedMomentum, AIGeneratedExperiment
+import importlib
+from .registry import REGISTRY, get_strategy, register_strategy, list_strategies, run_strategy
 
+# Unified registry: built-ins, `aitrader.strategies` entry points and runtime-registered strategies
+STRATEGY_REGISTRY = REGISTRY
 
-# Optional registry to manage available strategies
-STRATEGY_REGISTRY = {
-    "sma_crossover": ClassicStrategies.sma_crossover,
-    "rsi_strategy": ClassicStrategies.rsi_strategy,
-    "bollinger_bands": ClassicStrategies.bollinger_bands,
-    "ai_momentum": AILearnedMomentum(),
-    # Dynamic strategies can be loaded manually
+_LAZY_EXPORTS = {
+    "ClassicStrategies": ".classic",
+    "AILearnedMomentum": ".ai_generated",
+    "AIGeneratedExperiment": ".ai_generated",
+    "IndicatorCache": ".indicator_cache",
+    "INDICATOR_CACHE": ".indicator_cache",
+    "ArrayStrategy": ".array_strategy",
+    "OHLCVArrays": ".array_strategy",
+    "get_array_strategy": ".array_strategy",
+    "PriceMatrix": ".batch",
+    "evaluate_universe": ".batch",
+    "SandboxPool": ".sandbox",
+    "get_sandbox": ".sandbox",
 }
 
-def get_strategy(name: str):
-    """
-    Retrieve a strategy by name from the registry.
 
-    :param name: Key in STRATEGY_REGISTRY
-    :return: Callable or BaseStrategy instance
-    """
-    return STRATEGY_REGISTRY.get(name)
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
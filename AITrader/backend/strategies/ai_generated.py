@@ -8,7 +8,8 @@ such as language model prompts, reinforcement learning, or genetic programming.
 
 import pandas as pd
 from backend.strategies.base_strategy import BaseStrategy
-import numpy as np
+from backend.strategies.indicator_cache import IndicatorCache, INDICATOR_CACHE
+from backend.strategies.sandbox import SandboxPool, code_hash, get_sandbox
 
 
 class AILearnedMomentum(BaseStrategy):
@@ -16,10 +17,18 @@ class AILearnedMomentum(BaseStrategy):
     A basic example of an AI-inspired momentum strategy derived from learned behaviors.
     """
 
+    def __init__(self, window: int = 5, cache: IndicatorCache = None):
+        """
+        :param window: Number of returns averaged into the momentum score
+        :param cache: Indicator cache (defaults to the shared INDICATOR_CACHE)
+        """
+        self.window = window
+        self.cache = INDICATOR_CACHE if cache is None else cache
+
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
         df = df.copy()
-        df['returns'] = df['close'].pct_change()
-        df['momentum_score'] = df['returns'].rolling(window=5).mean()
+        df['returns'] = self.cache.pct_change(df['close'])
+        df['momentum_score'] = self.cache.return_mean(df['close'], self.window)
 
         df['signal'] = 0
         df.loc[df['momentum_score'] > 0, 'signal'] = 1
@@ -41,19 +50,25 @@ class AILearnedMomentum(BaseStrategy):
 
 class AIGeneratedExperiment(BaseStrategy):
     """
-    Placeholder for dynamically synthesized strategies via LLMs or evolution pipelines.
-    Can be updated at runtime by the AI system.
+    Dynamically synthesized strategy (LLM or evolution pipeline).
+    The code is compiled once per code hash and executed in the sandbox worker pool, so a slow,
+    looping or crashing strategy cannot stall the caller; failing strategies are quarantined.
     """
 
-    def __init__(self, strategy_code: str, strategy_name: str = "Generated Strategy"):
+    def __init__(self, strategy_code: str, strategy_name: str = "Generated Strategy", sandbox: SandboxPool = None):
+        """
+        :param strategy_code: Generated source (a function taking `df`, or a script rebinding `df`)
+        :param strategy_name: Name used in logs and sandbox statistics
+        :param sandbox: Sandbox pool (defaults to the process-wide pool)
+        """
         self._strategy_code = strategy_code
         self._strategy_name = strategy_name
+        self.sandbox = sandbox
+        self.code_hash = code_hash(strategy_code)
 
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        # In production, consider sandboxing or AST-safe parsing
-        local_vars = {'df': df.copy(), 'np': np, 'pd': pd}
-        exec(self._strategy_code, {}, local_vars)
-        return local_vars.get('df', df)
+        sandbox = self.sandbox or get_sandbox()
+        return df.assign(signal=sandbox.run(self._strategy_code, df, self._strategy_name))
 
     @property
     def name(self) -> str:
@@ -0,0 +1,245 @@
+"""
+array_strategy.py
+-----------------
+Array-native strategy interface. Strategies receive read-only NumPy column views and return a
+compact int8 signal array (1 buy, -1 sell, 0 none) without materializing DataFrames or helper columns.
+Adapters run any STRATEGY_REGISTRY entry through this interface and expose array strategies as BaseStrategy.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from backend.data.ohlcv_store import OHLCVStore, OHLCV_COLUMNS
+from backend.strategies.base_strategy import BaseStrategy
+from backend.strategies.indicator_cache import IndicatorCache, INDICATOR_CACHE
+from backend.strategies.registry import get_strategy, run_strategy
+
+SIGNAL_VALUES = {"buy": 1, "long": 1, "sell": -1, "short": -1}
+
+
+def _readonly(values, dtype=None) -> np.ndarray:
+    view = np.asarray(values, dtype=dtype).view()
+    view.flags.writeable = False
+    return view
+
+
+@dataclass(frozen=True)
+class OHLCVArrays:
+    """
+    Read-only column views of one OHLCV series; 'timestamp' is int64 epoch-ms.
+    """
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @classmethod
+    def from_columns(cls, cols: dict) -> "OHLCVArrays":
+        """Wraps a dict of column arrays (e.g. from OHLCVStore.read_range) without copying."""
+        return cls(**{col: _readonly(cols[col]) for col in OHLCV_COLUMNS})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "OHLCVArrays":
+        """Views the columns of an OHLCV DataFrame; float64 columns and ms timestamps are not copied."""
+        ts = df['timestamp'].to_numpy()
+        if np.issubdtype(ts.dtype, np.datetime64):
+            ts = ts.astype('datetime64[ms]', copy=False).view(np.int64)
+        cols = {col: df[col].to_numpy() for col in OHLCV_COLUMNS[1:]}
+        return cls(timestamp=_readonly(ts, np.int64), **{col: _readonly(v) for col, v in cols.items()})
+
+    @classmethod
+    def from_store(cls, store: OHLCVStore, symbol: str, timeframe: str, start=None, end=None) -> "OHLCVArrays":
+        """Reads a range from the columnar store; single-day ranges stay memory-mapped."""
+        return cls.from_columns(store.read_range(symbol, timeframe, start, end))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materializes a DataFrame (timestamp as datetime64[ms]) for DataFrame-based strategies."""
+        data = {col: getattr(self, col) for col in OHLCV_COLUMNS}
+        data['timestamp'] = self.timestamp.view('datetime64[ms]')
+        return pd.DataFrame(data, columns=OHLCV_COLUMNS)
+
+
+def signal_from_masks(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+    """Builds an int8 signal from boolean masks; sell wins where both are set, as in the DataFrame strategies."""
+    signal = np.asarray(buy, dtype=bool).astype(np.int8)
+    signal[np.asarray(sell, dtype=bool)] = -1
+    return signal
+
+
+def to_signal_array(signal) -> np.ndarray:
+    """
+    Converts a 'signal' column (numeric, or 'buy'/'sell'/'long'/'short' strings) to an int8 array.
+    """
+    signal = pd.Series(signal, copy=False)
+    if signal.dtype == object or pd.api.types.is_string_dtype(signal.dtype):
+        signal = signal.map(SIGNAL_VALUES)
+    return np.sign(np.nan_to_num(signal.to_numpy(dtype=np.float64))).astype(np.int8)
+
+
+class ArrayStrategy(ABC):
+    """
+    Abstract base class for array-native strategies.
+    """
+
+    @abstractmethod
+    def compute_signals(self, cols: OHLCVArrays) -> np.ndarray:
+        """
+        Computes the signal for every bar.
+
+        :param cols: Read-only OHLCV column views
+        :return: int8 array of len(cols): 1 buy, -1 sell, 0 none
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """
+        Human-readable name of the strategy.
+        """
+        pass
+
+
+class ArraySMACrossover(ArrayStrategy):
+    """Array-native ClassicStrategies.sma_crossover."""
+
+    def __init__(self, short_window: int = 20, long_window: int = 50, cache: IndicatorCache = None):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.cache = INDICATOR_CACHE if cache is None else cache
+
+    def compute_signals(self, cols: OHLCVArrays) -> np.ndarray:
+        close = pd.Series(cols.close, copy=False)
+        short = self.cache.sma(close, self.short_window, min_periods=1).to_numpy()
+        long = self.cache.sma(close, self.long_window, min_periods=1).to_numpy()
+        return signal_from_masks(short > long, short < long)
+
+    @property
+    def name(self) -> str:
+        return "SMA Crossover"
+
+
+class ArrayRSI(ArrayStrategy):
+    """Array-native ClassicStrategies.rsi_strategy."""
+
+    def __init__(self, period: int = 14, lower: float = 30, upper: float = 70, smoothing: str = "simple",
+                 cache: IndicatorCache = None):
+        self.period = period
+        self.lower = lower
+        self.upper = upper
+        self.smoothing = smoothing
+        self.cache = INDICATOR_CACHE if cache is None else cache
+
+    def compute_signals(self, cols: OHLCVArrays) -> np.ndarray:
+        rsi = self.cache.rsi(pd.Series(cols.close, copy=False), self.period, self.smoothing).to_numpy()
+        return signal_from_masks(rsi < self.lower, rsi > self.upper)
+
+    @property
+    def name(self) -> str:
+        return "RSI"
+
+
+class ArrayBollinger(ArrayStrategy):
+    """Array-native ClassicStrategies.bollinger_bands."""
+
+    def __init__(self, window: int = 20, num_std_dev: float = 2, cache: IndicatorCache = None):
+        self.window = window
+        self.num_std_dev = num_std_dev
+        self.cache = INDICATOR_CACHE if cache is None else cache
+
+    def compute_signals(self, cols: OHLCVArrays) -> np.ndarray:
+        close = pd.Series(cols.close, copy=False)
+        ma = self.cache.sma(close, self.window).to_numpy()
+        std = self.cache.rolling_std(close, self.window).to_numpy()
+        return signal_from_masks(cols.close < ma - self.num_std_dev * std, cols.close > ma + self.num_std_dev * std)
+
+    @property
+    def name(self) -> str:
+        return "Bollinger Bands"
+
+
+class ArrayMomentum(ArrayStrategy):
+    """Array-native AILearnedMomentum."""
+
+    def __init__(self, window: int = 5, cache: IndicatorCache = None):
+        self.window = window
+        self.cache = INDICATOR_CACHE if cache is None else cache
+
+    def compute_signals(self, cols: OHLCVArrays) -> np.ndarray:
+        score = self.cache.return_mean(pd.Series(cols.close, copy=False), self.window).to_numpy()
+        return signal_from_masks(score > 0, score < 0)
+
+    @property
+    def name(self) -> str:
+        return "AI-Learned Momentum"
+
+
+class FrameStrategyAdapter(ArrayStrategy):
+    """
+    Runs a DataFrame strategy (callable or BaseStrategy) through the array interface.
+    The DataFrame is materialized for the wrapped strategy; only the signal is kept.
+    """
+
+    def __init__(self, strategy, name: str = None):
+        self.strategy = strategy
+        self._name = name or getattr(strategy, "name", None) or getattr(strategy, "__name__", "strategy")
+
+    def compute_signals(self, cols: OHLCVArrays) -> np.ndarray:
+        result = run_strategy(self.strategy, cols.to_frame())
+        if 'signal' not in result.columns:
+            return np.zeros(len(cols), dtype=np.int8)
+        return to_signal_array(result['signal'])
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+
+class ArrayStrategyAdapter(BaseStrategy):
+    """
+    Exposes an ArrayStrategy as a BaseStrategy, so it can be placed in STRATEGY_REGISTRY.
+    """
+
+    def __init__(self, strategy: ArrayStrategy):
+        self.strategy = strategy
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.assign(signal=self.strategy.compute_signals(OHLCVArrays.from_frame(df)))
+
+    @property
+    def name(self) -> str:
+        return self.strategy.name
+
+    @property
+    def description(self) -> str:
+        return f"Array-native {self.strategy.name}."
+
+
+# Native versions of the built-in registry entries
+ARRAY_STRATEGIES = {
+    "sma_crossover": ArraySMACrossover,
+    "rsi_strategy": ArrayRSI,
+    "bollinger_bands": ArrayBollinger,
+    "ai_momentum": ArrayMomentum,
+}
+
+
+def get_array_strategy(name: str, **params) -> ArrayStrategy:
+    """
+    Returns an array strategy by registry name: the native version when one exists,
+    otherwise the STRATEGY_REGISTRY entry wrapped in a FrameStrategyAdapter.
+
+    :param name: Key in STRATEGY_REGISTRY
+    :param params: Parameters for a native strategy
+    :return: ArrayStrategy, or None if the name is unknown
+    """
+    if name in ARRAY_STRATEGIES:
+        return ARRAY_STRATEGIES[name](**params)
+    strategy = get_strategy(name)
+    return FrameStrategyAdapter(strategy, name) if strategy is not None else None
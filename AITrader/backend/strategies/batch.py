@@ -0,0 +1,225 @@
+"""
+batch.py
+--------
+Cross-symbol batch evaluation. Many symbols are aligned onto a common timestamp index as
+(time x symbol) matrices, and the built-in strategies run as single vectorized operations over
+the whole matrix, producing a signal matrix plus per-symbol metrics.
+
+Missing bars (gaps, or bars before a symbol was listed) are NaN in the price matrices and False in
+`mask`. Indicators are rolled over each symbol's own bars (its masked rows, packed together) and the
+signals scattered back onto the common time grid, so every symbol gets exactly the signals of its own
+DataFrame strategy, whatever the gaps of the other symbols; signals on missing bars are always 0.
+"""
+
+import logging
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from backend.data.ohlcv_store import OHLCVStore, OHLCV_COLUMNS, to_epoch_ms
+
+log = logging.getLogger("Batch")
+
+PRICE_FIELDS = OHLCV_COLUMNS[1:]
+
+
+@dataclass
+class PriceMatrix:
+    """
+    Aligned OHLCV data for a universe of symbols.
+    """
+    timestamp: np.ndarray   # (T,) int64 epoch-ms, sorted union of all symbols' bars
+    symbols: list           # S symbol names, column order of every matrix
+    fields: dict            # field -> (T, S) float64 matrix, NaN where a bar is missing
+    mask: np.ndarray        # (T, S) bool, True where the symbol has a bar
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.fields['close']
+
+    @classmethod
+    def from_columns(cls, series: dict) -> "PriceMatrix":
+        """
+        Aligns per-symbol column arrays.
+
+        :param series: Symbol -> dict of OHLCV column arrays with int64 epoch-ms 'timestamp'
+        :return: PriceMatrix
+        """
+        symbols = list(series)
+        stamps = [np.asarray(series[s]['timestamp'], dtype=np.int64) for s in symbols]
+        timestamp = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, dtype=np.int64)
+        fields = {f: np.full((len(timestamp), len(symbols)), np.nan) for f in PRICE_FIELDS}
+        mask = np.zeros((len(timestamp), len(symbols)), dtype=bool)
+        for j, (symbol, ts) in enumerate(zip(symbols, stamps)):
+            rows = np.searchsorted(timestamp, ts)
+            mask[rows, j] = True
+            for f in PRICE_FIELDS:
+                fields[f][rows, j] = series[symbol][f]
+        return cls(timestamp=timestamp, symbols=symbols, fields=fields, mask=mask)
+
+    @classmethod
+    def from_frames(cls, frames: dict) -> "PriceMatrix":
+        """Aligns per-symbol OHLCV DataFrames."""
+        series = {}
+        for symbol, df in frames.items():
+            cols = {f: df[f].to_numpy(dtype=np.float64) for f in PRICE_FIELDS}
+            cols['timestamp'] = to_epoch_ms(df['timestamp'])
+            series[symbol] = cols
+        return cls.from_columns(series)
+
+    @classmethod
+    def from_store(cls, store: OHLCVStore, symbols: list, timeframe: str, start=None, end=None) -> "PriceMatrix":
+        """Aligns a range of every symbol in the columnar store (symbols without data are skipped)."""
+        series = {}
+        for symbol in symbols:
+            cols = store.read_range(symbol, timeframe, start, end)
+            if len(cols['timestamp']):
+                series[symbol] = cols
+        return cls.from_columns(series)
+
+    def frame(self, field: str = 'close') -> pd.DataFrame:
+        """Returns one field as a DataFrame indexed by timestamp with a column per symbol."""
+        return pd.DataFrame(self.fields[field], index=self.timestamp.view('datetime64[ms]'), columns=self.symbols)
+
+
+class _OwnBars:
+    """
+    Each symbol's own bars packed to the top of its column (NaN below), so rolling windows only span
+    bars the symbol actually has.
+    """
+
+    def __init__(self, pm: PriceMatrix):
+        self.shape = pm.mask.shape
+        self.rows, self.cols = np.nonzero(pm.mask)
+        self.slots = (np.cumsum(pm.mask, axis=0) - 1)[self.rows, self.cols]
+        packed = np.full((pm.mask.sum(axis=0).max(initial=0), len(pm.symbols)), np.nan)
+        packed[self.slots, self.cols] = pm.close[self.rows, self.cols]
+        self.close = packed
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.close, copy=False)
+
+    def signals(self, buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+        """Packed buy/sell conditions -> (T, S) int8 signal matrix on the time grid (0 on missing bars)."""
+        packed = buy.astype(np.int8)
+        packed[sell] = -1
+        signal = np.zeros(self.shape, dtype=np.int8)
+        signal[self.rows, self.cols] = packed[self.slots, self.cols]
+        return signal
+
+
+# ---------------------------------------------------------------------- vectorized strategies
+
+def sma_crossover(pm: PriceMatrix, short_window: int = 20, long_window: int = 50) -> np.ndarray:
+    """Matrix version of ClassicStrategies.sma_crossover; returns a (T, S) int8 signal matrix."""
+    bars = _OwnBars(pm)
+    close = bars.frame()
+    short = close.rolling(window=short_window, min_periods=1).mean().to_numpy()
+    long = close.rolling(window=long_window, min_periods=1).mean().to_numpy()
+    return bars.signals(short > long, short < long)
+
+
+def rsi_strategy(pm: PriceMatrix, period: int = 14, lower: float = 30, upper: float = 70,
+                 smoothing: str = "simple") -> np.ndarray:
+    """Matrix version of ClassicStrategies.rsi_strategy; returns a (T, S) int8 signal matrix."""
+    bars = _OwnBars(pm)
+    delta = bars.frame().diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    if smoothing == "wilder":
+        avg_gain = gain.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+        avg_loss = loss.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    else:
+        avg_gain = gain.rolling(window=period).mean()
+        avg_loss = loss.rolling(window=period).mean()
+    rsi = (100 - (100 / (1 + avg_gain / avg_loss))).to_numpy()
+    return bars.signals(rsi < lower, rsi > upper)
+
+
+def bollinger_bands(pm: PriceMatrix, window: int = 20, num_std_dev: float = 2) -> np.ndarray:
+    """Matrix version of ClassicStrategies.bollinger_bands; returns a (T, S) int8 signal matrix."""
+    bars = _OwnBars(pm)
+    rolling = bars.frame().rolling(window=window)
+    ma, std = rolling.mean().to_numpy(), rolling.std().to_numpy()
+    return bars.signals(bars.close < ma - num_std_dev * std, bars.close > ma + num_std_dev * std)
+
+
+def ai_momentum(pm: PriceMatrix, window: int = 5) -> np.ndarray:
+    """Matrix version of AILearnedMomentum; returns a (T, S) int8 signal matrix."""
+    bars = _OwnBars(pm)
+    score = bars.frame().pct_change().rolling(window=window).mean().to_numpy()
+    return bars.signals(score > 0, score < 0)
+
+
+BATCH_STRATEGIES = {
+    "sma_crossover": sma_crossover,
+    "rsi_strategy": rsi_strategy,
+    "bollinger_bands": bollinger_bands,
+    "ai_momentum": ai_momentum,
+}
+
+
+# ---------------------------------------------------------------------- metrics
+
+def universe_metrics(pm: PriceMatrix, signals: np.ndarray, periods_per_year: float = 252) -> pd.DataFrame:
+    """
+    Per-symbol performance of a signal matrix. The last signal is held across missing bars and
+    applied to the next available close, so gaps neither create nor drop PnL.
+
+    :return: DataFrame indexed by symbol with total_return, sharpe, trades, exposure and bars
+    """
+    close = pd.DataFrame(pm.close, copy=False).ffill().to_numpy()
+    position = pd.DataFrame(np.where(pm.mask, signals, np.nan), copy=False).ffill().fillna(0).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close[1:] / close[:-1] - 1
+    returns[~pm.mask[1:]] = 0.0
+    returns = np.nan_to_num(returns)
+    pnl = position[:-1] * returns
+
+    bars = pm.mask.sum(axis=0)
+    periods = np.maximum(bars - 1, 1)
+    mean = pnl.sum(axis=0) / periods
+    var = np.maximum((pnl * pnl).sum(axis=0) - periods * mean * mean, 0.0) / np.maximum(periods - 1, 1)
+    std = np.sqrt(var)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+        total_return = np.expm1(np.log1p(np.maximum(pnl, -1 + 1e-12)).sum(axis=0))
+    changes = np.diff(position, axis=0, prepend=0) != 0
+    return pd.DataFrame({
+        'total_return': total_return,
+        'sharpe': sharpe,
+        'trades': changes.sum(axis=0),
+        'exposure': np.where(pm.mask, position != 0, False).sum(axis=0) / np.maximum(bars, 1),
+        'bars': bars,
+    }, index=pd.Index(pm.symbols, name='symbol'))
+
+
+@dataclass
+class BatchResult:
+    """
+    Output of a universe-wide evaluation.
+    """
+    signals: np.ndarray       # (T, S) int8
+    metrics: pd.DataFrame     # per-symbol metrics
+    latest: pd.Series         # most recent signal of each symbol (from its last available bar)
+
+
+def evaluate_universe(pm: PriceMatrix, strategy: str = "sma_crossover", periods_per_year: float = 252,
+                      **params) -> BatchResult:
+    """
+    Runs one built-in strategy over every symbol at once.
+
+    :param pm: Aligned PriceMatrix
+    :param strategy: Key of BATCH_STRATEGIES
+    :param periods_per_year: Bars per year used to annualize the Sharpe ratio
+    :param params: Strategy parameters (e.g. short_window=10)
+    :return: BatchResult with the signal matrix, per-symbol metrics and latest signals
+    """
+    if strategy not in BATCH_STRATEGIES:
+        raise ValueError(f"Unsupported strategy for batch evaluation: {strategy}")
+    signals = BATCH_STRATEGIES[strategy](pm, **params)
+    metrics = universe_metrics(pm, signals, periods_per_year)
+
+    last_row = np.where(pm.mask.any(axis=0), len(pm.mask) - 1 - np.argmax(pm.mask[::-1], axis=0), 0)
+    latest = pd.Series(signals[last_row, np.arange(len(pm.symbols))], index=metrics.index, name='signal')
+    log.info(f"[Batch] 📊 {strategy} over {len(pm.symbols)} symbols x {len(pm.timestamp)} bars")
+    return BatchResult(signals=signals, metrics=metrics, latest=latest)
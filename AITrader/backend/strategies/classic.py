@@ -8,10 +8,12 @@ These act as a base reference for benchmarking AI-generated techniques.
 """
 
 import pandas as pd
+from backend.strategies.indicator_cache import IndicatorCache, INDICATOR_CACHE
 
 class ClassicStrategies:
     @staticmethod
-    def sma_crossover(df: pd.DataFrame, short_window: int = 20, long_window: int = 50) -> pd.DataFrame:
+    def sma_crossover(df: pd.DataFrame, short_window: int = 20, long_window: int = 50,
+                      cache: IndicatorCache = None) -> pd.DataFrame:
         """
         Simple Moving Average Crossover strategy.
         Generates buy/sell signals based on SMA crossovers.
@@ -19,11 +21,13 @@ class ClassicStrategies:
         :param df: DataFrame with 'close' price.
         :param short_window: Window size for short-term SMA.
         :param long_window: Window size for long-term SMA.
+        :param cache: Indicator cache (defaults to the shared INDICATOR_CACHE).
         :return: DataFrame with 'signal' column.
         """
+        cache = INDICATOR_CACHE if cache is None else cache
         df = df.copy()
-        df['sma_short'] = df['close'].rolling(window=short_window, min_periods=1).mean()
-        df['sma_long'] = df['close'].rolling(window=long_window, min_periods=1).mean()
+        df['sma_short'] = cache.sma(df['close'], short_window, min_periods=1)
+        df['sma_long'] = cache.sma(df['close'], long_window, min_periods=1)
 
         df['signal'] = 0
         df.loc[df['sma_short'] > df['sma_long'], 'signal'] = 1
@@ -31,7 +35,8 @@ class ClassicStrategies:
         return df
 
     @staticmethod
-    def rsi_strategy(df: pd.DataFrame, period: int = 14, lower: float = 30, upper: float = 70) -> pd.DataFrame:
+    def rsi_strategy(df: pd.DataFrame, period: int = 14, lower: float = 30, upper: float = 70,
+                     smoothing: str = "simple", cache: IndicatorCache = None) -> pd.DataFrame:
         """
         RSI overbought/oversold strategy.
 
@@ -39,18 +44,13 @@ class ClassicStrategies:
         :param period: RSI calculation period.
         :param lower: Oversold threshold.
         :param upper: Overbought threshold.
+        :param smoothing: 'simple' (rolling mean) or 'wilder' (EMA with alpha=1/period).
+        :param cache: Indicator cache (defaults to the shared INDICATOR_CACHE).
         :return: DataFrame with 'rsi' and 'signal' columns.
         """
+        cache = INDICATOR_CACHE if cache is None else cache
         df = df.copy()
-        delta = df['close'].diff()
-        gain = delta.clip(lower=0)
-        loss = -delta.clip(upper=0)
-
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-
-        rs = avg_gain / avg_loss
-        df['rsi'] = 100 - (100 / (1 + rs))
+        df['rsi'] = cache.rsi(df['close'], period, smoothing)
 
         df['signal'] = 0
         df.loc[df['rsi'] < lower, 'signal'] = 1  # Buy
@@ -58,18 +58,21 @@ class ClassicStrategies:
         return df
 
     @staticmethod
-    def bollinger_bands(df: pd.DataFrame, window: int = 20, num_std_dev: float = 2) -> pd.DataFrame:
+    def bollinger_bands(df: pd.DataFrame, window: int = 20, num_std_dev: float = 2,
+                        cache: IndicatorCache = None) -> pd.DataFrame:
         """
         Bollinger Bands breakout strategy.
 
         :param df: DataFrame with 'close' price.
         :param window: Rolling window.
         :param num_std_dev: Number of standard deviations for the band.
+        :param cache: Indicator cache (defaults to the shared INDICATOR_CACHE).
         :return: DataFrame with bands and 'signal'.
         """
+        cache = INDICATOR_CACHE if cache is None else cache
         df = df.copy()
-        df['ma'] = df['close'].rolling(window=window).mean()
-        df['std'] = df['close'].rolling(window=window).std()
+        df['ma'] = cache.sma(df['close'], window)
+        df['std'] = cache.rolling_std(df['close'], window)
         df['upper_band'] = df['ma'] + num_std_dev * df['std']
         df['lower_band'] = df['ma'] - num_std_dev * df['std']
 
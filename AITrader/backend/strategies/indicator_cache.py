@@ -0,0 +1,145 @@
+"""
+indicator_cache.py
+------------------
+Memoized indicator computations shared by every strategy evaluated over the same candles.
+Results are keyed by (data fingerprint, indicator, params), so running many strategies over one
+dataset computes each distinct indicator once. Entries are evicted LRU-first on an entry/byte budget.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+INDICATOR_CACHE_ENTRIES = int(os.getenv("INDICATOR_CACHE_ENTRIES", 1024))
+INDICATOR_CACHE_MB = int(os.getenv("INDICATOR_CACHE_MB", 64))
+
+
+def fingerprint(series: pd.Series) -> str:
+    """Content hash of a series' values (the index is ignored)."""
+    values = np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+    return hashlib.blake2b(values.view(np.uint8), digest_size=16).hexdigest()
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator arrays. Returned series share the cached (read-only) buffer and
+    carry the caller's index; assigning them into a DataFrame column is free.
+    """
+
+    def __init__(self, max_entries: int = INDICATOR_CACHE_ENTRIES, max_bytes: int = INDICATOR_CACHE_MB * 1024 * 1024):
+        """
+        :param max_entries: Maximum number of cached indicator arrays
+        :param max_bytes: Maximum total size of cached arrays
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # (fingerprint, name, params) -> read-only ndarray
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, series: pd.Series, name: str, params: tuple, compute) -> pd.Series:
+        """
+        Returns a cached indicator, computing it on a miss.
+
+        :param series: Input series (e.g. close prices)
+        :param name: Indicator name
+        :param params: Hashable indicator parameters
+        :param compute: Callable(series) -> Series/array, used on a miss
+        :return: Indicator series aligned to `series.index`
+        """
+        key = (fingerprint(series), name, params)
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if values is None:
+            values = np.asarray(compute(series), dtype=np.float64).copy()
+            values.flags.writeable = False
+            with self._lock:
+                self.misses += 1
+                self._store(key, values)
+        return pd.Series(values, index=series.index, name=name, copy=False)
+
+    def _store(self, key, values: np.ndarray):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        self._entries[key] = values
+        self._bytes += values.nbytes
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    # ------------------------------------------------------------------ indicators
+
+    def sma(self, series: pd.Series, window: int, min_periods: int = None) -> pd.Series:
+        """Simple moving average, as `series.rolling(window, min_periods).mean()`."""
+        return self.get(series, "sma", (window, min_periods),
+                        lambda s: s.rolling(window=window, min_periods=min_periods).mean())
+
+    def rolling_std(self, series: pd.Series, window: int, min_periods: int = None, ddof: int = 1) -> pd.Series:
+        """Rolling standard deviation, as `series.rolling(window, min_periods).std(ddof)`."""
+        return self.get(series, "rolling_std", (window, min_periods, ddof),
+                        lambda s: s.rolling(window=window, min_periods=min_periods).std(ddof=ddof))
+
+    def diff(self, series: pd.Series, periods: int = 1) -> pd.Series:
+        """First difference."""
+        return self.get(series, "diff", (periods,), lambda s: s.diff(periods))
+
+    def pct_change(self, series: pd.Series, periods: int = 1) -> pd.Series:
+        """Simple returns."""
+        return self.get(series, "pct_change", (periods,), lambda s: s.pct_change(periods))
+
+    def return_mean(self, series: pd.Series, window: int) -> pd.Series:
+        """Rolling mean of simple returns."""
+        return self.get(series, "return_mean", (window,),
+                        lambda s: self.pct_change(s).rolling(window=window).mean())
+
+    def rsi(self, series: pd.Series, period: int = 14, smoothing: str = "simple") -> pd.Series:
+        """Relative Strength Index with 'simple' (rolling mean) or 'wilder' smoothing."""
+        if smoothing not in ("simple", "wilder"):
+            raise ValueError("smoothing must be 'simple' or 'wilder'")
+
+        def compute(s):
+            delta = self.diff(s)
+            gain = delta.clip(lower=0)
+            loss = -delta.clip(upper=0)
+            if smoothing == "wilder":
+                avg_gain = gain.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+                avg_loss = loss.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+            else:
+                avg_gain = gain.rolling(window=period).mean()
+                avg_loss = loss.rolling(window=period).mean()
+            rs = avg_gain / avg_loss
+            return 100 - (100 / (1 + rs))
+
+        return self.get(series, "rsi", (period, smoothing), compute)
+
+    # ------------------------------------------------------------------ bookkeeping
+
+    def stats(self) -> dict:
+        """Returns hit/miss/eviction counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self._entries), "bytes": self._bytes}
+
+    def clear(self):
+        """Drops all entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+# Process-wide cache shared by the built-in strategies
+INDICATOR_CACHE = IndicatorCache()
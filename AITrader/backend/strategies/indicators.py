@@ -0,0 +1,258 @@
+"""
+indicators.py
+-------------
+Stateful, incremental indicators that are seeded once from history and then updated in O(1) per bar.
+The update rules mirror pandas' rolling/ewm kernels (Kahan-compensated running sums and Welford's
+variance), so streaming values are bit-for-bit identical to the batch DataFrame computations.
+"""
+
+import math
+import sys
+from collections import deque
+
+
+class RollingMean:
+    """
+    Running mean over a fixed window; matches `Series.rolling(window, min_periods).mean()`.
+    """
+
+    def __init__(self, window: int, min_periods: int = None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._buffer = deque()
+        self._nobs = 0
+        self._sum = 0.0
+        self._neg_count = 0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same_count = 0
+        self._prev = math.nan
+        self.value = math.nan
+
+    def seed(self, values) -> "RollingMean":
+        for v in values:
+            self.update(v)
+        return self
+
+    def _add(self, val: float):
+        if val == val:
+            self._nobs += 1
+            y = val - self._comp_add
+            t = self._sum + y
+            self._comp_add = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, val) < 0:
+                self._neg_count += 1
+            self._same_count = self._same_count + 1 if val == self._prev else 1
+            self._prev = val
+
+    def _remove(self, val: float):
+        if val == val:
+            self._nobs -= 1
+            y = -val - self._comp_remove
+            t = self._sum + y
+            self._comp_remove = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, val) < 0:
+                self._neg_count -= 1
+
+    def update(self, val: float) -> float:
+        val = float(val)
+        self._buffer.append(val)
+        if len(self._buffer) > self.window:
+            self._remove(self._buffer.popleft())
+        self._add(val)
+
+        if self._nobs >= self.min_periods and self._nobs > 0:
+            result = self._sum / self._nobs
+            if self._same_count >= self._nobs:
+                result = self._prev
+            elif self._neg_count == 0 and result < 0:
+                result = 0.0
+            elif self._neg_count == self._nobs and result > 0:
+                result = 0.0
+        else:
+            result = math.nan
+        self.value = result
+        return result
+
+
+class RollingStd:
+    """
+    Rolling standard deviation via Welford's online algorithm;
+    matches `Series.rolling(window, min_periods).std(ddof)`.
+    Like pandas, the window is recomputed from scratch when an update loses too much precision.
+    """
+
+    _INV_COND_TOL = sys.float_info.epsilon * 1e3
+
+    def __init__(self, window: int, min_periods: int = None, ddof: int = 1):
+        self.window = window
+        self.min_periods = max(window if min_periods is None else min_periods, 1)
+        self.ddof = ddof
+        self._buffer = deque()
+        self._reset()
+        self._unstable = False
+        self.value = math.nan
+
+    def seed(self, values) -> "RollingStd":
+        for v in values:
+            self.update(v)
+        return self
+
+    def _reset(self):
+        self._nobs = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+
+    def _add(self, val: float):
+        if val != val:
+            return
+        prev_m2 = self._ssqdm
+        self._nobs += 1
+        prev_mean = self._mean - self._comp_add
+        y = val - self._comp_add
+        t = y - self._mean
+        self._comp_add = t + self._mean - y
+        self._mean = self._mean + t / self._nobs
+        self._ssqdm = self._ssqdm + (val - prev_mean) * (val - self._mean)
+        if prev_m2 * self._INV_COND_TOL > self._ssqdm:
+            self._unstable = True
+
+    def _remove(self, val: float):
+        if val != val:
+            return
+        prev_m2 = self._ssqdm
+        self._nobs -= 1
+        if self._nobs:
+            prev_mean = self._mean - self._comp_remove
+            y = val - self._comp_remove
+            t = y - self._mean
+            self._comp_remove = t + self._mean - y
+            self._mean = self._mean - t / self._nobs
+            self._ssqdm = self._ssqdm - (val - prev_mean) * (val - self._mean)
+            if prev_m2 * self._INV_COND_TOL > self._ssqdm:
+                self._unstable = True
+        else:
+            self._mean = 0.0
+            self._ssqdm = 0.0
+            self._unstable = False
+
+    def update(self, val: float) -> float:
+        val = float(val)
+        self._buffer.append(val)
+        if len(self._buffer) > self.window:
+            self._remove(self._buffer.popleft())
+        self._add(val)
+        if self._unstable:
+            self._reset()
+            for v in self._buffer:
+                self._add(v)
+            self._unstable = False
+
+        if self._nobs >= self.min_periods and self._nobs > self.ddof:
+            variance = self._ssqdm / (self._nobs - self.ddof)
+            result = math.sqrt(variance) if variance >= 0 else 0.0
+        else:
+            result = math.nan
+        self.value = result
+        return result
+
+
+class WilderMean:
+    """
+    Wilder smoothing (EMA with alpha = 1 / period);
+    matches `Series.ewm(alpha=1/period, adjust=False, min_periods=period).mean()`.
+    """
+
+    def __init__(self, period: int):
+        self.alpha = 1.0 / period
+        self.min_periods = period
+        self._weighted = math.nan
+        self._old_wt = 1.0
+        self._nobs = 0
+        self.value = math.nan
+
+    def seed(self, values) -> "WilderMean":
+        for v in values:
+            self.update(v)
+        return self
+
+    def update(self, val: float) -> float:
+        val = float(val)
+        is_obs = val == val
+        self._nobs += is_obs
+        if self._weighted == self._weighted:
+            self._old_wt *= 1.0 - self.alpha
+            if is_obs:
+                if self._weighted != val:
+                    self._weighted = (self._old_wt * self._weighted + self.alpha * val) / (self._old_wt + self.alpha)
+                self._old_wt = 1.0
+        elif is_obs:
+            self._weighted = val
+        self.value = self._weighted if self._nobs >= max(self.min_periods, 1) else math.nan
+        return self.value
+
+
+def _ratio(num: float, den: float) -> float:
+    """Division with NumPy semantics (x/0 -> ±inf, 0/0 -> nan)."""
+    if den == 0.0:
+        if num != num or num == 0.0:
+            return math.nan
+        return math.copysign(math.inf, num) * math.copysign(1.0, den)
+    return num / den
+
+
+class RSI:
+    """
+    Relative Strength Index with simple (rolling mean) or Wilder smoothing.
+    """
+
+    def __init__(self, period: int = 14, smoothing: str = "simple"):
+        if smoothing not in ("simple", "wilder"):
+            raise ValueError("smoothing must be 'simple' or 'wilder'")
+        make = (lambda: RollingMean(period)) if smoothing == "simple" else (lambda: WilderMean(period))
+        self._avg_gain = make()
+        self._avg_loss = make()
+        self._prev_close = math.nan
+        self.value = math.nan
+
+    def seed(self, closes) -> "RSI":
+        for c in closes:
+            self.update(c)
+        return self
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        delta = close - self._prev_close
+        self._prev_close = close
+        gain = delta if delta != delta else max(delta, 0.0)
+        loss = delta if delta != delta else -min(delta, 0.0)
+        rs = _ratio(self._avg_gain.update(gain), self._avg_loss.update(loss))
+        self.value = 100 - (100 / (1 + rs))
+        return self.value
+
+
+class RollingReturnMean:
+    """
+    Rolling mean of simple returns; matches `close.pct_change().rolling(window).mean()`.
+    """
+
+    def __init__(self, window: int = 5):
+        self._mean = RollingMean(window)
+        self._prev_close = math.nan
+        self.value = math.nan
+
+    def seed(self, closes) -> "RollingReturnMean":
+        for c in closes:
+            self.update(c)
+        return self
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        ret = _ratio(close, self._prev_close) - 1
+        self._prev_close = close
+        self.value = self._mean.update(ret)
+        return self.value
@@ -0,0 +1,541 @@
+"""
+optimizer.py
+------------
+Vectorized parameter sweeps for the classic strategies.
+A block of grid points is evaluated at once as (points x bar-blocks) arrays. Each (indicator, window)
+is computed once over the whole series into a row of its family's table, together with per-block
+minima/maxima over blocks of SWEEP_BLOCK_BARS bars. Every strategy is a pair of comparisons
+(buy = a < b, sell = c < d); comparing the bounds settles most (point, block) cells without reading
+their bars, and only the bars of the undecided cells are fetched (as whole table rows) and compared.
+PnL/Sharpe are then scored from prefix sums at the signals' change points and summed per point, so a
+grid point costs roughly O(candles / block + bars of undecided blocks + trades) and no step loops over
+grid points. The bar-blocks are walked in chunks of SWEEP_CHUNK_CELLS cells so the temporaries stay in
+cache. Large grids are split into blocks of points that can fan out across cores.
+
+Scoring model (same for every strategy): the signal of bar t is held over bar t+1, so the per-bar
+strategy return is signal[t-1] * close.pct_change()[t]; returns compound into total_return and the
+Sharpe ratio is mean/std of the per-bar returns scaled by sqrt(periods_per_year).
+"""
+
+import itertools
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger("Optimizer")
+
+SWEEP_BLOCK_MB = int(os.getenv("SWEEP_BLOCK_MB", 64))
+# Per indicator family: indicator rows kept for reuse by later blocks of points
+SWEEP_MEMO_MB = int(os.getenv("SWEEP_MEMO_MB", 1024))
+
+# Parameter order matters: the leading parameters define the indicators, so keeping them outermost
+# lets consecutive grid points (and therefore a block) share indicator arrays.
+DEFAULT_PARAMS = {
+    "sma_crossover": {"short_window": 20, "long_window": 50},
+    "rsi_strategy": {"period": 14, "lower": 30, "upper": 70},
+    "bollinger_bands": {"window": 20, "num_std_dev": 2},
+    "ai_momentum": {"window": 5},
+}
+
+METRICS = ["total_return", "sharpe", "trades", "exposure"]
+
+# Bars per block of the indicator bounds, and (point, block) cells evaluated together
+SWEEP_BLOCK_BARS = int(os.getenv("SWEEP_BLOCK_BARS", 16))
+SWEEP_CHUNK_CELLS = int(os.getenv("SWEEP_CHUNK_CELLS", 131072))
+
+
+class SweepData:
+    """
+    Per-series state shared by every grid point: cumulative sums of the centered close and of the
+    bar returns, score prefix sums and the indicator tables.
+    """
+
+    def __init__(self, close: np.ndarray, periods_per_year: float = 252, memo_bytes: int = SWEEP_MEMO_MB * 1024 * 1024):
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        if len(close) < 2:
+            raise ValueError("At least two candles are required")
+        self.close = close
+        self.n = len(close)
+        self.blocks = -(-self.n // SWEEP_BLOCK_BARS)
+        self.periods_per_year = periods_per_year
+        self.memo_bytes = memo_bytes
+        self._tables = {}
+
+        # Centering keeps the running sums small, which keeps window sums accurate over long series
+        centered = close - close[0]
+        self.centered = centered
+        self.cs = np.concatenate(([0.0], np.cumsum(centered)))
+        self.cs2 = np.concatenate(([0.0], np.cumsum(centered * centered)))
+
+        delta = np.diff(close)
+        self.cs_gain = np.concatenate(([0.0, 0.0], np.cumsum(np.maximum(delta, 0.0))))
+        self.cs_loss = np.concatenate(([0.0, 0.0], np.cumsum(np.maximum(-delta, 0.0))))
+        self.rsi_tol = max(self.cs_gain[-1], self.cs_loss[-1], 1.0) * 1e-12
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = close[1:] / close[:-1] - 1
+        self.cs_ret = np.concatenate(([0.0, 0.0], np.cumsum(returns)))
+        self.ret_tol = max(np.abs(returns).sum(), 1.0) * 1e-13
+
+        # (n, 5) prefix sums of the per-bar score inputs. For a run of bars holding signal s in {-1, 0, 1}:
+        # pnl = s*sum(r), pnl^2 = |s|*sum(r^2), log-growth = sum(log1p(r)) or sum(log1p(-r)) and
+        # exposure = |s|*bars (the last row counts bars)
+        floor = -1 + 1e-12
+        inputs = np.column_stack((returns, returns * returns, np.log1p(np.maximum(returns, floor)),
+                                  np.log1p(np.maximum(-returns, floor)), np.ones_like(returns)))
+        self.prefix = np.vstack((np.zeros((1, 5)), np.cumsum(inputs, axis=0)))
+
+    def table(self, family: str) -> "_IndicatorTable":
+        """The table of one indicator family (a key of FAMILIES)."""
+        if family not in self._tables:
+            self._tables[family] = _IndicatorTable(self, family)
+        return self._tables[family]
+
+
+class _IndicatorTable:
+    """
+    One indicator family, one row per window: the values over the whole series padded to whole blocks
+    (bars past the end repeat the last bar) and the per-block (min, max), rounded outwards to float32
+    to halve the traffic of classifying blocks. Once a family's rows would exceed the memo budget, the
+    least recently used rows are recomputed for new windows.
+    """
+
+    def __init__(self, data: SweepData, family: str):
+        self.data = data
+        self.family = family
+        self.width = data.blocks * SWEEP_BLOCK_BARS
+        self.capacity = max(1, data.memo_bytes // (self.width * 8))
+        self.values = np.empty((0, self.width))
+        self.bounds = np.empty((0, 2, data.blocks), dtype=np.float32)
+        self._rows = OrderedDict()
+
+    def rows(self, windows: np.ndarray) -> np.ndarray:
+        """Row of each window, computing missing ones; rows stay valid until the next call."""
+        unique, inverse = np.unique(windows, return_inverse=True)
+        unique = unique.tolist()
+        missing = []
+        for window in unique:
+            if window in self._rows:
+                self._rows.move_to_end(window)
+            else:
+                missing.append(window)
+        needed = len(self._rows) + len(missing)
+        if needed > len(self.values) and len(self.values) < max(self.capacity, len(unique)):
+            self._grow(min(max(2 * len(self.values), needed), max(self.capacity, len(unique))))
+        for window in missing:
+            if len(self._rows) < len(self.values):
+                row = len(self._rows)
+            else:
+                # The windows of this call were moved to the end, so the evicted row is not one of them
+                _, row = self._rows.popitem(last=False)
+            self._fill(row, window)
+            self._rows[window] = row
+        return np.array([self._rows[window] for window in unique], dtype=np.int64)[inverse]
+
+    def _grow(self, rows: int):
+        values, bounds = np.empty((rows, self.width)), np.empty((rows,) + self.bounds.shape[1:], np.float32)
+        values[:len(self.values)], bounds[:len(self.bounds)] = self.values, self.bounds
+        self.values, self.bounds = values, bounds
+
+    def _fill(self, row: int, window: int):
+        data, values = self.data, self.values[row]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values[:data.n] = FAMILIES[self.family](data, window)
+        values[data.n:] = values[data.n - 1]
+        blocks = values.reshape(data.blocks, SWEEP_BLOCK_BARS)
+        # ndarray.min/max propagate NaN, which leaves warm-up blocks undecided
+        self.bounds[row] = _round_out(blocks.min(axis=1), blocks.max(axis=1))
+
+
+def _round_out(lo, hi) -> np.ndarray:
+    """(2, ...) float32 bounds with lo rounded down and hi rounded up (NaN stays NaN)."""
+    lo32, hi32 = np.asarray(lo, np.float32), np.asarray(hi, np.float32)
+    return np.stack((np.where(lo32 > lo, np.nextafter(lo32, np.float32(-np.inf)), lo32),
+                     np.where(hi32 < hi, np.nextafter(hi32, np.float32(np.inf)), hi32)))
+
+
+# ---------------------------------------------------------------------- indicator families
+# Each returns one window of the indicator over the whole series, as the batch strategies compute it:
+# window sums are differences of the cumulative sums, NaN during warm-up.
+
+def _window_sum(cs: np.ndarray, window: int, n: int) -> np.ndarray:
+    """cs[t + 1] - cs[t + 1 - window] for every bar t, summing from the start while t + 1 < window."""
+    total = cs[1:n + 1].copy()
+    total[window:] -= cs[1:n + 1 - window]
+    return total
+
+
+def _sma(data: SweepData, window: int) -> np.ndarray:
+    """Simple moving average; the first window - 1 bars average what is available (min_periods=1)."""
+    sma = _window_sum(data.cs, window, data.n)
+    head = min(window - 1, data.n)
+    sma[:head] /= np.arange(1, head + 1)
+    sma[head:] /= window
+    return sma
+
+
+def _rsi(data: SweepData, period: int) -> np.ndarray:
+    """Simple-smoothed RSI, as ClassicStrategies.rsi_strategy."""
+    gain = _window_sum(data.cs_gain, period, data.n)
+    loss = _window_sum(data.cs_loss, period, data.n)
+    gain[np.abs(gain) < data.rsi_tol] = 0.0
+    loss[np.abs(loss) < data.rsi_tol] = 0.0
+    rsi = 100 - 100 / (1 + gain / loss)
+    rsi[:period] = np.nan
+    return rsi
+
+
+def _dist(data: SweepData, window: int) -> np.ndarray:
+    """Distance of close from its rolling mean."""
+    dist = data.centered - _window_sum(data.cs, window, data.n) / window
+    dist[:window - 1] = np.nan
+    return dist
+
+
+def _std(data: SweepData, window: int) -> np.ndarray:
+    """Rolling standard deviation (ddof=1)."""
+    if window <= 1:
+        return np.full(data.n, np.nan)
+    s1, s2 = _window_sum(data.cs, window, data.n), _window_sum(data.cs2, window, data.n)
+    var = (s2 - s1 * s1 / window) / (window - 1)
+    var[var < np.maximum(s2 / window, 1.0) * 1e-12] = 0.0
+    var[:window - 1] = np.nan
+    return np.sqrt(var)
+
+
+def _return_mean(data: SweepData, window: int) -> np.ndarray:
+    """Rolling mean of simple returns, as AILearnedMomentum."""
+    mean = _window_sum(data.cs_ret, window, data.n) / window
+    mean[np.abs(mean) * window < data.ret_tol] = 0.0
+    mean[:window] = np.nan
+    return mean
+
+
+FAMILIES = {
+    "sma": _sma,
+    "rsi": _rsi,
+    "dist": _dist,
+    "std": _std,
+    "return_mean": _return_mean,
+}
+
+
+# ---------------------------------------------------------------------- scoring
+
+# Weight of each prefix column for a change from signal `before` to `after`, by (before + 1) * 3 + after + 1
+_CHANGE_WEIGHTS = np.array([[b - a, abs(b) - abs(a), (b > 0) - (a > 0), (b < 0) - (a < 0), abs(b) - abs(a)]
+                            for b in (-1, 0, 1) for a in (-1, 0, 1)], dtype=np.float64)
+
+
+def _change_sums(data: SweepData, k: int, points: np.ndarray, bars: np.ndarray, before: np.ndarray,
+                 after: np.ndarray) -> tuple:
+    """
+    Per-signal sums of the score inputs over k signals' change points. Summing a held side over its
+    runs telescopes into one prefix-sum term per change point, so the changes of a signal can come in
+    any order and in any number of batches.
+
+    :param points: Signal (0..k-1) of each change point, in ascending order; bars: where it changes;
+                   before/after: the int8 signal on either side
+    :return: (k, 5) sums of pnl, pnl^2, long and short log-growth and held bars, and (k,) change counts
+    """
+    counts = np.bincount(points, minlength=k)
+    pairs = before.astype(np.intp) * 3 + after + 4
+    weighted = np.empty((len(points) + 1, 5))
+    np.multiply(np.take(_CHANGE_WEIGHTS, pairs, axis=0), np.take(data.prefix, bars, axis=0), out=weighted[:-1])
+    # reduceat sums each signal's run of rows; signals without changes pick a row that is zeroed after
+    weighted[-1] = 0.0
+    sums = np.add.reduceat(weighted, np.cumsum(counts) - counts, axis=0)
+    sums[counts == 0] = 0.0
+    return sums, counts
+
+
+def _scores(data: SweepData, sums: np.ndarray, trades: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """
+    :param sums: (k, 5) change sums (see _change_sums); trades: (k,) changes plus an opening position
+    :param last: (k,) signal of the last bar, closed at the end of the series as a change to flat
+    :return: (k, 4) array of total_return, sharpe, trades, exposure
+    """
+    k, n_bars = len(last), data.n - 1
+    sums = sums + _change_sums(data, k, np.arange(k), np.full(k, n_bars), last, np.zeros(k, np.int8))[0]
+    pnl_sum, sq_sum, gain, loss, held = sums.T
+    mean = pnl_sum / n_bars
+    std = np.sqrt(np.maximum(sq_sum - n_bars * mean * mean, 0.0) / max(n_bars - 1, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(data.periods_per_year), 0.0)
+    return np.column_stack((np.expm1(gain + loss), sharpe, trades, held / n_bars))
+
+
+# ---------------------------------------------------------------------- block evaluation
+# A block of k grid points is four operands (a, b, c, d) with buy = a < b and sell = c < d; the
+# signal is buy - sell, and -1 where both hold (sell wins, as in the batch versions). An operand is
+# an indicator family with per-point windows (optionally scaled per point) or a per-point constant.
+
+class _Operand:
+    """Indicator operand: (k,) windows and an optional (k,) scale, bound to rows of its family's table."""
+
+    __slots__ = ("family", "windows", "scale", "table", "rows", "shared")
+
+    def __init__(self, family: str, windows: np.ndarray, scale: np.ndarray = None):
+        self.family = family
+        self.windows = windows
+        self.scale = scale
+        self.table = self.rows = self.shared = None
+
+    def bind(self, table: "_IndicatorTable", rows: np.ndarray):
+        self.table, self.rows = table, rows
+        self.shared = rows[:1] if rows.min() == rows.max() else None
+
+    def bounds(self, start: int, stop: int) -> tuple:
+        """(lo, hi) per (point, block) of blocks [start, stop), as (1, blocks) when every point shares the window."""
+        lo, hi = np.moveaxis(self.table.bounds[self.rows if self.shared is None else self.shared, :, start:stop], 1, 0)
+        if self.scale is None:
+            return lo, hi
+        # Scaling in float64 rounds monotonically, as the scaled values do, before rounding out again
+        scale = self.scale[:, None]
+        lo, hi = lo * scale, hi * scale
+        return tuple(_round_out(np.minimum(lo, hi), np.maximum(lo, hi)))
+
+    def blocks(self, points: np.ndarray, blocks: np.ndarray) -> np.ndarray:
+        """(m, SWEEP_BLOCK_BARS) values of each (point, block) cell."""
+        table = self.table.values.reshape(-1, SWEEP_BLOCK_BARS)
+        values = np.take(table, self.rows[points] * self.table.data.blocks + blocks, axis=0)
+        return values if self.scale is None else values * self.scale[points, None]
+
+
+class _Constant:
+    """Per-point constant operand."""
+
+    __slots__ = ("values", "_bounds")
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self._bounds = tuple(_round_out(values[:, None], values[:, None]))
+
+    def bounds(self, start: int, stop: int) -> tuple:
+        return self._bounds
+
+    def blocks(self, points: np.ndarray, blocks: np.ndarray) -> np.ndarray:
+        return self.values[points, None]
+
+
+def _params(params: list, name: str, dtype=np.float64) -> np.ndarray:
+    return np.array([p[name] for p in params], dtype=dtype)
+
+
+def _operands_sma_crossover(params: list) -> tuple:
+    short = _Operand("sma", _params(params, "short_window", np.int64))
+    long = _Operand("sma", _params(params, "long_window", np.int64))
+    return long, short, short, long
+
+
+def _operands_rsi_strategy(params: list) -> tuple:
+    rsi = _Operand("rsi", _params(params, "period", np.int64))
+    return rsi, _Constant(_params(params, "lower")), _Constant(_params(params, "upper")), rsi
+
+
+def _operands_bollinger_bands(params: list) -> tuple:
+    windows, num = _params(params, "window", np.int64), _params(params, "num_std_dev")
+    dist = _Operand("dist", windows)
+    return dist, _Operand("std", windows, -num), _Operand("std", windows, num), dist
+
+
+def _operands_ai_momentum(params: list) -> tuple:
+    momentum = _Operand("return_mean", _params(params, "window", np.int64))
+    zero = _Constant(np.zeros(len(params)))
+    return zero, momentum, momentum, zero
+
+
+OPERANDS = {
+    "sma_crossover": _operands_sma_crossover,
+    "rsi_strategy": _operands_rsi_strategy,
+    "bollinger_bands": _operands_bollinger_bands,
+    "ai_momentum": _operands_ai_momentum,
+}
+
+
+def _bind(data: SweepData, ops: tuple):
+    """Binds the indicator operands to table rows, one lookup per family so no row is evicted while in use."""
+    families = {}
+    for op in {id(op): op for op in ops if isinstance(op, _Operand)}.values():
+        families.setdefault(op.family, []).append(op)
+    for family, group in families.items():
+        table = data.table(family)
+        rows = table.rows(np.concatenate([op.windows for op in group]))
+        for op, op_rows in zip(group, np.split(rows, len(group))):
+            op.table, op.rows = table, op_rows
+
+
+def _bind(data: SweepData, ops: tuple):
+    """Binds the indicator operands to table rows, one lookup per family so no row is evicted while in use."""
+    families = {}
+    for op in {id(op): op for op in ops if isinstance(op, _Operand)}.values():
+        families.setdefault(op.family, []).append(op)
+    for family, group in families.items():
+        table = data.table(family)
+        rows = table.rows(np.concatenate([op.windows for op in group]))
+        for op, op_rows in zip(group, np.split(rows, len(group))):
+            op.bind(table, op_rows)
+
+
+def _sign(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+    return buy.view(np.int8) - sell.view(np.int8) - (buy & sell).view(np.int8)
+
+
+def _signals(ops: tuple, values) -> np.ndarray:
+    """int8 signal from the operands' values (values(op) -> array, evaluated once per operand)."""
+    cache = {}
+
+    def of(op):
+        if id(op) not in cache:
+            cache[id(op)] = values(op)
+        return cache[id(op)]
+
+    a, b, c, d = (of(op) for op in ops)
+    if a is d and b is c:
+        # sell = b < a excludes buy = a < b
+        return np.less(a, b).view(np.int8) - np.less(b, a).view(np.int8)
+    return _sign(np.less(a, b), np.less(c, d))
+
+
+def _classify(ops: tuple, start: int, stop: int) -> tuple:
+    """(signal, decided) per (point, block) of blocks [start, stop); decided cells hold that signal on every bar."""
+    bounds = {}
+    for op in ops:
+        if id(op) not in bounds:
+            bounds[id(op)] = op.bounds(start, stop)
+    (alo, ahi), (blo, bhi), (clo, chi), (dlo, dhi) = (bounds[id(op)] for op in ops)
+    if ops[0] is ops[3] and ops[1] is ops[2]:
+        # sell = b < a: the same pair of operands, so two comparisons settle both sides
+        buy_all, sell_all = np.less(ahi, blo), np.less(bhi, alo)
+        return _sign(buy_all, sell_all), buy_all | sell_all
+    buy_all, buy_none = np.less(ahi, blo), np.greater_equal(alo, bhi)
+    sell_all, sell_none = np.less(chi, dlo), np.greater_equal(clo, dhi)
+    return _sign(buy_all, sell_all), (buy_all | buy_none) & (sell_all | sell_none)
+
+
+def _evaluate_block(data: SweepData, strategy: str, params: list) -> np.ndarray:
+    """
+    Scores a block of grid points of one strategy as (points x bar-blocks) arrays, over chunks of
+    about SWEEP_CHUNK_CELLS cells so the temporaries stay in cache.
+    """
+    k, size = len(params), SWEEP_BLOCK_BARS
+    ops = OPERANDS[strategy](params)
+    _bind(data, ops)
+    sums, trades, previous = np.zeros((k, 5)), np.zeros(k, dtype=np.int64), None
+    step = max(2, SWEEP_CHUNK_CELLS // k)
+    for start in range(0, data.blocks, step):
+        width = min(step, data.blocks - start)
+        first, decided = _classify(ops, start, start + width)
+        first = np.broadcast_to(first, (k, width)).copy()
+        decided = np.broadcast_to(decided, (k, width))
+
+        # Exact signals of the undecided cells
+        cells = (~decided).ravel().nonzero()[0]
+        points, blocks = np.divmod(cells, width)
+        exact = _signals(ops, lambda op: op.blocks(points, blocks + start))
+        last = first.copy()
+        first.ravel()[cells], last.ravel()[cells] = exact[:, 0], exact[:, -1]
+
+        # Changes at block boundaries (the first against the end of the previous chunk), then inside
+        # undecided cells, comparing the flattened bars with the pairs across cells masked out. Both
+        # come out ordered by point.
+        if previous is None:
+            trades += first[:, 0] != 0
+            previous = first[:, 0]
+        ending = np.column_stack((previous, last[:, :-1]))
+        edges = (first != ending).ravel().nonzero()[0]
+        edge_points, edge_blocks = np.divmod(edges, width)
+        flat = exact.ravel()
+        inner = np.not_equal(flat[1:], flat[:-1])
+        inner[size - 1::size] = False
+        inner = inner.nonzero()[0]
+        rows, cols = np.divmod(inner, size)
+        for changes in (_change_sums(data, k, edge_points, (edge_blocks + start) * size, ending.ravel()[edges],
+                                     first.ravel()[edges]),
+                        _change_sums(data, k, points[rows], (blocks[rows] + start) * size + cols + 1, flat[inner],
+                                     flat[inner + 1])):
+            sums += changes[0]
+            trades += changes[1]
+        previous = last[:, -1].copy()
+
+    # Bars past the end repeat the last bar, so the last chunk ends on the signal of bar n-1
+    return _scores(data, sums, trades, previous)
+
+
+# ---------------------------------------------------------------------- worker processes
+
+_WORKER_DATA = None
+
+
+def _init_worker(close: np.ndarray, periods_per_year: float, memo_bytes: int):
+    global _WORKER_DATA
+    _WORKER_DATA = SweepData(close, periods_per_year, memo_bytes)
+
+
+def _worker_block(strategy: str, params: list) -> np.ndarray:
+    return _evaluate_block(_WORKER_DATA, strategy, params)
+
+
+# ---------------------------------------------------------------------- public API
+
+def expand_grid(strategy: str, grid: dict) -> list:
+    """
+    Expands a parameter grid into a list of parameter dicts, with unspecified parameters at their defaults.
+
+    :param strategy: Key of DEFAULT_PARAMS
+    :param grid: Mapping of parameter name to a value or an iterable of values
+    :return: List of parameter dicts
+    """
+    if strategy not in DEFAULT_PARAMS:
+        raise ValueError(f"Unsupported strategy for sweeps: {strategy}")
+    unknown = set(grid) - set(DEFAULT_PARAMS[strategy])
+    if unknown:
+        raise ValueError(f"Unknown parameters for {strategy}: {sorted(unknown)}")
+
+    names = list(DEFAULT_PARAMS[strategy])
+    axes = []
+    for name in names:
+        values = grid.get(name, DEFAULT_PARAMS[strategy][name])
+        axes.append(list(values) if np.iterable(values) else [values])
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes)]
+
+
+def sweep(df, strategy: str, grid: dict, rank_by: str = "sharpe", periods_per_year: float = 252,
+          workers: int = None, block_bytes: int = SWEEP_BLOCK_MB * 1024 * 1024) -> pd.DataFrame:
+    """
+    Evaluates every point of a parameter grid for one strategy.
+
+    :param df: DataFrame with a 'close' column, or an array of close prices
+    :param strategy: 'sma_crossover', 'rsi_strategy', 'bollinger_bands' or 'ai_momentum'
+    :param grid: Parameter name -> value or iterable of values (e.g. {'short_window': range(5, 50)})
+    :param rank_by: Metric to sort by, descending
+    :param periods_per_year: Bars per year used to annualize the Sharpe ratio
+    :param workers: Worker processes (None or 1 runs in-process)
+    :param block_bytes: Sizes the blocks of grid points evaluated together: block_bytes // len(close)
+                        points per block (at most 1024)
+    :return: Ranked DataFrame with one row per grid point: parameters + total_return, sharpe, trades, exposure
+    """
+    if rank_by not in METRICS:
+        raise ValueError(f"rank_by must be one of {METRICS}")
+    close = df['close'].to_numpy(dtype=np.float64) if isinstance(df, pd.DataFrame) else np.asarray(df, np.float64)
+    points = expand_grid(strategy, grid)
+    block = max(1, min(1024, block_bytes // len(close)))
+    blocks = [points[i:i + block] for i in range(0, len(points), block)]
+    log.info(f"[Optimizer] 🔎 {strategy}: {len(points)} combinations over {len(close)} candles "
+             f"in {len(blocks)} blocks")
+
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(close, periods_per_year, SWEEP_MEMO_MB * 1024 * 1024)) as pool:
+            scores = list(pool.map(_worker_block, itertools.repeat(strategy), blocks))
+    else:
+        data = SweepData(close, periods_per_year)
+        scores = [_evaluate_block(data, strategy, params) for params in blocks]
+
+    result = pd.DataFrame(points)
+    result[METRICS] = np.concatenate(scores) if scores else np.empty((0, len(METRICS)))
+    result['trades'] = result['trades'].astype(int)
+    return result.sort_values(rank_by, ascending=False, kind='stable').reset_index(drop=True)
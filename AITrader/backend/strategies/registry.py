@@ -0,0 +1,342 @@
+"""
+registry.py
+-----------
+Single, lazily loaded strategy registry.
+Entries are references ("module.path:Attribute", package entry points in the `aitrader.strategies`
+group, or generated source code) that are imported/compiled only on first use. Metadata (title,
+description, author, default params) is read from the source with `ast`, so listing and describing
+strategies never imports strategy code; it is cached in memory and on disk.
+"""
+
+import ast
+import importlib
+import importlib.metadata
+import importlib.util
+import json
+import logging
+import os
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+log = logging.getLogger("Registry")
+
+ENTRY_POINT_GROUP = "aitrader.strategies"
+METADATA_CACHE_FILE = os.getenv("STRATEGY_METADATA_CACHE", "cache/strategy_metadata.json")
+
+BUILTIN_STRATEGIES = {
+    "sma_crossover": "backend.strategies.classic:ClassicStrategies.sma_crossover",
+    "rsi_strategy": "backend.strategies.classic:ClassicStrategies.rsi_strategy",
+    "bollinger_bands": "backend.strategies.classic:ClassicStrategies.bollinger_bands",
+    "ai_momentum": "backend.strategies.ai_generated:AILearnedMomentum",
+}
+
+
+@dataclass
+class StrategySpec:
+    """
+    Lazy reference to a strategy.
+    """
+    name: str
+    target: str = None      # "module.path:Attr.attr"
+    code: str = None        # generated source defining a strategy function
+    obj: object = None      # an already loaded strategy
+    source: str = "builtin"
+    metadata: dict = field(default_factory=dict)
+
+
+def run_strategy(strategy, df):
+    """
+    Applies a registry entry (plain callable or BaseStrategy instance) to a DataFrame.
+
+    :return: DataFrame with a 'signal' column
+    """
+    generate = getattr(strategy, "generate_signals", None)
+    return generate(df) if generate is not None else strategy(df)
+
+
+# ---------------------------------------------------------------------- metadata from source
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return ast.unparse(node)
+
+
+def _params(func: ast.AST, skip: int) -> dict:
+    args = func.args.args[skip:]
+    defaults = [None] * (len(args) - len(func.args.defaults)) + list(func.args.defaults)
+    params = {arg.arg: (_literal(default) if default is not None else None) for arg, default in zip(args, defaults)}
+    for arg, default in zip(func.args.kwonlyargs, func.args.kw_defaults):
+        params[arg.arg] = _literal(default) if default is not None else None
+    params.pop("cache", None)
+    return params
+
+
+def _summary(node: ast.AST) -> str:
+    doc = ast.get_docstring(node) or ""
+    return doc.strip().splitlines()[0] if doc.strip() else ""
+
+
+def _property_constant(cls: ast.ClassDef, name: str):
+    for item in cls.body:
+        if isinstance(item, ast.FunctionDef) and item.name == name:
+            for stmt in item.body:
+                if isinstance(stmt, ast.Return) and isinstance(stmt.value, ast.Constant):
+                    return stmt.value.value
+    return None
+
+
+def _find(tree: ast.AST, path: list):
+    scope = tree.body
+    node = None
+    for part in path:
+        node = next((n for n in scope if isinstance(n, (ast.FunctionDef, ast.ClassDef)) and n.name == part), None)
+        if node is None:
+            return None
+        scope = node.body
+    return node
+
+
+def describe_source(source: str, attr_path: list = None) -> dict:
+    """
+    Extracts strategy metadata from source code without executing it.
+
+    :param source: Python source
+    :param attr_path: Attribute path of the strategy (e.g. ['ClassicStrategies', 'sma_crossover']);
+                      defaults to the first top-level function
+    :return: Dict with title, description, author and params
+    """
+    tree = ast.parse(source)
+    if attr_path:
+        node = _find(tree, attr_path)
+    else:
+        node = next((n for n in tree.body if isinstance(n, (ast.FunctionDef, ast.ClassDef))), None)
+    if node is None:
+        return {}
+
+    if isinstance(node, ast.ClassDef):
+        init = next((n for n in node.body if isinstance(n, ast.FunctionDef) and n.name == "__init__"), None)
+        return {
+            "title": _property_constant(node, "name") or node.name,
+            "description": _property_constant(node, "description") or _summary(node),
+            "author": _property_constant(node, "author") or "Unknown",
+            "params": _params(init, 1) if init else {},
+        }
+    return {
+        "title": node.name.replace("_", " ").title(),
+        "description": _summary(node),
+        "author": "Unknown",
+        "params": _params(node, 1),
+    }
+
+
+# ---------------------------------------------------------------------- registry
+
+class StrategyRegistry(Mapping):
+    """
+    Name -> strategy mapping that loads entries on first access.
+    Iteration, `len`, `names()` and `metadata()` never import strategy code; indexing does.
+    """
+
+    def __init__(self, builtins: dict = None, entry_point_group: str = ENTRY_POINT_GROUP,
+                 metadata_cache: str = METADATA_CACHE_FILE):
+        self._specs = {}
+        self._loaded = {}
+        self._lock = threading.RLock()
+        self.entry_point_group = entry_point_group
+        self.metadata_cache = metadata_cache
+        self._disk_metadata = None
+        self._discovered = entry_point_group is None
+        for name, target in (builtins or {}).items():
+            self._specs[name] = StrategySpec(name=name, target=target)
+
+    # ------------------------------------------------------------------ registration
+
+    def register(self, name: str, strategy=None, target: str = None, code: str = None,
+                 source: str = "runtime", **metadata):
+        """
+        Registers a strategy under a name, replacing any previous entry.
+
+        :param strategy: Already loaded callable or BaseStrategy instance
+        :param target: Lazy reference "module.path:Attr"
+        :param code: Generated source defining a strategy function (compiled on first use, run sandboxed)
+        :param metadata: Optional title/description/author/params overrides
+        """
+        if sum(x is not None for x in (strategy, target, code)) != 1:
+            raise ValueError("Pass exactly one of strategy, target or code")
+        with self._lock:
+            self._specs[name] = StrategySpec(name=name, target=target, code=code, obj=strategy,
+                                             source=source, metadata=dict(metadata))
+            self._loaded.pop(name, None)
+
+    def unregister(self, name: str):
+        """Removes a strategy. Generated code is also forgotten by the deduplicator, so it can be registered again."""
+        with self._lock:
+            spec = self._specs.pop(name, None)
+            self._loaded.pop(name, None)
+        if spec is not None and spec.code is not None:
+            from backend.ai.strategy_dedup import DEDUPLICATOR
+
+            DEDUPLICATOR.forget(name)
+
+    def _discover(self):
+        if self._discovered:
+            return
+        self._discovered = True
+        for ep in importlib.metadata.entry_points(group=self.entry_point_group):
+            if ep.name not in self._specs:
+                self._specs[ep.name] = StrategySpec(name=ep.name, target=ep.value, source="entry_point")
+
+    # ------------------------------------------------------------------ Mapping interface
+
+    def __getitem__(self, name: str):
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            self._discover()
+            spec = self._specs[name]
+            strategy = self._load(spec)
+            self._loaded[name] = strategy
+            return strategy
+
+    def __iter__(self):
+        with self._lock:
+            self._discover()
+            return iter(list(self._specs))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._discover()
+            return len(self._specs)
+
+    def __contains__(self, name) -> bool:
+        with self._lock:
+            self._discover()
+            return name in self._specs
+
+    def names(self) -> list:
+        """Registered strategy names (no imports)."""
+        return list(self)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    # ------------------------------------------------------------------ loading
+
+    def _load(self, spec: StrategySpec):
+        if spec.obj is not None:
+            return spec.obj
+        if spec.code is not None:
+            # Generated code never runs in-process: it is compiled once and executed in the sandbox pool
+            from backend.strategies.ai_generated import AIGeneratedExperiment
+            from backend.strategies.sandbox import compile_strategy
+            compile_strategy(spec.code)
+            strategy = AIGeneratedExperiment(spec.code, spec.name)
+        else:
+            module_name, _, attr = spec.target.partition(":")
+            strategy = importlib.import_module(module_name)
+            for part in attr.split(".") if attr else []:
+                strategy = getattr(strategy, part)
+            if isinstance(strategy, type):
+                strategy = strategy()
+        log.debug(f"[Registry] Loaded strategy {spec.name} ({spec.source})")
+        return strategy
+
+    # ------------------------------------------------------------------ metadata
+
+    def metadata(self, name: str) -> dict:
+        """
+        Returns {'name', 'title', 'description', 'author', 'params', 'source'} for a strategy
+        without importing its module.
+        """
+        with self._lock:
+            self._discover()
+            spec = self._specs[name]
+            if "params" not in spec.metadata or "title" not in spec.metadata:
+                spec.metadata = {**self._describe(spec), **spec.metadata}
+            return {"name": name, "source": spec.source, **spec.metadata}
+
+    def _describe(self, spec: StrategySpec) -> dict:
+        if spec.code is not None:
+            try:
+                return describe_source(spec.code)
+            except SyntaxError:
+                return {}
+        if spec.target is None:
+            return self._describe_object(spec.obj, spec.name)
+
+        module_name, _, attr = spec.target.partition(":")
+        module_spec = importlib.util.find_spec(module_name)
+        path = module_spec.origin if module_spec else None
+        if not path or not path.endswith(".py"):
+            return {}
+        stat = os.stat(path)
+        key = f"{spec.target}|{stat.st_mtime_ns}|{stat.st_size}"
+        cached = self._disk_cache().get(key)
+        if cached is None:
+            with open(path, encoding="utf-8") as f:
+                cached = describe_source(f.read(), attr.split(".") if attr else None)
+            self._disk_metadata[key] = cached
+            self._save_disk_cache()
+        return cached
+
+    @staticmethod
+    def _describe_object(obj, name: str) -> dict:
+        def text(attr):
+            value = getattr(obj, attr, None)
+            return value if isinstance(value, str) else None
+
+        doc = (getattr(obj, "__doc__", None) or "").strip()
+        return {"title": text("name") or text("__name__") or name,
+                "description": text("description") or (doc.splitlines()[0] if doc else ""),
+                "author": text("author") or "Unknown",
+                "params": {}}
+
+    def _disk_cache(self) -> dict:
+        if self._disk_metadata is None:
+            self._disk_metadata = {}
+            if self.metadata_cache and os.path.exists(self.metadata_cache):
+                try:
+                    with open(self.metadata_cache) as f:
+                        self._disk_metadata = json.load(f)
+                except (OSError, ValueError):
+                    pass
+        return self._disk_metadata
+
+    def _save_disk_cache(self):
+        if not self.metadata_cache:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.metadata_cache) or ".", exist_ok=True)
+            tmp = self.metadata_cache + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._disk_metadata, f)
+            os.replace(tmp, self.metadata_cache)
+        except OSError as e:
+            log.warning(f"[Registry] ⚠ Could not write metadata cache: {e}")
+
+
+# Process-wide registry
+REGISTRY = StrategyRegistry(BUILTIN_STRATEGIES)
+
+
+def get_strategy(name: str):
+    """
+    Retrieve a strategy by name, importing it on first use.
+
+    :param name: Registered strategy name
+    :return: Callable or BaseStrategy instance, or None if the name is unknown
+    """
+    return REGISTRY.get(name)
+
+
+def register_strategy(name: str, strategy=None, **kwargs):
+    """Registers a strategy (object, lazy target or generated code); see StrategyRegistry.register."""
+    REGISTRY.register(name, strategy, **kwargs)
+
+
+def list_strategies() -> list:
+    """Registered strategy names, without importing any strategy code."""
+    return REGISTRY.names()
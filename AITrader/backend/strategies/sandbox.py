@@ -0,0 +1,457 @@
+"""
+sandbox.py
+----------
+Isolated execution of AI-generated strategy code.
+Generated code is compiled once per code hash and runs in a pool of worker processes with a per-call
+CPU-time limit (ITIMER_PROF) and an address-space limit (RLIMIT_AS). Candles reach the workers through
+shared memory, not pickling. Strategies that time out, exhaust memory or fail are quarantined, and
+per-strategy latency is tracked.
+Generated code sees a reduced set of builtins (no open/exec/eval/compile/input) and may only import
+the modules in SANDBOX_IMPORTS. This guards against careless code, not a determined attacker: numpy
+and pandas themselves can still reach the filesystem, so the resource limits and process isolation
+are what contain a strategy.
+"""
+
+import atexit
+import builtins
+import hashlib
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+import types
+from collections import deque, OrderedDict
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backend.data.ohlcv_store import to_epoch_ms
+
+log = logging.getLogger("Sandbox")
+
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", 2))
+SANDBOX_CPU_SECONDS = float(os.getenv("SANDBOX_CPU_SECONDS", 2.0))
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", 512))
+WORKER_START_TIMEOUT = 60.0
+
+# Top-level modules generated code may import
+SANDBOX_IMPORTS = frozenset(os.getenv(
+    "SANDBOX_IMPORTS", "numpy,pandas,math,statistics,itertools,functools,collections,datetime").split(","))
+_HIDDEN_BUILTINS = {"open", "exec", "eval", "compile", "input", "breakpoint", "help", "exit", "quit", "__import__"}
+
+
+class StrategyQuarantined(RuntimeError):
+    """Raised when a quarantined strategy is invoked."""
+
+
+class StrategyExecutionError(RuntimeError):
+    """Raised when generated code fails, times out or exceeds its memory limit."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+
+
+def _guarded_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name.partition(".")[0] not in SANDBOX_IMPORTS:
+        raise ImportError(f"Import of '{name}' is not allowed in generated strategies")
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+
+_SAFE_BUILTINS = {k: v for k, v in vars(builtins).items() if k not in _HIDDEN_BUILTINS}
+_SAFE_BUILTINS["__import__"] = _guarded_import
+
+
+def code_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+_COMPILED = {}
+_COMPILED_LOCK = threading.Lock()
+
+
+def compile_strategy(code: str):
+    """Compiles generated code once per code hash (SyntaxError propagates)."""
+    key = code_hash(code)
+    with _COMPILED_LOCK:
+        compiled = _COMPILED.get(key)
+    if compiled is None:
+        compiled = compile(code, f"<generated {key[:12]}>", "exec")
+        with _COMPILED_LOCK:
+            _COMPILED[key] = compiled
+    return compiled
+
+
+def execute_strategy(compiled, df: pd.DataFrame) -> np.ndarray:
+    """
+    Runs compiled strategy code on a DataFrame and returns its int8 signal.
+    Supports both styles the synthesizer produces: code defining a function that takes `df`,
+    and script-style code that rebinds `df` with a 'signal' column.
+    """
+    from backend.strategies.array_strategy import to_signal_array
+
+    namespace = {"__builtins__": dict(_SAFE_BUILTINS), "df": df, "np": np, "pd": pd}
+    exec(compiled, namespace)
+    func = next((v for k, v in namespace.items()
+                 if isinstance(v, types.FunctionType) and v.__code__.co_filename == compiled.co_filename), None)
+    result = func(df) if func is not None else namespace.get("df")
+    if not isinstance(result, pd.DataFrame) or 'signal' not in result.columns:
+        raise ValueError("Strategy did not return a DataFrame with a 'signal' column")
+    signal = to_signal_array(result['signal'])
+    if len(signal) != len(df):
+        raise ValueError(f"Signal length {len(signal)} does not match {len(df)} candles")
+    return signal
+
+
+# ---------------------------------------------------------------------- shared-memory candles
+
+def _columns(df: pd.DataFrame) -> list:
+    """(column, kind) of every column shared with the workers: 'M' datetimes (as int64 ms), 'f' numbers."""
+    columns = []
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            columns.append((col, 'M'))
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            columns.append((col, 'f'))
+    return columns
+
+
+def _view_frame(buf, rows: int, columns: list) -> pd.DataFrame:
+    data = {}
+    for i, (col, kind) in enumerate(columns):
+        values = np.ndarray((rows,), dtype=np.int64 if kind == 'M' else np.float64, buffer=buf, offset=i * rows * 8)
+        data[col] = values.view('datetime64[ms]') if kind == 'M' else values
+    # DataFrame(dict) copies the columns, so strategy code never writes into the shared block
+    return pd.DataFrame(data, columns=[col for col, _ in columns])
+
+
+# ---------------------------------------------------------------------- worker process
+
+class _CpuLimitExceeded(BaseException):
+    """BaseException so generated `except Exception` blocks cannot swallow it."""
+
+
+def _on_cpu_limit(signum, frame):
+    raise _CpuLimitExceeded()
+
+
+def _worker_main(conn, cpu_seconds: float, memory_mb: int):
+    import resource
+    import signal
+
+    os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+    signal.signal(signal.SIGPROF, _on_cpu_limit)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import backend.strategies.array_strategy  # noqa: F401  (warm import before the limit applies)
+
+    if memory_mb:
+        # Budget on top of the interpreter's baseline address space
+        with open("/proc/self/statm") as f:
+            baseline = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+        limit = baseline + memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    conn.send("ready")
+
+    compiled = {}
+    attached = OrderedDict()   # shm name -> SharedMemory
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        key, code, shm_name, rows, columns = request
+        started = time.process_time()
+        try:
+            if shm_name not in attached:
+                attached[shm_name] = shared_memory.SharedMemory(name=shm_name)
+                while len(attached) > 4:
+                    attached.popitem(last=False)[1].close()
+        except OSError as e:
+            # A pool-side problem, not the strategy's
+            conn.send(("unavailable", f"candles not attachable: {e}", 0.0))
+            continue
+        try:
+            df = _view_frame(attached[shm_name].buf, rows, columns)
+            if key not in compiled:
+                compiled[key] = compile(code, f"<generated {key[:12]}>", "exec")
+            signal.setitimer(signal.ITIMER_PROF, cpu_seconds)
+            try:
+                result = execute_strategy(compiled[key], df)
+            finally:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+            del df
+            conn.send(("ok", result.tobytes(), (time.process_time() - started) * 1000))
+        except _CpuLimitExceeded:
+            conn.send(("timeout", f"CPU limit of {cpu_seconds}s exceeded", 0.0))
+        except MemoryError:
+            conn.send(("memory", f"memory limit of {memory_mb} MB exceeded", 0.0))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}", 0.0))
+    for shm in attached.values():
+        shm.close()
+
+
+class _Worker:
+    def __init__(self, ctx, cpu_seconds: float, memory_mb: int):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, cpu_seconds, memory_mb),
+                                   name="StrategySandbox", daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def wait_ready(self, timeout: float):
+        """Waits for the start-up handshake; failing to start is a pool error, not a strategy failure."""
+        if self.ready:
+            return
+        try:
+            self.ready = self.conn.poll(timeout) and self.conn.recv() == "ready"
+        except (EOFError, OSError):
+            self.ready = False
+        if not self.ready:
+            raise RuntimeError(f"Sandbox worker failed to start (exit code {self.process.exitcode})")
+
+    def stop(self, timeout: float = 1.0):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+# ---------------------------------------------------------------------- pool
+
+class SandboxPool:
+    """
+    Pool of sandboxed worker processes for generated strategies.
+    """
+
+    def __init__(self, workers: int = SANDBOX_WORKERS, cpu_seconds: float = SANDBOX_CPU_SECONDS,
+                 memory_mb: int = SANDBOX_MEMORY_MB, wall_timeout: float = None, max_failures: int = 1):
+        """
+        :param workers: Worker processes
+        :param cpu_seconds: CPU-time limit per call
+        :param memory_mb: Address space a call may use on top of the worker's baseline (0 disables)
+        :param wall_timeout: Wall-clock limit per call before the worker is killed (default 2x CPU limit + 2s)
+        :param max_failures: Failures (errors, timeouts, memory, crashes) before a strategy is quarantined;
+                             pool-side errors (worker start-up, unattachable candles) do not count
+        """
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.wall_timeout = wall_timeout if wall_timeout is not None else cpu_seconds * 2 + 2
+        self.max_failures = max_failures
+        self.workers = workers
+        self._ctx = mp.get_context("spawn")
+        self._idle = deque(_Worker(self._ctx, cpu_seconds, memory_mb) for _ in range(workers))
+        self._available = threading.Condition()
+        self._lock = threading.Lock()
+        self._blocks = OrderedDict()   # dataset key -> [SharedMemory, calls in flight]
+        self._stats = {}
+        self.quarantined = {}          # code hash -> reason
+        self._closed = False
+
+    # ------------------------------------------------------------------ public API
+
+    def run(self, code: str, df: pd.DataFrame, name: str = None) -> np.ndarray:
+        """
+        Runs generated strategy code over candles in a worker.
+
+        :param code: Strategy source
+        :param df: OHLCV DataFrame
+        :param name: Strategy name used for latency statistics
+        :return: int8 signal array aligned with df
+        """
+        key = code_hash(code)
+        name = name or key[:12]
+        if key in self.quarantined:
+            raise StrategyQuarantined(f"{name} is quarantined: {self.quarantined[key]}")
+        try:
+            compile_strategy(code)
+        except SyntaxError as e:
+            self._record(name, key, 0.0, "error", str(e))
+            raise StrategyExecutionError("error", str(e)) from e
+
+        block, shm_name, rows, columns = self._publish(df)
+        try:
+            worker = self._acquire()
+            try:
+                worker.wait_ready(WORKER_START_TIMEOUT)
+            except RuntimeError:
+                self._release(self._replace(worker))
+                raise
+            t0 = time.perf_counter()
+            try:
+                worker.conn.send((key, code, shm_name, rows, columns))
+                if worker.conn.poll(self.wall_timeout):
+                    status, payload, _ = worker.conn.recv()
+                else:
+                    status, payload = "timeout", f"wall-clock limit of {self.wall_timeout}s exceeded"
+                    worker = self._replace(worker)
+            except (EOFError, OSError) as e:
+                status, payload = "crashed", f"worker died: {e!r}"
+                worker = self._replace(worker)
+            finally:
+                self._release(worker)
+        finally:
+            self._unpublish(block)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        self._record(name, key, elapsed_ms, status, payload)
+        if status != "ok":
+            raise StrategyExecutionError(status, payload)
+        return np.frombuffer(payload, dtype=np.int8).copy()
+
+    def stats(self) -> dict:
+        """
+        Per-strategy latency and failure statistics.
+
+        :return: name -> {'calls', 'failures', 'last_ms', 'mean_ms', 'p95_ms', 'max_ms', 'quarantined'}
+        """
+        with self._lock:
+            out = {}
+            for name, s in self._stats.items():
+                recent = np.array(s["recent"]) if s["recent"] else np.zeros(1)
+                out[name] = {"calls": s["calls"], "failures": s["failures"], "last_ms": s["last_ms"],
+                             "mean_ms": s["total_ms"] / s["calls"] if s["calls"] else 0.0,
+                             "p95_ms": float(np.percentile(recent, 95)), "max_ms": s["max_ms"],
+                             "quarantined": s["hash"] in self.quarantined}
+            return out
+
+    def release_quarantine(self, code: str):
+        """Lifts the quarantine of a strategy (e.g. after it was regenerated or reviewed)."""
+        with self._lock:
+            self.quarantined.pop(code_hash(code), None)
+
+    def close(self):
+        """Stops the workers and releases shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        with self._available:
+            workers = list(self._idle)
+            self._idle.clear()
+        for worker in workers:
+            worker.stop()
+        with self._lock:
+            for shm, _ in self._blocks.values():
+                shm.close()
+                shm.unlink()
+            self._blocks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------ internals
+
+    def _publish(self, df: pd.DataFrame) -> tuple:
+        """
+        Copies candles into a shared block once per distinct dataset and pins it for one call.
+
+        :return: (block key, shm name, rows, columns); the caller must pass the key to _unpublish
+        """
+        rows = len(df)
+        columns = _columns(df)
+        arrays = [to_epoch_ms(df[col]) if kind == 'M' else df[col].to_numpy(dtype=np.float64) for col, kind in columns]
+        digest = hashlib.blake2b(repr(columns).encode(), digest_size=16)
+        for values in arrays:
+            digest.update(np.ascontiguousarray(values).view(np.uint8))
+        key = digest.hexdigest()
+
+        with self._lock:
+            if key in self._blocks:
+                self._blocks.move_to_end(key)
+            else:
+                shm = shared_memory.SharedMemory(create=True, size=max(rows * 8 * len(columns), 1))
+                for i, values in enumerate(arrays):
+                    np.ndarray((rows,), dtype=values.dtype, buffer=shm.buf, offset=i * rows * 8)[:] = values
+                self._blocks[key] = [shm, 0]
+            entry = self._blocks[key]
+            entry[1] += 1
+            self._evict()
+            return key, entry[0].name, rows, columns
+
+    def _unpublish(self, key: str):
+        """Unpins a block after its call returned; unused blocks over the budget are unlinked."""
+        with self._lock:
+            entry = self._blocks.get(key)
+            if entry is not None:
+                entry[1] -= 1
+                self._evict()
+
+    def _evict(self):
+        """Unlinks the least recently used blocks no call is using while over budget (lock held)."""
+        excess = len(self._blocks) - (self.workers + 1)
+        for key in [k for k, (_, refs) in self._blocks.items() if refs == 0][:max(excess, 0)]:
+            shm, _ = self._blocks.pop(key)
+            shm.close()
+            shm.unlink()
+
+    def _acquire(self) -> _Worker:
+        with self._available:
+            while not self._idle:
+                if self._closed:
+                    raise RuntimeError("SandboxPool is closed")
+                self._available.wait()
+            return self._idle.popleft()
+
+    def _release(self, worker: _Worker):
+        with self._available:
+            if self._closed:
+                worker.stop()
+                return
+            self._idle.append(worker)
+            self._available.notify()
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        return _Worker(self._ctx, self.cpu_seconds, self.memory_mb)
+
+    def _record(self, name: str, key: str, elapsed_ms: float, status: str, message: str):
+        with self._lock:
+            s = self._stats.setdefault(name, {"hash": key, "calls": 0, "failures": 0, "total_ms": 0.0,
+                                              "last_ms": 0.0, "max_ms": 0.0, "recent": deque(maxlen=100)})
+            s["hash"] = key
+            s["calls"] += 1
+            s["total_ms"] += elapsed_ms
+            s["last_ms"] = elapsed_ms
+            s["max_ms"] = max(s["max_ms"], elapsed_ms)
+            s["recent"].append(elapsed_ms)
+            if status == "ok":
+                return
+            if status == "unavailable":
+                log.warning(f"[Sandbox] ⚠ {name} not run: {message}")
+                return
+            s["failures"] += 1
+            if s["failures"] >= self.max_failures and key not in self.quarantined:
+                self.quarantined[key] = f"{status}: {message}"
+        log.warning(f"[Sandbox] 🚫 {name} {status}: {message}")
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_sandbox() -> SandboxPool:
+    """Returns the process-wide sandbox pool, starting it on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL._closed:
+            _POOL = SandboxPool()
+            atexit.register(_POOL.close)
+        return _POOL
+
+
+def sandbox_stats() -> dict:
+    """Per-strategy statistics of the process-wide pool ({} if it was never started)."""
+    return _POOL.stats() if _POOL is not None else {}
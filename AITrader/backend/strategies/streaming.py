@@ -0,0 +1,99 @@
+"""
+streaming.py
+------------
+Streaming variants of the classic and momentum strategies.
+Each is seeded once from history and then emits the latest signal per new bar in O(1),
+producing exactly the signal the batch DataFrame version would give for that bar.
+"""
+
+from abc import ABC, abstractmethod
+import pandas as pd
+from backend.strategies.indicators import RollingMean, RollingStd, RSI, RollingReturnMean
+
+
+class StreamingStrategy(ABC):
+    """
+    Base class for incremental strategies.
+    """
+
+    def seed(self, df: pd.DataFrame) -> int:
+        """
+        Replays history once to warm up indicator state.
+
+        :param df: DataFrame with 'close' price
+        :return: Signal for the last bar
+        """
+        signal = 0
+        for close in df['close'].to_numpy(dtype=float).tolist():
+            signal = self.update(close)
+        return signal
+
+    @abstractmethod
+    def update(self, close: float) -> int:
+        """
+        Consumes one new bar.
+
+        :param close: Close price of the new bar
+        :return: Signal for that bar (1 buy, -1 sell, 0 none)
+        """
+        pass
+
+
+class StreamingSMACrossover(StreamingStrategy):
+    """Incremental ClassicStrategies.sma_crossover."""
+
+    def __init__(self, short_window: int = 20, long_window: int = 50):
+        self.sma_short = RollingMean(short_window, min_periods=1)
+        self.sma_long = RollingMean(long_window, min_periods=1)
+
+    def update(self, close: float) -> int:
+        short, long = self.sma_short.update(close), self.sma_long.update(close)
+        return 1 if short > long else -1 if short < long else 0
+
+
+class StreamingRSI(StreamingStrategy):
+    """Incremental ClassicStrategies.rsi_strategy."""
+
+    def __init__(self, period: int = 14, lower: float = 30, upper: float = 70, smoothing: str = "simple"):
+        self.rsi = RSI(period, smoothing)
+        self.lower = lower
+        self.upper = upper
+
+    def update(self, close: float) -> int:
+        rsi = self.rsi.update(close)
+        signal = 1 if rsi < self.lower else 0
+        return -1 if rsi > self.upper else signal
+
+
+class StreamingBollinger(StreamingStrategy):
+    """Incremental ClassicStrategies.bollinger_bands."""
+
+    def __init__(self, window: int = 20, num_std_dev: float = 2):
+        self.ma = RollingMean(window)
+        self.std = RollingStd(window)
+        self.num_std_dev = num_std_dev
+
+    def update(self, close: float) -> int:
+        close = float(close)
+        ma, std = self.ma.update(close), self.std.update(close)
+        signal = 1 if close < ma - self.num_std_dev * std else 0
+        return -1 if close > ma + self.num_std_dev * std else signal
+
+
+class StreamingMomentum(StreamingStrategy):
+    """Incremental AILearnedMomentum."""
+
+    def __init__(self, window: int = 5):
+        self.momentum = RollingReturnMean(window)
+
+    def update(self, close: float) -> int:
+        score = self.momentum.update(close)
+        return 1 if score > 0 else -1 if score < 0 else 0
+
+
+STREAMING_STRATEGIES = {
+    "sma_crossover": StreamingSMACrossover,
+    "rsi_strategy": StreamingRSI,
+    "bollinger_bands": StreamingBollinger,
+    "ai_momentum": StreamingMomentum,
+}
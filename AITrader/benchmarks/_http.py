@@ -0,0 +1,54 @@
+"""
+_http.py
+--------
+Local HTTP server for the scanner benchmark and tests.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def serve_articles(pages: dict, delay: float = 0.0, always_not_modified: tuple = ()):
+    """
+    Starts a local HTTP server for {path: html} pages with ETag revalidation.
+
+    :param delay: Seconds of latency per request
+    :param always_not_modified: Paths answered with 304 even without a matching If-None-Match
+    :return: (server, hits) where hits counts the 200 and 304 responses
+    """
+    hits = {"200": 0, "304": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = pages[self.path].encode()
+            etag = f'"{hash(body)}"'
+            if self.headers.get("If-None-Match") == etag or self.path in always_not_modified:
+                hits["304"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            hits["200"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None   # clients abandon streamed pages
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
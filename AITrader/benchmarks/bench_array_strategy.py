@@ -0,0 +1,62 @@
+"""
+bench_array_strategy.py
+-----------------------
+Peak memory (tracemalloc) and throughput of the DataFrame strategy path versus the array-native path
+for the built-in strategies. Indicator caching is disabled so both paths do the full computation.
+
+Run from the AITrader directory:  python -m benchmarks.bench_array_strategy
+"""
+
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from backend.strategies.ai_generated import AILearnedMomentum
+from backend.strategies.array_strategy import (OHLCVArrays, ArraySMACrossover, ArrayRSI, ArrayBollinger,
+                                               ArrayMomentum)
+from backend.strategies.classic import ClassicStrategies
+from backend.strategies.indicator_cache import IndicatorCache
+
+
+def measure(func) -> tuple:
+    """Returns (seconds, peak bytes allocated) for one call."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(candles: int = 2_000_000):
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, candles)))
+    df = pd.DataFrame({'timestamp': pd.to_datetime(1_700_000_000_000 + np.arange(candles) * 60_000, unit='ms'),
+                       'open': close, 'high': close * 1.001, 'low': close * 0.999, 'close': close,
+                       'volume': rng.uniform(1, 10, candles)})
+    dataset_mb = df.memory_usage(index=False).sum() / 1e6
+    cols = OHLCVArrays.from_frame(df)
+    no_cache = IndicatorCache(max_entries=0)
+
+    pairs = [
+        ("sma_crossover", lambda: ClassicStrategies.sma_crossover(df, cache=no_cache),
+         lambda: ArraySMACrossover(cache=no_cache).compute_signals(cols)),
+        ("rsi_strategy", lambda: ClassicStrategies.rsi_strategy(df, cache=no_cache),
+         lambda: ArrayRSI(cache=no_cache).compute_signals(cols)),
+        ("bollinger_bands", lambda: ClassicStrategies.bollinger_bands(df, cache=no_cache),
+         lambda: ArrayBollinger(cache=no_cache).compute_signals(cols)),
+        ("ai_momentum", lambda: AILearnedMomentum(cache=no_cache).generate_signals(df),
+         lambda: ArrayMomentum(cache=no_cache).compute_signals(cols)),
+    ]
+    print(f"{candles:,} candles, dataset {dataset_mb:.0f} MB")
+    for name, frame_path, array_path in pairs:
+        frame_s, frame_peak = measure(frame_path)
+        array_s, array_peak = measure(array_path)
+        print(f"{name:>16}: DataFrame {frame_s * 1000:7.1f} ms peak {frame_peak / 1e6:6.1f} MB | "
+              f"array {array_s * 1000:7.1f} ms peak {array_peak / 1e6:6.1f} MB "
+              f"({frame_peak / array_peak:.1f}x less memory, {candles / array_s / 1e6:.1f}M candles/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+bench_database.py
+-----------------
+Measures DatabaseClient upsert throughput and indexed range-query latency.
+
+Run from the AITrader directory:  python -m benchmarks.bench_database
+"""
+
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from backend.data.database import DatabaseClient
+
+
+def synthetic_candles(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(1_600_000_000_000 + np.arange(n) * 60_000, unit='ms'),
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': rng.uniform(1, 10, n),
+    })
+
+
+def main(n: int = 500_000):
+    df = synthetic_candles(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseClient(os.path.join(tmp, "bench.db"))
+
+        t0 = time.perf_counter()
+        db.insert_ohlcv(df, symbol='BTC/USDT', timeframe='1m')
+        insert_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        db.insert_ohlcv(df, symbol='BTC/USDT', timeframe='1m')
+        upsert_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        out = db.fetch_ohlcv('BTC/USDT', '1m', start=df['timestamp'].iloc[n // 2], end=df['timestamp'].iloc[n // 2 + 1439])
+        query_s = time.perf_counter() - t0
+        db.close()
+
+    print(f"insert : {n / insert_s:,.0f} candles/sec")
+    print(f"upsert : {n / upsert_s:,.0f} candles/sec (all conflicts)")
+    print(f"range  : {len(out)} rows in {query_s * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
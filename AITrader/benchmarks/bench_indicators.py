@@ -0,0 +1,67 @@
+"""
+bench_indicators.py
+-------------------
+Per-bar latency of the streaming strategies versus recomputing the batch DataFrame version
+over the trading window, for 1, 100 and 1000 symbols.
+
+Run from the AITrader directory:  python -m benchmarks.bench_indicators
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from backend.strategies.classic import ClassicStrategies
+from backend.strategies.streaming import StreamingSMACrossover, StreamingRSI, StreamingBollinger
+
+WINDOW = 500
+
+
+def make_closes(symbols: int, bars: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return 100 + np.cumsum(rng.normal(0, 1, (symbols, bars)), axis=1)
+
+
+def bench_streaming(closes: np.ndarray, updates: int) -> float:
+    """Returns microseconds per bar per symbol for all three streaming strategies."""
+    strategies = []
+    for row in closes[:, :WINDOW]:
+        history = pd.DataFrame({'close': row})
+        group = [StreamingSMACrossover(), StreamingRSI(), StreamingBollinger()]
+        for strategy in group:
+            strategy.seed(history)
+        strategies.append(group)
+
+    new_bars = closes[:, WINDOW:WINDOW + updates].tolist()
+    t0 = time.perf_counter()
+    for group, bars in zip(strategies, new_bars):
+        for close in bars:
+            for strategy in group:
+                strategy.update(close)
+    return (time.perf_counter() - t0) / (len(strategies) * updates) * 1e6
+
+
+def bench_batch(closes: np.ndarray, updates: int) -> float:
+    """Returns microseconds per bar per symbol when recomputing the batch strategies on the window."""
+    t0 = time.perf_counter()
+    for row in closes:
+        for i in range(updates):
+            df = pd.DataFrame({'close': row[i + 1:WINDOW + i + 1]})
+            ClassicStrategies.sma_crossover(df)
+            ClassicStrategies.rsi_strategy(df)
+            ClassicStrategies.bollinger_bands(df)
+    return (time.perf_counter() - t0) / (len(closes) * updates) * 1e6
+
+
+def main(updates: int = 20):
+    for symbols in (1, 100, 1000):
+        closes = make_closes(symbols, WINDOW + updates)
+        streaming = bench_streaming(closes, updates)
+        # The batch path is slow; sample a subset of symbols and report per-symbol cost
+        batch = bench_batch(closes[:min(symbols, 20)], min(updates, 5))
+        print(f"{symbols:>5} symbols: streaming {streaming:8.2f} us/bar  batch {batch:10.2f} us/bar  "
+              f"-> {batch / streaming:,.0f}x  (one bar for all symbols: {streaming * symbols / 1000:.2f} ms "
+              f"vs {batch * symbols / 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
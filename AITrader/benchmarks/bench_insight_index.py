@@ -0,0 +1,67 @@
+"""
+bench_insight_index.py
+----------------------
+InsightIndex at 100k documents (60 Zipf-distributed words each): build/save time, BM25 query latency
+for 1-3 keyword queries (including the most common terms), and near-duplicate lookups.
+
+Run from the AITrader directory:  python -m benchmarks.bench_insight_index
+"""
+
+import os
+import tempfile
+import time
+import numpy as np
+from backend.ai.insight_index import InsightIndex
+
+
+def main(docs: int = 100_000, words: int = 60, vocab_size: int = 20_000, queries: int = 500):
+    rng = np.random.default_rng(0)
+    vocab = np.array([f"w{i}" for i in range(vocab_size)])
+    p = 1 / np.arange(1, vocab_size + 1) ** 1.07
+    texts = [" ".join(row) for row in rng.choice(vocab, (docs, words), p=p / p.sum())]
+    query_set = [" ".join(rng.choice(vocab[:3000], rng.integers(1, 4))) for _ in range(queries)]
+    query_set += ["w0", "w0 w1 w2", "w3 w5000"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "insights.db")
+        index = InsightIndex(path)
+        t0 = time.perf_counter()
+        for text in texts:
+            index.add(text)
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        index.close()
+        save = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        index = InsightIndex(path)
+        load = time.perf_counter() - t0
+
+        for query in query_set:   # first query of a term builds its impact order
+            index.search(query, 5)
+        latency = []
+        for query in query_set:
+            runs = []
+            for _ in range(3):
+                t0 = time.perf_counter()
+                index.search(query, 5)
+                runs.append(time.perf_counter() - t0)
+            latency.append(min(runs))
+        latency = np.array(latency) * 1e6
+
+        dup = []
+        for text in texts[:200]:
+            t0 = time.perf_counter()
+            index.near_duplicates(text)
+            dup.append(time.perf_counter() - t0)
+        dup = np.array(dup) * 1e6
+        index.close()
+
+    print(f"{docs} documents x {words} words")
+    print(f"build {build:.1f}s ({build / docs * 1e6:.0f}us/doc), save {save:.2f}s, load {load:.2f}s")
+    print(f"search top-5:    p50 {np.median(latency):6.0f}us  p99 {np.percentile(latency, 99):6.0f}us  "
+          f"max {latency.max():6.0f}us")
+    print(f"near-duplicates: p50 {np.median(dup):6.0f}us  p99 {np.percentile(dup, 99):6.0f}us")
+
+
+if __name__ == "__main__":
+    main()
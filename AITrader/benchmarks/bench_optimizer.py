@@ -0,0 +1,34 @@
+"""
+bench_optimizer.py
+------------------
+Times a 10k-point SMA-crossover parameter sweep over 1M candles, in-process and across all cores.
+
+Run from the AITrader directory:  python -m benchmarks.bench_optimizer
+"""
+
+import os
+import time
+import numpy as np
+from backend.strategies.optimizer import sweep
+
+
+def main(candles: int = 1_000_000):
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.001, candles)))
+    grid = {"short_window": range(5, 105), "long_window": range(110, 310, 2)}
+    points = len(grid["short_window"]) * len(grid["long_window"])
+
+    runs = [("in-process", None)]
+    if (os.cpu_count() or 1) > 1:
+        runs.append((f"{os.cpu_count()} workers", os.cpu_count()))
+    for label, workers in runs:
+        t0 = time.perf_counter()
+        ranked = sweep(close, "sma_crossover", grid, workers=workers)
+        elapsed = time.perf_counter() - t0
+        best = ranked.iloc[0].to_dict()
+        print(f"{label:>12}: {points:,} combinations x {candles:,} candles in {elapsed:.1f}s "
+              f"({elapsed / points * 1000:.2f} ms/combination); best short={best['short_window']:.0f} "
+              f"long={best['long_window']:.0f} sharpe={best['sharpe']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+bench_rl_agent.py
+-----------------
+Q-learning training throughput: the row-by-row, dict-backed loop (the previous behaviour, timed on
+a slice) versus the array-backed ReinforcementTradingAgent.train on a year of 1m candles.
+
+Run from the AITrader directory:  python -m benchmarks.bench_rl_agent
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from backend.ai.reinforcement_agent import ReinforcementTradingAgent
+
+YEAR_1M = 525_600
+
+
+def make_candles(bars: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, bars))
+    return pd.DataFrame({'open': close + rng.normal(0, 0.1, bars), 'close': close,
+                         'volume': rng.uniform(0, 10, bars)})
+
+
+def row_by_row(df: pd.DataFrame, alpha=0.1, gamma=0.9, epsilon=0.2) -> dict:
+    actions, q_table = ['BUY', 'SELL', 'HOLD'], {}
+    df = df.copy()
+    df['action'] = 'HOLD'
+    df['reward'] = 0.0
+    for i in range(1, len(df)):
+        prev_row, row = df.iloc[i - 1], df.iloc[i]
+        state = f"{int(prev_row['close'] > prev_row['open'])}-{int(prev_row['volume'] > 0)}"
+        next_state = f"{int(row['close'] > row['open'])}-{int(row['volume'] > 0)}"
+        if np.random.rand() < epsilon:
+            action = np.random.choice(actions)
+        else:
+            q_values = q_table.get(state, {})
+            action = max(q_values, key=q_values.get, default='HOLD')
+        reward = row['close'] - prev_row['close'] if action == 'BUY' else prev_row['close'] - row['close']
+        df.at[i, 'action'] = action
+        df.at[i, 'reward'] = reward
+        q_table.setdefault(state, {a: 0.0 for a in actions})
+        next_max_q = max(q_table.get(next_state, {}).values(), default=0.0)
+        q_table[state][action] += alpha * (reward + gamma * next_max_q - q_table[state][action])
+    return q_table
+
+
+def main(bars: int = YEAR_1M, slice_bars: int = 20_000):
+    df = make_candles(bars)
+
+    np.random.seed(7)
+    t0 = time.perf_counter()
+    expected = row_by_row(df.iloc[:slice_bars])
+    old = (time.perf_counter() - t0) / slice_bars
+
+    np.random.seed(7)
+    agent = ReinforcementTradingAgent()
+    agent.train(df.iloc[:slice_bars])
+    assert agent.q_table == expected
+
+    np.random.seed(7)
+    t0 = time.perf_counter()
+    ReinforcementTradingAgent().train(df)
+    new = (time.perf_counter() - t0) / bars
+
+    print(f"{bars} bars (one year of 1m candles)")
+    print(f"row-by-row:    {old * 1e6:7.2f} us/bar  (~{old * bars:.0f}s for the year, timed on {slice_bars})")
+    print(f"array-backed:  {new * 1e6:7.2f} us/bar  ({new * bars:.2f}s, {old / new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
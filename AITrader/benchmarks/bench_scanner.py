@@ -0,0 +1,63 @@
+"""
+bench_scanner.py
+----------------
+Article summarization throughput against a local HTTP server (40 articles of ~300 KB, 20ms latency).
+The baseline reproduces the previous fetch path: a new connection per article, serial, with the whole
+document downloaded and parsed before the first five paragraphs are taken. It is compared with the
+pooled concurrent fetcher (cold, ETag revalidation after a restart, and fresh cache hits).
+
+Run from the AITrader directory:  python -m benchmarks.bench_scanner
+"""
+
+import os
+import tempfile
+import time
+import requests
+from backend.ai.knowledge_scanner import ArticleFetcher, ParagraphExtractor, SummaryCache
+from benchmarks._http import serve_articles
+
+
+def baseline(urls: list) -> list:
+    summaries = []
+    for url in urls:
+        html = requests.get(url, timeout=10).text
+        parser = ParagraphExtractor(max_paragraphs=10 ** 9)
+        parser.feed(html)
+        parser.close()
+        summaries.append(" ".join(parser.paragraphs[:5]).strip()[:1000])
+    return summaries
+
+
+def timed(label: str, func, urls: list, reference: float = None) -> float:
+    t0 = time.perf_counter()
+    func(urls)
+    elapsed = time.perf_counter() - t0
+    speedup = f"  ({reference / elapsed:.1f}x)" if reference else ""
+    print(f"{label:<28}{elapsed:7.3f}s  {len(urls) / elapsed:8.1f} articles/s{speedup}")
+    return elapsed
+
+
+def main(articles: int = 40, latency: float = 0.02):
+    body = "".join(f"<p>Paragraph {i} about funding rates and momentum.</p>" for i in range(12))
+    filler = ('<div>' + 'lorem ipsum ' * 100 + '</div>') * 250
+    page = f"<html><body>{body}{filler}</body></html>"
+    pages = {f"/article/{i}": page.replace("Paragraph", f"Article {i}") for i in range(articles)}
+    server, _ = serve_articles(pages, delay=latency)
+    urls = [f"http://127.0.0.1:{server.server_address[1]}{path}" for path in pages]
+    print(f"{articles} articles of {len(page) / 1024:.0f} KB, {latency * 1000:.0f}ms server latency")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "articles.json")
+            ref = timed("serial, full parse:", baseline, urls)
+            cold = ArticleFetcher(SummaryCache(path), fresh_seconds=0)
+            timed("pooled, cold:", cold.summarize_many, urls, ref)
+            timed("pooled, ETag revalidation:", ArticleFetcher(SummaryCache(path), fresh_seconds=0).summarize_many, urls, ref)
+            timed("pooled, fresh cache:", ArticleFetcher(SummaryCache(path)).summarize_many, urls, ref)
+            print(f"bytes read cold: {cold.metrics['bytes_read'] / 1024:.0f} KB "
+                  f"of {articles * len(page) / 1024:.0f} KB")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
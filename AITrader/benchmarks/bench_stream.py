@@ -0,0 +1,48 @@
+"""
+bench_stream.py
+---------------
+Deterministic load test: replays stored candles through ReplayServer -> CandleStream
+and reports end-to-end events per second.
+
+Run from the AITrader directory:  python -m benchmarks.bench_stream
+"""
+
+import asyncio
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from backend.data.ohlcv_store import OHLCVStore
+from backend.data.stream import CandleStream, ReplayServer, ReplaySource
+
+
+async def replay(store: OHLCVStore, symbols: list, overflow: str) -> tuple:
+    async with ReplayServer(store) as server:
+        stream = CandleStream(ReplaySource(port=server.port), overflow=overflow)
+
+        async def drain(symbol):
+            return sum([1 async for _ in stream.subscribe(symbol, '1m', since=-1)])
+
+        t0 = time.perf_counter()
+        counts = await asyncio.gather(*(drain(s) for s in symbols))
+        return sum(counts), time.perf_counter() - t0, stream.stats
+
+
+def main(candles: int = 50_000, symbols: int = 4):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OHLCVStore(root=tmp, exchange='bench')
+        close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, candles))
+        df = pd.DataFrame({'timestamp': pd.to_datetime(1_700_000_000_000 + np.arange(candles) * 60_000, unit='ms'),
+                           'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0})
+        names = [f"C{i}/USDT" for i in range(symbols)]
+        for name in names:
+            store.append(df, name, '1m')
+
+        for overflow in ("block", "drop_oldest"):
+            events, elapsed, stats = asyncio.run(replay(store, names, overflow))
+            print(f"{overflow:>12}: {events:,} events in {elapsed:.2f}s -> {events / elapsed:,.0f} events/sec "
+                  f"(dropped={stats['dropped']})")
+
+
+if __name__ == "__main__":
+    main()
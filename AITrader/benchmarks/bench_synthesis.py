@@ -0,0 +1,45 @@
+"""
+bench_synthesis.py
+------------------
+Strategy synthesis for 32 ideas against the offline stub backend with 250ms simulated latency:
+serial calls (the previous behaviour) versus bounded-concurrency async synthesis, and a warm restart
+that answers every idea from the persistent response cache.
+
+Run from the AITrader directory:  python -m benchmarks.bench_synthesis
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from backend.ai.llm_backends import LocalStubBackend, ResponseCache
+from backend.ai.strategy_synthesizer import synthesize_many
+
+
+def main(ideas: int = 32, latency: float = 0.25, concurrency: int = 8):
+    prompts = [f"Idea {i}: buy when momentum over {i + 3} bars turns positive" for i in range(ideas)]
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = LocalStubBackend(latency=latency)
+        t0 = time.perf_counter()
+        asyncio.run(synthesize_many(prompts, backend, ResponseCache(None), concurrency=1))
+        serial = time.perf_counter() - t0
+
+        backend = LocalStubBackend(latency=latency)
+        path = os.path.join(tmp, "llm.json")
+        t0 = time.perf_counter()
+        asyncio.run(synthesize_many(prompts, backend, ResponseCache(path), concurrency=concurrency))
+        parallel = time.perf_counter() - t0
+
+        backend = LocalStubBackend(latency=latency)
+        t0 = time.perf_counter()
+        asyncio.run(synthesize_many(prompts, backend, ResponseCache(path), concurrency=concurrency))
+        warm = time.perf_counter() - t0
+
+    print(f"{ideas} ideas, {latency * 1000:.0f}ms per LLM call")
+    print(f"serial:                {serial:7.3f}s")
+    print(f"concurrency={concurrency}:         {parallel:7.3f}s  ({serial / parallel:.1f}x)")
+    print(f"warm cache (restart):  {warm:7.3f}s  ({backend.calls} LLM calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+bench_trading_env.py
+--------------------
+RL training throughput in environment steps per second: the single-pass ReinforcementTradingAgent
+versus BatchTradingEnv + ParallelTrainer over 8 symbols, for 1, 2, 4 ... workers up to the core count.
+With one shard per worker, the work per worker is constant, so steps/s should grow close to linearly
+with the number of cores.
+
+Run from the AITrader directory:  python -m benchmarks.bench_trading_env
+"""
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from backend.ai.reinforcement_agent import ReinforcementTradingAgent
+from backend.ai.trading_env import BatchTradingEnv, ParallelTrainer
+
+
+def make_series(symbols: int, bars: int) -> dict:
+    rng = np.random.default_rng(0)
+    series = {}
+    for i in range(symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+        series[f"SYM{i}"] = pd.DataFrame({'open': close * (1 + rng.normal(0, 0.0005, bars)), 'close': close,
+                                          'volume': rng.lognormal(3, 0.5, bars)})
+    return series
+
+
+def main(symbols: int = 8, bars: int = 100_000, n_envs: int = 256, rounds: int = 4, sync_every: int = 4):
+    series = make_series(symbols, bars)
+
+    np.random.seed(0)
+    t0 = time.perf_counter()
+    ReinforcementTradingAgent().train(series['SYM0'])
+    single = (bars - 1) / (time.perf_counter() - t0)
+    print(f"single-pass agent:            {single:12,.0f} steps/s")
+
+    env = BatchTradingEnv(series, n_envs=n_envs, episode_length=256)
+    cores = os.cpu_count() or 1
+    workers = 1
+    while workers <= cores:
+        result = ParallelTrainer(env, workers=workers).train(rounds, sync_every, seed=0)
+        print(f"batched env, {workers:2d} worker(s):    {result.steps_per_second:12,.0f} steps/s  "
+              f"({result.steps:,} steps, {result.steps_per_second / single:.1f}x single-pass)")
+        workers *= 2
+    if cores == 1:
+        print("(one core available: worker scaling not measurable here)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,12 @@ orchestrator.py
 Manages the trading logic: data ingestion, strategy execution, and (now) backtesting + futures execution.
 """
 
-from backend.data.database import MarketDatabase
+from backend.data.ohlcv_store import OHLCVStore
+from backend.data.resampler import TimeframeResampler
 from backend.data.api_mapper import ExchangeAPIMapper
 from backend.services.trading_service import TradingService
-from backend.strategies import classic, ai_generated
-from backend.ai.strategy_registry import get_strategy
+from backend.services.backtester import Backtester
+from backend.strategies import get_strategy, run_strategy
 import pandas as pd
 import logging
 
@@ -29,18 +30,20 @@ class TradingOrchestrator:
         self.stop_loss = stop_loss
         self.trailing_stop = trailing_stop
 
-        self.database = MarketDatabase()
+        self.store = OHLCVStore(exchange=exchange)
+        self.resampler = TimeframeResampler(self.store)
         self.api = ExchangeAPIMapper(exchange)
         self.trader = TradingService(exchange)
+        self.last_backtest = None  # BacktestResult of the latest run_backtest (ledger, metrics)
 
     def run_once(self) -> pd.DataFrame:
         df = self.api.fetch_ohlcv(self.symbol, self.timeframe)
-        self.database.insert_ohlcv(df, symbol=self.symbol, timeframe=self.timeframe)
+        self.store.append(df, symbol=self.symbol, timeframe=self.timeframe)
         strat = get_strategy(self.strategy_name)
         if not strat:
             raise Exception(f"Strategy not found: {self.strategy_name}")
 
-        df = strat(df)
+        df = run_strategy(strat, df)
 
         if self.trade_enabled and "signal" in df.columns and not df.empty:
             last_signal = df.iloc[-1]["signal"]
@@ -60,7 +63,7 @@ class TradingOrchestrator:
 
     def run_backtest(self, start_date, end_date, custom_tf) -> pd.DataFrame:
         log.info(f"[Backtest] Running from {start_date} to {end_date} at {custom_tf}")
-        df = self.database.fetch_ohlcv_range(
+        df = self.resampler.get(
             symbol=self.symbol,
             timeframe=custom_tf,
             start=start_date,
@@ -69,4 +72,15 @@ class TradingOrchestrator:
         strat = get_strategy(self.strategy_name)
         if not strat:
             raise Exception(f"Strategy not found: {self.strategy_name}")
-        return strat(df)
+        df = run_strategy(strat, df)
+        if df.empty or "signal" not in df.columns:
+            return df
+        # Same sizing and stops as the live futures orders
+        self.last_backtest = Backtester(
+            leverage=self.leverage,
+            position_size=self.trade_pct / 100 if self.trade_pct else 1.0,
+            stop_loss=self.stop_loss,
+            trailing_stop=self.trailing_stop
+        ).run(df)
+        log.info(f"[Backtest] Done: {self.last_backtest.metrics}")
+        return self.last_backtest.frame(df)
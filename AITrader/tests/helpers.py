@@ -0,0 +1,21 @@
+"""
+helpers.py
+----------
+Synthetic candle data shared by the test modules.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def make_candles(n: int, start_ms: int = 1_700_000_000_000, step_ms: int = 60_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(start_ms + np.arange(n) * step_ms, unit='ms'),
+        'open': close + rng.normal(0, 0.1, n),
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': rng.uniform(1, 10, n),
+    })
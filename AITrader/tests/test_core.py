@@ -1 +1,930 @@
-# Placeholder for test_core.py
+"""
+test_core.py
+------------
+Tests for the core data, strategy and service layers (backend.ai is covered by test_ai.py).
+"""
+
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.data.ohlcv_store import OHLCVStore, DAY_MS
+from tests.helpers import make_candles
+
+
+def test_ohlcv_store_appends_and_reads_across_days(tmp_path):
+    store = OHLCVStore(root=str(tmp_path), exchange='test')
+    df = make_candles(3000)  # spans three day partitions
+    store.append(df.iloc[:2000], 'BTC/USDT', '1m')
+    store.append(df.iloc[1990:], 'BTC/USDT', '1m')  # overlapping tail is merged, not duplicated
+
+    out = store.fetch_ohlcv_range('BTC/USDT', '1m')
+    assert len(store.partitions('BTC/USDT', '1m')) >= 2
+    assert len(out) == len(df)
+    np.testing.assert_array_equal(out['close'].to_numpy(), df['close'].to_numpy())
+    assert store.last_timestamp('BTC/USDT', '1m') == 1_700_000_000_000 + 2999 * 60_000
+
+
+def test_ohlcv_store_single_day_read_is_memory_mapped(tmp_path):
+    store = OHLCVStore(root=str(tmp_path), exchange='test')
+    start = 1_700_006_400_000 // DAY_MS * DAY_MS
+    store.append(make_candles(100, start_ms=start), 'ETH/USDT', '1m')
+
+    cols = store.read_range('ETH/USDT', '1m', start=start + 10 * 60_000, end=start + 19 * 60_000)
+    assert isinstance(cols['close'], np.memmap)
+    assert len(cols['timestamp']) == 10
+
+
+def test_database_upserts_are_idempotent(tmp_path):
+    from backend.data.database import DatabaseClient
+
+    db = DatabaseClient(str(tmp_path / "market.db"))
+    df = make_candles(500)
+    df['signal'] = np.where(np.arange(500) % 3 == 0, 1, 0)
+    for _ in range(3):
+        db.insert_ohlcv(df, symbol='BTC/USDT', timeframe='1m')
+        db.insert_signals(df, symbol='BTC/USDT', strategy='sma_crossover')
+
+    assert db.cursor.execute("SELECT COUNT(*) FROM ohlcv").fetchone()[0] == 500
+    assert db.cursor.execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 167
+    out = db.fetch_ohlcv('BTC/USDT', '1m', start=df['timestamp'].iloc[100], end=df['timestamp'].iloc[199])
+    assert len(out) == 100
+
+    plan = " ".join(row[-1] for row in db.cursor.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM ohlcv WHERE symbol = ? AND timeframe = ? AND timestamp BETWEEN ? AND ?",
+        ('BTC/USDT', '1m', 0, 1)))
+    assert "SEARCH" in plan and "SCAN" not in plan
+    db.close()
+
+
+def test_database_migrates_and_deduplicates_legacy_tables(tmp_path):
+    import sqlite3
+    from backend.data.database import DatabaseClient
+
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE ohlcv (id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT, timestamp TEXT, "
+                 "open REAL, high REAL, low REAL, close REAL, volume REAL, timeframe TEXT)")
+    conn.execute("CREATE TABLE signals (id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT, timestamp TEXT, "
+                 "signal INTEGER, strategy TEXT)")
+    rows = [('BTC/USDT', f'2024-01-01 00:0{i % 5}:00', 1, 2, 0.5, 1.5 + i, 10, '1m') for i in range(20)]
+    conn.executemany("INSERT INTO ohlcv (symbol, timestamp, open, high, low, close, volume, timeframe) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+    db = DatabaseClient(path)
+    out = db.fetch_ohlcv('BTC/USDT', '1m')
+    assert len(out) == 5
+    assert out['timestamp'].iloc[0] == pd.Timestamp('2024-01-01 00:00:00')
+    assert out['close'].iloc[0] == 1.5 + 15  # latest duplicate wins
+    db.close()
+
+
+class FakeExchange:
+    """Serves synthetic 1m candles through the ccxt fetch_ohlcv interface."""
+
+    rateLimit = 1
+    markets = {'BTC/USDT': {'symbol': 'BTC/USDT'}}
+
+    def __init__(self, n: int, start_ms: int = 1_700_000_040_000, page_cap: int = 200):
+        df = make_candles(n, start_ms=start_ms)
+        self.candles = [[int(ts)] + row for ts, row in zip(
+            df['timestamp'].astype('datetime64[ms]').astype('int64'),
+            df[['open', 'high', 'low', 'close', 'volume']].values.tolist())]
+        self.page_cap = page_cap
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        self.calls.append((since, limit))
+        rows = self.candles if since is None else [c for c in self.candles if c[0] >= since]
+        count = min(limit or self.page_cap, self.page_cap)
+        return rows[:count] if since is not None else rows[-count:]
+
+
+def make_ingestor(tmp_path, exchange):
+    from backend.data.ingestor import MarketDataIngestor
+
+    ingestor = MarketDataIngestor('htx', 'BTC/USDT', '1m')
+    ingestor.store = OHLCVStore(root=str(tmp_path), exchange='htx')
+    ingestor.mapper.exchange = exchange
+    return ingestor
+
+
+def test_ingestor_sync_fetches_only_new_candles(tmp_path):
+    fake = FakeExchange(1000)
+    ingestor = make_ingestor(tmp_path, fake)
+    ingestor.sync(initial_limit=100)
+    assert ingestor.high_water_mark() == fake.candles[-1][0]
+
+    fake.candles.extend([[fake.candles[-1][0] + 60_000, 1.0, 2.0, 0.5, 1.5, 3.0]])
+    fake.calls.clear()
+    new = ingestor.sync()
+    assert len(new) == 2  # re-fetched last candle + the newly closed one
+    assert fake.calls[0][0] == fake.candles[-2][0]
+
+
+def test_ingestor_backfills_gaps_with_pagination(tmp_path):
+    fake = FakeExchange(1000)
+    ingestor = make_ingestor(tmp_path, fake)
+    ingestor.store.append(make_candles(1000, start_ms=fake.candles[0][0]).drop(range(300, 700)), 'BTC/USDT', '1m')
+    assert ingestor.find_gaps() == [(fake.candles[300][0], fake.candles[699][0])]
+
+    written = ingestor.backfill(start=fake.candles[0][0])
+    assert written == 400
+    assert ingestor.find_gaps(start=fake.candles[0][0]) == []
+    assert len(fake.calls) >= 2  # 400 candles at 200 per page
+
+
+class StubAsyncExchange:
+    """Async stand-in for a ccxt.async_support client that records peak concurrency."""
+
+    rateLimit = 50
+
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+        self.loops = set()
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        import asyncio
+
+        self.loops.add(asyncio.get_running_loop())
+        if symbol == 'BAD/USDT':
+            raise RuntimeError("delisted")
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return [[1_700_000_000_000 + i * 60_000, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(limit)]
+
+
+def test_async_ingestor_fetches_pairs_concurrently(tmp_path):
+    from backend.data.async_ingestor import AsyncMarketDataIngestor
+
+    stub = StubAsyncExchange()
+    store = OHLCVStore(root=str(tmp_path), exchange='stub')
+    ingestor = AsyncMarketDataIngestor('stub', max_concurrency=4, store=store, client=stub)
+    pairs = [(f"C{i}/USDT", '1m') for i in range(12)] + [('BAD/USDT', '1m')]
+
+    frames = ingestor.run(pairs, limit=50, persist=True)
+    assert len(frames) == 12 and ('BAD/USDT', '1m') not in frames
+    assert stub.peak == 4
+    assert len(store.fetch_ohlcv_range('C3/USDT', '1m')) == 50
+
+    # Repeated blocking calls stay on one event loop (and therefore one session) until close()
+    ingestor.run(pairs[:2], limit=5)
+    assert len(stub.loops) == 1
+    ingestor.close()
+    assert ingestor._loop is None
+
+
+class FakeMarketsClient:
+    id = 'fake'
+    options = {'defaultType': 'future'}
+
+    def __init__(self):
+        self.markets = None
+        self.currencies = None
+        self.network_loads = 0
+
+    def load_markets(self, reload=False):
+        # As ccxt: only an empty or forced load goes to the exchange
+        if self.markets and not reload:
+            return self.markets
+        self.network_loads += 1
+        self.markets = {'BTC/USDT': {'symbol': 'BTC/USDT', 'info': {'contract_size': 0.001}}}
+        self.currencies = {'USDT': {'code': 'USDT'}}
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets, self.currencies = markets, currencies
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        self.load_markets()
+        return [[since or 0, 1.0, 1.0, 1.0, 1.0, 1.0]]
+
+
+def test_exchange_pool_shares_clients_and_caches_markets(tmp_path, monkeypatch):
+    from backend.data import api_mapper
+    from backend.data.exchange_pool import ExchangeClientPool
+
+    pool = ExchangeClientPool(cache_dir=str(tmp_path), ttl=60)
+    a = pool.get('htx', 'key', 'secret')
+    assert pool.get('htx', 'key', 'secret') is a
+    assert pool.get('htx', 'other', 'secret') is not a
+    assert pool.get('htx', 'key', 'secret', options={'defaultType': 'future'}) is not a
+
+    first = FakeMarketsClient()
+    pool.load_markets(first)
+    pool.load_markets(first)
+    assert first.network_loads == 1
+
+    warm = FakeMarketsClient()  # e.g. a fresh process after restart
+    assert pool.load_markets(warm)['BTC/USDT']['info']['contract_size'] == 0.001
+    assert warm.network_loads == 0
+
+    # The mapper loads markets through the pool before its first call, so ccxt never fetches them
+    cold = FakeMarketsClient()
+    monkeypatch.setattr(api_mapper, "get_exchange", lambda *args: cold)
+    monkeypatch.setattr(api_mapper, "load_markets", pool.load_markets)
+    mapper = api_mapper.ExchangeAPIMapper('htx')
+    assert len(mapper.fetch_ohlcv('BTC/USDT')) == 1
+    assert len(mapper.fetch_ohlcv_since('BTC/USDT', '1m', since=0, until=0)) == 1
+    assert cold.network_loads == 0
+
+
+class FlakySource:
+    """Wraps a source and drops the connection after a fixed number of messages, once."""
+
+    def __init__(self, inner, fail_after: int):
+        self.inner = inner
+        self.fail_after = fail_after
+        self.requested_since = []
+
+    async def stream(self, symbol, timeframe, since=None):
+        self.requested_since.append(since)
+        count = 0
+        async for msg in self.inner.stream(symbol, timeframe, since):
+            if self.fail_after and count == self.fail_after:
+                self.fail_after = 0
+                raise ConnectionError("socket reset")
+            count += 1
+            yield msg
+
+
+def test_candle_stream_replays_and_resyncs_after_disconnect(tmp_path):
+    import asyncio
+    from backend.data.stream import CandleStream, ReplayServer, ReplaySource
+
+    source_store = OHLCVStore(root=str(tmp_path / "src"), exchange='replay')
+    df = make_candles(120)
+    source_store.append(df, 'BTC/USDT', '1m')
+    sink_store = OHLCVStore(root=str(tmp_path / "sink"), exchange='replay')
+
+    async def consume():
+        async with ReplayServer(source_store, updates_per_bar=1) as server:
+            flaky = FlakySource(ReplaySource(port=server.port), fail_after=81)
+            stream = CandleStream(flaky, store=sink_store, reconnect_delay=0.01)
+            events = [e async for e in stream.subscribe('BTC/USDT', '1m')]
+            return events, stream, flaky
+
+    events, stream, flaky = asyncio.run(consume())
+    closed = [e.timestamp for e in events if e.closed]
+    assert closed == sorted(set(closed)) and len(closed) == 120
+    assert stream.stats["reconnects"] == 1
+    assert flaky.requested_since[1] == closed[39]  # resumed after the last closed candle
+    np.testing.assert_array_equal(sink_store.fetch_ohlcv_range('BTC/USDT', '1m')['close'], df['close'])
+
+
+class StubProClient:
+    """ccxt.pro stand-in: scripted watch_ohlcv batches, and trades that never arrive."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        import asyncio
+
+        if not self.batches:
+            await asyncio.sleep(3600)
+        return self.batches.pop(0)
+
+    async def watch_trades(self, symbol):
+        import asyncio
+
+        await asyncio.sleep(3600)
+
+
+class StubRestMapper:
+    def __init__(self, candles):
+        self.candles = candles
+        self.since = None
+
+    def fetch_ohlcv_since(self, symbol, timeframe, since):
+        self.since = since
+        rows = [c for c in self.candles if c[0] >= since]
+        df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+
+def test_ccxt_pro_source_resyncs_only_closed_candles_and_streams_without_trades(tmp_path, monkeypatch):
+    import asyncio
+    from backend.data import stream as stream_module
+    from backend.data.stream import CandleStream, CcxtProSource
+
+    step = 60_000
+    now_bar = 1_700_000_040_000
+    monkeypatch.setattr(stream_module.time, 'time', lambda: (now_bar + 30_000) / 1000)
+    since = now_bar - 2 * step
+    store = OHLCVStore(root=str(tmp_path), exchange='stub')
+    store.append(pd.DataFrame({'timestamp': pd.to_datetime([since], unit='ms'), 'open': [1.0], 'high': [1.0],
+                               'low': [1.0], 'close': [1.0], 'volume': [1.0]}), 'BTC/USDT', '1m')  # stored while open
+    rest = [[since, 1.0, 3.0, 1.0, 2.0, 5.0], [since + step, 2.0, 2.0, 2.0, 2.0, 1.0], [now_bar, 2.0, 2.0, 2.0, 2.0, 1.0]]
+    ws = [[[now_bar, 2.0, 4.0, 2.0, 3.0, 2.0]], [[now_bar, 2.0, 4.0, 2.0, 4.0, 3.0]],
+          [[now_bar + step, 4.0, 4.0, 4.0, 4.0, 1.0]]]
+    mapper = StubRestMapper(rest)
+    source = CcxtProSource(mapper=mapper, trades=True, client=StubProClient(ws))
+
+    async def consume():
+        events = []
+        async for event in CandleStream(source, store=store).subscribe('BTC/USDT', '1m', since=since):
+            events.append(event)
+            if event.closed and event.timestamp == now_bar:
+                break
+        return events
+
+    events = asyncio.run(asyncio.wait_for(consume(), 10))
+    assert mapper.since == since
+    assert [(e.timestamp, e.closed) for e in events] == [
+        (since, True), (since + step, True), (now_bar, False), (now_bar, False), (now_bar, False), (now_bar, True)]
+    stored = store.fetch_ohlcv_range('BTC/USDT', '1m')
+    assert stored['close'].tolist() == [2.0, 2.0, 4.0]  # the open bars got their final values
+
+    # The newest stored candle is still forming: its live updates go through until it closes
+    store = OHLCVStore(root=str(tmp_path / "forming"), exchange='stub')
+    store.append(pd.DataFrame({'timestamp': pd.to_datetime([now_bar], unit='ms'), 'open': [2.0], 'high': [2.0],
+                               'low': [2.0], 'close': [2.0], 'volume': [1.0]}), 'BTC/USDT', '1m')
+    source = CcxtProSource(mapper=StubRestMapper(rest), client=StubProClient(ws))
+    since = now_bar
+    events = asyncio.run(asyncio.wait_for(consume(), 10))
+    assert [(e.timestamp, e.closed, e.close) for e in events] == [
+        (now_bar, False, 2.0), (now_bar, False, 3.0), (now_bar, False, 4.0), (now_bar, True, 4.0)]
+    assert store.fetch_ohlcv_range('BTC/USDT', '1m')['close'].tolist() == [4.0]
+
+
+def test_resampler_matches_pandas_and_updates_incrementally(tmp_path):
+    from backend.data.resampler import TimeframeResampler, resample_ohlcv
+
+    df = make_candles(3000).drop(range(500, 560)).reset_index(drop=True)  # includes a gap
+    expected = (df.set_index('timestamp')
+                .resample('1h').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+                .dropna().reset_index())
+    out = resample_ohlcv(df, '1h')
+    np.testing.assert_allclose(out[['open', 'high', 'low', 'close', 'volume']].to_numpy(),
+                               expected[['open', 'high', 'low', 'close', 'volume']].to_numpy())
+
+    store = OHLCVStore(root=str(tmp_path), exchange='test')
+    store.append(df.iloc[:2000], 'BTC/USDT', '1m')
+    resampler = TimeframeResampler(store)
+    first = resampler.get('BTC/USDT', '15m')
+    store.append(df.iloc[2000:], 'BTC/USDT', '1m')
+    resampler.refresh('BTC/USDT')
+    incremental = resampler.get('BTC/USDT', '15m')
+
+    assert len(incremental) > len(first)
+    pd.testing.assert_frame_equal(incremental, resample_ohlcv(df, '15m'))
+
+    # A rollup built from a start bound is not served for an unbounded request
+    start = df['timestamp'].iloc[2500]
+    assert resampler.get('BTC/USDT', '1h', start=start)['timestamp'].iloc[0] == start.floor('1h')
+    pd.testing.assert_frame_equal(resampler.get('BTC/USDT', '1h'), resample_ohlcv(df, '1h'))
+
+    # Backfills before the first candle and inside the gap invalidate the cached rollups
+    older = make_candles(300, start_ms=1_700_000_000_000 - 300 * 60_000, seed=1)
+    gap = make_candles(3000).iloc[500:560]
+    store.append(older, 'BTC/USDT', '1m')
+    pd.testing.assert_frame_equal(resampler.get('BTC/USDT', '1h'),
+                                  resample_ohlcv(pd.concat([older, df], ignore_index=True), '1h'))
+    full = pd.concat([older, df, gap]).sort_values('timestamp').reset_index(drop=True)
+    store.append(gap, 'BTC/USDT', '1m')
+    pd.testing.assert_frame_equal(resampler.get('BTC/USDT', '1h'), resample_ohlcv(full, '1h'))
+    pd.testing.assert_frame_equal(resampler.get('BTC/USDT', '15m'), resample_ohlcv(full, '15m'))
+
+    # Writes through another store instance (or process) invalidate the cached rollups too
+    other = OHLCVStore(root=str(tmp_path), exchange='test')
+    fixed = full.iloc[[100, 1500]].assign(high=lambda d: d['high'] + 100.0)
+    other.append(fixed, 'BTC/USDT', '1m')
+    newer = make_candles(120, start_ms=int(full['timestamp'].iloc[-1].value // 1_000_000) + 60_000, seed=2)
+    other.append(newer, 'BTC/USDT', '1m')
+    full = pd.concat([full.drop(index=[100, 1500]), fixed, newer]).sort_values('timestamp').reset_index(drop=True)
+    pd.testing.assert_frame_equal(resampler.get('BTC/USDT', '1h'), resample_ohlcv(full, '1h'))
+    pd.testing.assert_frame_equal(resampler.get('BTC/USDT', '15m'), resample_ohlcv(full, '15m'))
+
+
+def test_write_behind_writer_batches_and_flushes_on_close(tmp_path):
+    from backend.data.database import DatabaseClient
+    from backend.data.writer import WriteBehindWriter
+
+    path = str(tmp_path / "market.db")
+    writer = WriteBehindWriter(path)
+    df = make_candles(2000)
+    df['signal'] = 1
+    for i in range(20):
+        assert writer.submit_ohlcv(df.iloc[i * 100:(i + 1) * 100], symbol='BTC/USDT', timeframe='1m')
+        assert writer.submit_signals(df.iloc[i * 100:(i + 1) * 100], symbol='BTC/USDT', strategy='s')
+    writer.close()
+
+    metrics = writer.metrics()
+    assert metrics["batches"] == 40 and metrics["queue_depth"] == 0 and metrics["dropped"] == 0
+    assert metrics["transactions"] <= 40
+    db = DatabaseClient(path)
+    assert db.cursor.execute("SELECT COUNT(*) FROM ohlcv").fetchone()[0] == 2000
+    assert db.cursor.execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 2000
+    db.close()
+    assert not writer.submit_ohlcv(df, symbol='BTC/USDT', timeframe='1m')  # closed
+
+    # A bad batch only costs itself, not the batches sharing its transaction
+    writer = WriteBehindWriter(path)
+    bad = df.iloc[:10].assign(signal=[{}] * 10)
+    for i in range(10):
+        writer.submit_ohlcv(df.iloc[i * 10:(i + 1) * 10].assign(close=-1.0), symbol='ETH/USDT', timeframe='1m')
+        if i == 5:
+            writer.submit_signals(bad, symbol='ETH/USDT', strategy='s')
+    writer.close()
+    assert writer.metrics()["failed"] == 1 and writer.metrics()["batches"] == 10
+    db = DatabaseClient(path)
+    assert db.cursor.execute("SELECT COUNT(*) FROM ohlcv WHERE symbol = 'ETH/USDT'").fetchone()[0] == 100
+    db.close()
+
+    # Failing to open the database surfaces in the constructor instead of hanging it
+    with pytest.raises(sqlite3.OperationalError):
+        WriteBehindWriter(str(tmp_path / "missing" / "dir" / "market.db"))
+
+
+def test_compactor_rolls_up_prunes_and_reclaims_space(tmp_path):
+    from backend.data.compaction import DatabaseCompactor, DAY_MS
+    from backend.data.database import DatabaseClient
+    from backend.data.resampler import resample_ohlcv
+
+    path = str(tmp_path / "market.db")
+    start = 1_700_000_000_000 // DAY_MS * DAY_MS
+    df = make_candles(10 * 1440, start_ms=start)
+    df['signal'] = 1
+    db = DatabaseClient(path)
+    db.insert_ohlcv(df, symbol='BTC/USDT', timeframe='1m')
+    db.insert_signals(df, symbol='BTC/USDT', strategy='s')
+    db.close()
+
+    now = start + 10 * DAY_MS
+    report = DatabaseCompactor(path, raw_retention_days=3, signal_retention_days=5).run(now_ms=now)
+
+    assert report["raw_rows_pruned"] == 7 * 1440
+    assert report["signals_pruned"] == 5 * 1440
+    assert report["bytes_reclaimed"] > 0
+    db = DatabaseClient(path)
+    assert len(db.fetch_ohlcv('BTC/USDT', '1m')) == 3 * 1440
+    hourly = db.fetch_ohlcv('BTC/USDT', '1h')
+    expected = resample_ohlcv(df.iloc[:7 * 1440], '1h')
+    np.testing.assert_allclose(hourly['close'].to_numpy(), expected['close'].to_numpy())
+    assert len(db.fetch_ohlcv('BTC/USDT', '1d')) == 7
+    db.close()
+
+
+def test_compactor_merges_backfill_into_existing_rollups(tmp_path):
+    from backend.data.compaction import DatabaseCompactor, DAY_MS
+    from backend.data.database import DatabaseClient
+    from backend.data.resampler import resample_ohlcv
+
+    path = str(tmp_path / "market.db")
+    start = 1_700_000_000_000 // DAY_MS * DAY_MS
+    df = make_candles(2 * 1440, start_ms=start)
+    # Day opens, an hour's close and a mid-hour stretch are missing until a late backfill
+    late = np.zeros(len(df), dtype=bool)
+    late[:30] = late[100:120] = late[1430:1440] = late[1440 + 600:1440 + 660] = True
+    db = DatabaseClient(path)
+    db.insert_ohlcv(df[~late], symbol='BTC/USDT', timeframe='1m')
+    db.close()
+
+    compactor = DatabaseCompactor(path, raw_retention_days=0)
+    compactor.run(now_ms=start + 2 * DAY_MS)
+    db = DatabaseClient(path)
+    db.insert_ohlcv(df[late], symbol='BTC/USDT', timeframe='1m')
+    db.close()
+    compactor.run(now_ms=start + 2 * DAY_MS)
+
+    db = DatabaseClient(path)
+    assert len(db.fetch_ohlcv('BTC/USDT', '1m')) == 0
+    for tf in ('1h', '1d'):
+        stored = db.fetch_ohlcv('BTC/USDT', tf).reset_index(drop=True)
+        expected = resample_ohlcv(df, tf)
+        for col in ('open', 'high', 'low', 'close', 'volume'):
+            np.testing.assert_allclose(stored[col].to_numpy(), expected[col].to_numpy(), err_msg=f"{tf} {col}")
+    db.close()
+
+
+def test_streaming_strategies_match_batch_bit_for_bit():
+    from backend.strategies.classic import ClassicStrategies
+    from backend.strategies.ai_generated import AILearnedMomentum
+    from backend.strategies.streaming import (StreamingSMACrossover, StreamingRSI, StreamingBollinger,
+                                              StreamingMomentum)
+    from backend.strategies.indicators import RollingMean, RollingStd, RSI
+
+    df = make_candles(3000, seed=7)
+    df.loc[100:140, 'close'] = df.loc[100, 'close']  # flat stretch exercises the zero-loss/zero-std paths
+    closes = df['close'].tolist()
+
+    cases = [
+        (StreamingSMACrossover(), ClassicStrategies.sma_crossover(df)),
+        (StreamingRSI(), ClassicStrategies.rsi_strategy(df)),
+        (StreamingRSI(smoothing="wilder"), ClassicStrategies.rsi_strategy(df, smoothing="wilder")),
+        (StreamingBollinger(), ClassicStrategies.bollinger_bands(df)),
+        (StreamingMomentum(), AILearnedMomentum().generate_signals(df)),
+    ]
+    for strategy, batch in cases:
+        strategy.seed(df.iloc[:1000])
+        streamed = [strategy.update(c) for c in closes[1000:]]
+        np.testing.assert_array_equal(streamed, batch['signal'].to_numpy()[1000:])
+
+    batch = ClassicStrategies.bollinger_bands(df)
+    ma, std = RollingMean(20), RollingStd(20)
+    assert np.array_equal([ma.update(c) for c in closes], batch['ma'].to_numpy(), equal_nan=True)
+    assert np.array_equal([std.update(c) for c in closes], batch['std'].to_numpy(), equal_nan=True)
+    for smoothing in ("simple", "wilder"):
+        rsi = RSI(14, smoothing)
+        expected = ClassicStrategies.rsi_strategy(df, smoothing=smoothing)['rsi'].to_numpy()
+        assert np.array_equal([rsi.update(c) for c in closes], expected, equal_nan=True)
+
+
+def test_indicator_cache_computes_each_indicator_once_across_strategies():
+    from backend.strategies.classic import ClassicStrategies
+    from backend.strategies.ai_generated import AILearnedMomentum
+    from backend.strategies.indicator_cache import IndicatorCache
+
+    df = make_candles(2000, seed=3)
+    cache = IndicatorCache()
+    runs = []
+    for i in range(50):
+        runs.append(ClassicStrategies.sma_crossover(df, short_window=10 + i % 5, long_window=50, cache=cache))
+        runs.append(ClassicStrategies.rsi_strategy(df, period=14, cache=cache))
+        runs.append(ClassicStrategies.bollinger_bands(df, window=20, cache=cache))
+        runs.append(AILearnedMomentum(cache=cache).generate_signals(df))
+    stats = cache.stats()
+    # 5 short SMAs + long SMA, diff + rsi, ma + std, pct_change + return mean
+    assert stats["misses"] == 12
+    assert stats["hits"] + stats["misses"] == 50 * 7 + 2  # the rsi/return-mean misses also look up their input
+    assert stats["entries"] == 12
+
+    uncached = ClassicStrategies.bollinger_bands(df.copy(), cache=IndicatorCache(max_entries=0))
+    pd.testing.assert_frame_equal(runs[2], uncached)
+    expected_rsi = ClassicStrategies.rsi_strategy(df, cache=IndicatorCache())['rsi']
+    delta = df['close'].diff()
+    rs = delta.clip(lower=0).rolling(14).mean() / (-delta.clip(upper=0)).rolling(14).mean()
+    assert np.array_equal(expected_rsi.to_numpy(), (100 - 100 / (1 + rs)).to_numpy(), equal_nan=True)
+
+    small = IndicatorCache(max_entries=2)
+    for window in (5, 10, 15):
+        small.sma(df['close'], window)
+    assert small.stats()["entries"] == 2 and small.stats()["evictions"] == 1
+    small.sma(df['close'], 5)
+    assert small.stats()["misses"] == 4
+
+
+def test_parameter_sweep_matches_batch_strategies(monkeypatch):
+    from backend.strategies import optimizer
+    from backend.strategies.classic import ClassicStrategies
+    from backend.strategies.indicator_cache import IndicatorCache
+    from backend.strategies.ai_generated import AILearnedMomentum
+    from backend.strategies.optimizer import sweep
+
+    df = make_candles(3000, seed=4)
+    df['close'] = 100 * np.exp(np.cumsum(np.random.default_rng(4).normal(0, 0.01, len(df))))
+    returns = df['close'].pct_change()
+
+    def reference(signal):
+        pnl = (signal.shift(1) * returns).iloc[1:]
+        return (1 + pnl).prod() - 1, pnl.mean() / pnl.std() * np.sqrt(252)
+
+    cases = [
+        ("sma_crossover", {"short_window": [5, 20], "long_window": [30, 60]}, ClassicStrategies.sma_crossover),
+        ("rsi_strategy", {"period": [7, 14], "lower": [25, 30], "upper": [70, 75]}, ClassicStrategies.rsi_strategy),
+        ("bollinger_bands", {"window": [10, 20], "num_std_dev": [1.0, 2.5]}, ClassicStrategies.bollinger_bands),
+        ("ai_momentum", {"window": [1, 5, 40]},
+         lambda df, window, cache: AILearnedMomentum(window=window, cache=cache).generate_signals(df)),
+    ]
+    for strategy, grid, batch in cases:
+        ranked = sweep(df, strategy, grid, block_bytes=len(df) * 3)
+        assert len(ranked) == np.prod([len(v) for v in grid.values()])
+        assert ranked['sharpe'].is_monotonic_decreasing
+        for row in ranked.to_dict('records'):
+            params = {name: type(grid[name][0])(row[name]) for name in grid}
+            signal = batch(df, **params, cache=IndicatorCache())['signal']
+            total_return, sharpe = reference(signal)
+            assert np.isclose(row['total_return'], total_return, rtol=1e-9)
+            assert np.isclose(row['sharpe'], sharpe, rtol=1e-9)
+            assert row['trades'] == int((signal.diff().fillna(signal) != 0).sum())
+
+    parallel = sweep(df, "sma_crossover", cases[0][1], workers=2, block_bytes=len(df))
+    pd.testing.assert_frame_equal(parallel, sweep(df, "sma_crossover", cases[0][1]))
+
+    # Chunks of a few cells carry the signal across chunk boundaries
+    whole = {strategy: sweep(df, strategy, grid) for strategy, grid, _ in cases}
+    monkeypatch.setattr(optimizer, "SWEEP_CHUNK_CELLS", 7)
+    for strategy, grid, _ in cases:
+        pd.testing.assert_frame_equal(sweep(df, strategy, grid), whole[strategy])
+
+
+def test_array_strategies_match_dataframe_strategies(tmp_path):
+    from backend.strategies import STRATEGY_REGISTRY, get_array_strategy
+    from backend.strategies.array_strategy import OHLCVArrays, ArrayStrategyAdapter, FrameStrategyAdapter, signal_from_masks
+    from backend.strategies.ai_generated import AILearnedMomentum
+
+    df = make_candles(2000, seed=5)
+    store = OHLCVStore(root=str(tmp_path), exchange='test')
+    store.append(df, 'BTC/USDT', '1m')
+    cols = OHLCVArrays.from_store(store, 'BTC/USDT', '1m')
+    assert not cols.close.flags.writeable
+    assert np.shares_memory(OHLCVArrays.from_frame(df).close, df['close'].to_numpy())
+
+    for name, strategy in STRATEGY_REGISTRY.items():
+        expected = (strategy.generate_signals(df) if isinstance(strategy, AILearnedMomentum) else strategy(df))['signal']
+        signal = get_array_strategy(name).compute_signals(cols)
+        assert signal.dtype == np.int8
+        np.testing.assert_array_equal(signal, expected.to_numpy())
+        np.testing.assert_array_equal(FrameStrategyAdapter(strategy).compute_signals(cols), signal)
+
+    def legacy(frame):
+        frame = frame.copy()
+        frame['signal'] = np.where(frame['close'].diff() > 0, 'buy', None)
+        frame.loc[frame['close'].diff() < 0, 'signal'] = 'sell'
+        return frame
+
+    signal = FrameStrategyAdapter(legacy).compute_signals(cols)
+    np.testing.assert_array_equal(signal[1:], np.sign(np.diff(df['close'].to_numpy())))
+    adapted = ArrayStrategyAdapter(get_array_strategy('rsi_strategy')).generate_signals(df)
+    np.testing.assert_array_equal(adapted['signal'].to_numpy(), STRATEGY_REGISTRY['rsi_strategy'](df)['signal'])
+
+    buy = np.array([True, False, True, False])
+    signal = signal_from_masks(buy, np.array([False, True, True, False]))
+    np.testing.assert_array_equal(signal, [1, -1, -1, 0])
+    np.testing.assert_array_equal(buy, [True, False, True, False])
+    assert not np.shares_memory(signal, buy)
+
+
+def test_batch_evaluation_aligns_symbols_and_matches_per_symbol_strategies(tmp_path):
+    from backend.strategies import STRATEGY_REGISTRY
+    from backend.strategies.ai_generated import AILearnedMomentum
+    from backend.strategies.batch import PriceMatrix, evaluate_universe, BATCH_STRATEGIES
+
+    frames = {f"C{i}/USDT": make_candles(600 - 100 * i, start_ms=1_700_000_000_000 + 100 * i * 60_000, seed=i)
+              for i in range(4)}
+    frames["GAP/USDT"] = make_candles(600, seed=9).drop(index=range(300, 310)).reset_index(drop=True)
+    # A stray bar 30 s after bar 100 adds a grid row every other symbol is missing
+    stray = make_candles(600, seed=10)
+    extra = stray.iloc[[100]].assign(timestamp=stray['timestamp'].iloc[100] + pd.Timedelta(seconds=30))
+    frames["STRAY/USDT"] = pd.concat([stray.iloc[:101], extra, stray.iloc[101:]], ignore_index=True)
+    store = OHLCVStore(root=str(tmp_path), exchange='test')
+    for symbol, df in frames.items():
+        store.append(df, symbol, '1m')
+    pm = PriceMatrix.from_store(store, list(frames) + ["NONE/USDT"], '1m')
+    assert pm.symbols == list(frames) and pm.close.shape == (601, 6)
+    assert pm.mask.sum(axis=0).tolist() == [600, 500, 400, 300, 590, 601]
+
+    for name in BATCH_STRATEGIES:
+        result = evaluate_universe(pm, name)
+        strategy = STRATEGY_REGISTRY[name]
+        for j, (symbol, df) in enumerate(frames.items()):
+            expected = (strategy.generate_signals(df) if isinstance(strategy, AILearnedMomentum)
+                        else strategy(df))['signal'].to_numpy()
+            np.testing.assert_array_equal(result.signals[pm.mask[:, j], j], expected, err_msg=f"{name} {symbol}")
+            assert (result.signals[~pm.mask[:, j], j] == 0).all()
+            assert result.latest[symbol] == expected[-1]
+            pnl = (pd.Series(expected).shift(1) * df['close'].pct_change()).iloc[1:]
+            assert np.isclose(result.metrics.loc[symbol, 'total_return'], (1 + pnl).prod() - 1)
+            assert np.isclose(result.metrics.loc[symbol, 'sharpe'], pnl.mean() / pnl.std() * np.sqrt(252))
+
+
+def test_strategy_registry_is_lazy_and_loads_entry_point_plugins(tmp_path):
+    import subprocess
+    import sys
+    import textwrap
+
+    plugin = tmp_path / "plugins"
+    (plugin / "momo_plugin-1.0.dist-info").mkdir(parents=True)
+    (plugin / "momo_plugin-1.0.dist-info" / "METADATA").write_text("Name: momo-plugin\nVersion: 1.0\n")
+    (plugin / "momo_plugin-1.0.dist-info" / "entry_points.txt").write_text(
+        "[aitrader.strategies]\nmomo = momo_plugin:flip_strategy\n")
+    (plugin / "momo_plugin.py").write_text(textwrap.dedent('''
+        def flip_strategy(df, threshold: float = 0.5):
+            """Buys when close is above open."""
+            df = df.copy()
+            df['signal'] = (df['close'] > df['open']).astype(int)
+            return df
+    '''))
+    script = textwrap.dedent('''
+        import sys
+        import pandas as pd
+        from backend.strategies import STRATEGY_REGISTRY, get_strategy, register_strategy, run_strategy
+        heavy = ("backend.strategies.classic", "backend.strategies.ai_generated", "momo_plugin")
+        names = list(STRATEGY_REGISTRY)
+        meta = {name: STRATEGY_REGISTRY.metadata(name) for name in names}
+        assert not any(m in sys.modules for m in heavy), "metadata imported strategy code"
+        assert meta["momo"]["params"] == {"threshold": 0.5} and meta["momo"]["source"] == "entry_point"
+        assert meta["ai_momentum"]["author"] == "AI Engine"
+        assert meta["rsi_strategy"]["params"]["smoothing"] == "simple"
+
+        df = pd.DataFrame({"open": [1.0, 2.0], "close": [2.0, 1.0]})
+        assert run_strategy(get_strategy("momo"), df)["signal"].tolist() == [1, 0]
+        assert "backend.strategies.classic" not in sys.modules
+        register_strategy("generated", code="def strat(df):\\n    return df.assign(signal=1)\\n", author="LLM")
+        assert STRATEGY_REGISTRY.metadata("generated")["author"] == "LLM"
+        assert not STRATEGY_REGISTRY.is_loaded("generated")
+        assert run_strategy(STRATEGY_REGISTRY["generated"], df)["signal"].tolist() == [1, 1]
+        get_strategy("sma_crossover")
+        assert "backend.strategies.classic" in sys.modules
+        print("ok", len(names))
+    ''')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(plugin), os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]),
+               STRATEGY_METADATA_CACHE=str(tmp_path / "meta.json"))
+    out = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.split() == ["ok", "5"]
+    assert (tmp_path / "meta.json").exists()
+
+
+def test_sandbox_runs_generated_code_in_workers_and_quarantines_failures():
+    from backend.strategies.ai_generated import AIGeneratedExperiment
+    from multiprocessing import shared_memory
+    from backend.strategies.sandbox import SandboxPool, StrategyExecutionError, StrategyQuarantined, _columns
+
+    df = make_candles(2000)
+    func_code = "def strat(df):\n    df['signal'] = np.where(df['close'].diff() > 0, 'buy', 'sell')\n    return df\n"
+    script_code = "df['signal'] = 0\ndf.loc[df['close'] > df['close'].mean(), 'signal'] = 1\n"
+    loop_code = "def strat(df):\n    while True:\n        try:\n            sum(range(10**6))\n        except Exception:\n            pass\n"
+
+    with SandboxPool(workers=1, cpu_seconds=0.5, memory_mb=256, wall_timeout=5) as pool:
+        expected = np.where(df['close'].diff() > 0, 1, -1).astype(np.int8)
+        for _ in range(3):
+            np.testing.assert_array_equal(pool.run(func_code, df, "func"), expected)
+        result = AIGeneratedExperiment(script_code, "script", sandbox=pool).generate_signals(df)
+        np.testing.assert_array_equal(result['signal'], (df['close'] > df['close'].mean()).astype(int))
+        assert 'close' in result and len(pool._blocks) == 1   # both strategies shared one published block
+
+        try:
+            pool.run(loop_code, df, "loop")
+            raise AssertionError("looping strategy was not stopped")
+        except StrategyExecutionError as e:
+            assert e.kind == "timeout"
+        try:
+            pool.run(loop_code, df, "loop")
+            raise AssertionError("failed strategy was not quarantined")
+        except StrategyQuarantined:
+            pass
+        np.testing.assert_array_equal(pool.run(func_code, df, "func"), expected)   # the worker survived
+
+        stats = pool.stats()
+        assert stats["func"]["calls"] == 4 and stats["func"]["failures"] == 0
+        assert stats["loop"]["quarantined"] and stats["loop"]["last_ms"] >= 400
+
+        # Imports are allow-listed and file/eval builtins are hidden
+        math_code = "import math\ndef strat(df):\n    return df.assign(signal=int(math.copysign(1, -1)))\n"
+        np.testing.assert_array_equal(pool.run(math_code, df, "math"), np.full(len(df), -1, dtype=np.int8))
+        for name, code in (("os", "import os\n"), ("open", "open('/etc/hostname')\n"), ("eval", "eval('1')\n")):
+            with pytest.raises(StrategyExecutionError):
+                pool.run(code, df, name)
+
+        # A block in use by a call survives eviction; once released it is evicted like any other
+        pinned, shm_name, _, _ = pool._publish(df)
+        for seed in range(1, 4):
+            pool._unpublish(pool._publish(make_candles(50, seed=seed))[0])
+        assert pinned in pool._blocks and len(pool._blocks) == 2
+        pool._unpublish(pinned)
+        pool._unpublish(pool._publish(make_candles(50, seed=4))[0])
+        assert pinned not in pool._blocks
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=shm_name)
+
+        # Candles the worker cannot attach are a pool error and do not quarantine the strategy
+        pool._publish = lambda frame: (None, "psm_missing_block", len(frame), _columns(frame))
+        with pytest.raises(StrategyExecutionError) as excinfo:
+            pool.run(func_code, df, "func")
+        assert excinfo.value.kind == "unavailable"
+        assert pool.stats()["func"]["failures"] == 0 and not pool.stats()["func"]["quarantined"]
+
+
+def test_signal_processor_is_pure_vectorized_and_streams_per_key():
+    from backend.services.signal_processor import SignalProcessor, transitions
+
+    def reference(signals, position):
+        actions = []
+        for sig in signals[1:]:
+            if sig == 1 and position <= 0:
+                actions.append('BUY')
+                position = 1
+            elif sig == -1 and position >= 0:
+                actions.append('SELL')
+                position = -1
+            else:
+                actions.append('HOLD')
+        return actions, position
+
+    rng = np.random.default_rng(4)
+    signals = rng.choice([1, -1, 0, 0, 0], 300).tolist()
+    signals[5], signals[9] = None, float('nan')
+    df = pd.DataFrame({'signal': pd.Series(signals, dtype=object)})
+    processor = SignalProcessor()
+    for start in (0, 1, -1):
+        expected, _ = reference(signals, start)
+        assert processor.process_signals(df, position=start) == expected
+    assert processor.process_signals(df) == processor.process_signals(df)    # reprocessing is stable
+    assert processor.position == 0
+
+    # Streaming keeps one position per (symbol, strategy) and matches the batch result
+    expected, final = reference(signals, 0)
+    live = [processor.on_signal(sig, 'BTC/USDT', 'sma_crossover') for sig in signals[1:]]
+    assert live == expected and processor.positions() == {('BTC/USDT', 'sma_crossover'): final}
+    assert processor.on_signals({('BTC/USDT', 'sma_crossover'): -final, ('ETH/USDT', 'rsi'): 1}) == \
+        {('BTC/USDT', 'sma_crossover'): 'BUY' if final == -1 else 'SELL', ('ETH/USDT', 'rsi'): 'BUY'}
+    processor.reset()
+    assert processor.positions() == {}
+
+    # Matrix form runs each column independently
+    matrix = rng.choice([1, -1, 0], (100, 3))
+    actions, positions = transitions(matrix, position=[0, 1, -1])
+    for j, start in enumerate([0, 1, -1]):
+        column, _ = transitions(matrix[:, j], start)
+        np.testing.assert_array_equal(actions[:, j], column)
+
+
+def test_backtester_matches_bar_by_bar_accounting_with_costs_and_stops():
+    from backend.services.backtester import Backtester
+
+    def reference(close, signal, funding, lev, fee, slip, rate, op=None, hi=None, lo=None, stop=None, trail=None):
+        cash, pos, qty, entry, entry_bar, best, equity = 10_000.0, 0, 0.0, 0.0, 0, 0.0, []
+        fixed = None
+        for t in range(len(close)):
+            if pos and funding[t]:
+                cash -= rate * pos * qty * close[t]
+            if pos and (stop or trail) and t > entry_bar:
+                level = fixed if fixed is not None else (-np.inf if pos == 1 else np.inf)
+                if trail:
+                    trailing = best * (1 - pos * trail / 100)
+                    level = max(level, trailing) if pos == 1 else min(level, trailing)
+                if (lo[t] <= level) if pos == 1 else (hi[t] >= level):
+                    price = (min(op[t], level) if pos == 1 else max(op[t], level)) * (1 - pos * slip)
+                    cash += pos * qty * (price - entry) - qty * price * fee
+                    pos = 0
+                else:
+                    best = max(best, hi[t]) if pos == 1 else min(best, lo[t])
+            target = pos
+            if signal[t] == 1 and pos <= 0:
+                target = 1
+            elif signal[t] == -1 and pos >= 0:
+                target = -1
+            if target != pos:
+                if pos:
+                    price = close[t] * (1 - pos * slip)
+                    cash += pos * qty * (price - entry) - qty * price * fee
+                entry = close[t] * (1 + target * slip)
+                qty = lev * cash / entry
+                cash -= qty * entry * fee
+                pos, entry_bar, best = target, t, close[t]
+                # The stop price only protects positions it is on the losing side of
+                fixed = stop if stop and (stop < close[t] if pos == 1 else stop > close[t]) else None
+            equity.append(cash + pos * qty * (close[t] - entry))
+        return np.array(equity)
+
+    rng = np.random.default_rng(5)
+    n = 2000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    op = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.0005, n))
+    hi = np.maximum(op, close) * (1 + np.abs(rng.normal(0, 0.001, n)))
+    lo = np.minimum(op, close) * (1 - np.abs(rng.normal(0, 0.001, n)))
+    ts = 1_700_000_000_000 + np.arange(n) * 3_600_000
+    funding = np.r_[False, ts[1:] // (8 * 3_600_000) != ts[:-1] // (8 * 3_600_000)]
+    signal = rng.choice([1, -1, 0, 0, 0, 0, 0, 0], n).astype(np.int8)
+
+    for lev, fee, slip, rate in ((1, 0.0, 0.0, 0.0), (3, 0.0005, 0.0002, 0.0001), (5, 0.0002, 0.0, -0.0003)):
+        result = Backtester(leverage=lev, taker_fee=fee, slippage=slip, funding_rate=rate).run_arrays(close, signal, ts)
+        np.testing.assert_allclose(result.equity, reference(close, signal, funding, lev, fee, slip, rate), rtol=1e-9)
+        assert result.metrics['trades'] == len(result.ledger) == np.count_nonzero(np.diff(result.position)) + \
+            (result.position[0] != 0)
+        assert np.isclose(result.ledger['pnl'].sum(), result.equity[-1] - 10_000)
+
+    # Maker orders pay the maker fee and no slippage
+    maker = Backtester(leverage=2, order_type='maker', maker_fee=0.0002, slippage=0.01).run_arrays(close, signal, ts)
+    np.testing.assert_allclose(maker.equity, reference(close, signal, funding, 2, 0.0002, 0.0, 0.0), rtol=1e-9)
+
+    # Event-driven mode: stop price / trailing percent exits, then flat until the next signal
+    for stop, trail in ((95.0, None), (None, 1.0), (float(np.median(close)), 1.0)):
+        result = Backtester(leverage=2, taker_fee=0.0005, slippage=0.0002, funding_rate=0.0001,
+                            stop_loss=stop, trailing_stop=trail).run_arrays(close, signal, ts, op, hi, lo)
+        expected = reference(close, signal, funding, 2, 0.0005, 0.0002, 0.0001, op, hi, lo, stop, trail)
+        np.testing.assert_allclose(result.equity, expected, rtol=1e-9)
+        assert result.ledger['exit_reason'].isin(['stop_loss', 'trailing_stop']).any()
+
+    # A stop price above a long entry (or below a short one) does not close the trade at once
+    flat = np.full(6, 100.0)
+    for side, stop in ((1, 101.0), (-1, 99.0)):
+        result = Backtester(stop_loss=stop).run_arrays(flat, np.array([side, 0, 0, 0, 0, 0], dtype=np.int8))
+        assert result.ledger['exit_reason'].tolist() == ['open'] and (result.position == side).all()
+
+    # Liquidation ends the ledger and the metrics at the liquidation bar
+    crash = np.array([100.0, 100.0, 90.0, 60.0, 80.0, 120.0, 130.0])
+    result = Backtester(leverage=3).run_arrays(crash, np.array([1, 0, 0, 0, -1, 1, 0], dtype=np.int8))
+    assert result.metrics['liquidated'] and result.metrics['trades'] == 1
+    assert result.ledger[['exit_bar', 'exit_reason']].values.tolist() == [[3, 'liquidation']]
+    assert np.isclose(result.ledger['pnl'].sum(), -10_000) and result.metrics['total_return'] == -1
+    assert (result.equity[3:] == 0).all() and (result.position[3:] == 0).all()
+    assert result.metrics['exposure'] == 0.75 and result.metrics['max_drawdown'] == -1.0
+
+    # DataFrame entry point accepts the strategies' 'long' / 'short' labels
+    df = pd.DataFrame({'timestamp': pd.to_datetime(ts, unit='ms'), 'close': close,
+                       'signal': np.select([signal == 1, signal == -1], ['long', 'short'], None)})
+    framed = Backtester(leverage=3).run(df).frame(df)
+    np.testing.assert_array_equal(framed['exposure'], framed['position'] * 3.0)
+    np.testing.assert_allclose(framed['equity'], Backtester(leverage=3).run_arrays(close, signal, ts).equity)